@@ -1,6 +1,48 @@
+import asyncio
 import requests
 import os
-from datetime import datetime
+import re
+import random
+import sqlite3
+import threading
+import time
+from collections import OrderedDict, deque
+from queue import Queue
+from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+from cache import geocode_cache, TTLCache, SQLiteStore, normalize_query, CACHE_DB_PATH
+from async_runtime import async_runtime
+from http_client import http_client
+from llm_client import llm_client
+from metrics import log_event
+from quota import background
+from results import StockResult, RecipeResult, DirectionsResult
+from stock_index import stock_index
+from kma import KMA_BASE_URL
+from geo import haversine_km
+from subway import subway_network
+
+# 업스트림 주소 (벤치마크 등에서 가짜 서버로 바꿀 수 있음)
+KAKAO_BASE_URL = os.getenv('KAKAO_BASE_URL', "https://dapi.kakao.com")
+STOCK_BASE_URL = os.getenv('STOCK_BASE_URL', "http://apis.data.go.kr/1160100/service/GetStockSecuritiesInfoService")
+
+# 여러 종목 시세 조회 설정
+WATCHLIST_MAX_TICKERS = int(os.getenv('WATCHLIST_MAX_TICKERS', 50))   # 한 번에 조회할 최대 종목 수
+STOCK_BATCH_PAGE_SIZE = int(os.getenv('STOCK_BATCH_PAGE_SIZE', 1000))  # 기준일 전체 시세 조회 시 페이지 크기
+STOCK_BATCH_SINGLE_THRESHOLD = 3  # 이 개수 이하는 종목별 조회가 호출 수가 더 적음
+
+STOCK_PUBLISH_HOUR = int(os.getenv('STOCK_PUBLISH_HOUR', 13))          # 일별 시세 공개 시각 (다음 영업일)
+STOCK_QUOTE_RECHECK = int(os.getenv('STOCK_QUOTE_RECHECK', 1800))      # 새 시세가 늦을 때 재확인 간격(초)
+
+# 종목코드 → 최신 시세 item 캐시 (만료 시각은 기준일에 따라 항목별로 계산)
+quote_cache = TTLCache(
+    'stock_quote',
+    max_size=int(os.getenv('STOCK_QUOTE_CACHE_SIZE', 4096)),
+    ttl=STOCK_QUOTE_RECHECK,
+    store=SQLiteStore('stock_quote'),
+)
+
+_stock_executor = ThreadPoolExecutor(max_workers=int(os.getenv('STOCK_WORKERS', 8)), thread_name_prefix='stock')
 
 class WeatherService:
     """한국 기상청 API를 사용한 날씨 정보 서비스"""
@@ -8,7 +50,7 @@ class WeatherService:
     def __init__(self):
         # 환경변수에서 기상청 API 키 가져오기
         self.api_key = os.getenv('KMA_API_KEY')
-        self.base_url = "http://apis.data.go.kr/1360000/VilageFcstInfoService_2.0"
+        self.base_url = KMA_BASE_URL
     
     def get_weather(self, location):
         """지역의 현재 날씨 정보를 가져옵니다"""
@@ -27,7 +69,7 @@ class WeatherService:
                 'lang': 'ko'
             }
             
-            response = requests.get(url, params=params, timeout=10)
+            response = http_client.get('kma', url, params=params)
             response.raise_for_status()
             data = response.json()
             
@@ -81,92 +123,136 @@ class WeatherService:
             return f"날씨 서비스 오류: {str(e)}"
 
 
+def format_directions(departure, destination, dep_coords, dest_coords):
+    """출발지/도착지 좌표 → DirectionsResult (좌표를 못 찾으면 안내 문자열)"""
+    if not dep_coords or not dest_coords:
+        debug_info = f"❌ 주소를 찾을 수 없습니다.\n\n"
+        debug_info += f"🔍 디버그 정보:\n"
+        debug_info += f"출발지 '{departure}' 좌표: {dep_coords}\n"
+        debug_info += f"도착지 '{destination}' 좌표: {dest_coords}\n\n"
+        debug_info += f"💡 해결 방법:\n"
+        debug_info += f"• 정확한 주소를 입력해주세요 (예: 서울특별시 강남구)\n"
+        debug_info += f"• 지하철역명 + '역'을 붙여주세요 (예: 강남역)\n"
+        debug_info += f"• 유명한 건물명을 사용해보세요 (예: 롯데타워)"
+        return debug_info
+    
+    distance = haversine_km(dep_coords, dest_coords)
+    # 지하철 노선도 안이면 역 간 소요시간/환승 표로, 아니면 직선거리로 대략 계산
+    transit = subway_network.plan(departure, destination, dep_coords, dest_coords) if distance >= 2 else None
+    estimated_time = transit['minutes'] if transit else max(int(distance * 2.5), 15)
+    return DirectionsResult(departure, destination, distance, estimated_time, transit)
+
+
 class KakaoMapService:
     """카카오맵 API를 사용한 교통 정보 서비스"""
     
     def __init__(self):
         # 환경변수에서 카카오 API 키 가져오기
         self.api_key = os.getenv('KAKAO_API_KEY')
-        self.base_url = "https://dapi.kakao.com/v2/local"
-        self.directions_url = "https://apis-navi.kakaomobility.com/v1/directions"
+        self.base_url = f"{KAKAO_BASE_URL}/v2/local"
     
     def get_directions(self, departure, destination):
-        """출발지에서 도착지까지의 경로 정보를 가져옵니다"""
+        """출발지에서 도착지까지의 경로 정보 → DirectionsResult (지하철 노선도 기준, 안내/오류는 문자열)"""
         if not self.api_key:
             return "카카오 API 키가 설정되지 않았습니다."
         
         try:
-            # 1. 주소를 좌표로 변환
             dep_coords = self._get_coordinates(departure)
             dest_coords = self._get_coordinates(destination)
-            
-            if not dep_coords or not dest_coords:
-                return f"주소를 찾을 수 없습니다. ({departure} 또는 {destination})"
-            
-            # 2. 경로 검색 (대중교통)
-            headers = {
-                'Authorization': f'KakaoAK {self.api_key}',
-                'Content-Type': 'application/json'
-            }
-            
-            # 카카오 모빌리티 API 사용 (실제로는 더 복잡한 설정 필요)
-            # 여기서는 간단한 직선거리 계산으로 대체
-            distance = self._calculate_distance(dep_coords, dest_coords)
-            estimated_time = max(int(distance * 2), 15)  # 대략적인 시간 계산
-            
-            result = f"🚉 {departure} → {destination}\n\n"
-            result += f"📍 예상 소요시간: {estimated_time}분\n"
-            result += f"📏 직선거리: {distance:.1f}km\n\n"
-            result += "🚇 추천 경로:\n"
-            result += "• 지하철 이용 시 환승 1-2회 예상\n"
-            result += "• 버스 이용 시 1회 환승 예상\n"
-            result += "• 실시간 교통상황에 따라 변동 가능"
-            
-            return result
-            
+            return format_directions(departure, destination, dep_coords, dest_coords)
         except Exception as e:
             return f"교통 정보를 가져올 수 없습니다: {str(e)}"
     
     def _get_coordinates(self, address):
-        """주소를 좌표로 변환"""
+        """주소를 좌표로 변환 (geocode_cache 공유)"""
+        found, coords = geocode_cache.lookup(address)
+        if found:
+            return tuple(coords) if coords else None
+        
         try:
-            url = f"{self.base_url}/search/address.json"
             headers = {'Authorization': f'KakaoAK {self.api_key}'}
             params = {'query': address}
+            coords = None
             
-            response = requests.get(url, headers=headers, params=params, timeout=10)
-            response.raise_for_status()
-            data = response.json()
-            
-            if data['documents']:
-                doc = data['documents'][0]
-                return float(doc['x']), float(doc['y'])  # 경도, 위도
-            return None
+            # 주소 검색 → 키워드 검색 순으로 시도
+            for search_type in ('address', 'keyword'):
+                url = f"{self.base_url}/search/{search_type}.json"
+                response = http_client.get('kakao', url, metric=f'kakao_{search_type}', headers=headers, params=params)
+                response.raise_for_status()
+                data = response.json()
+                
+                if data['documents']:
+                    doc = data['documents'][0]
+                    coords = float(doc['x']), float(doc['y'])  # 경도, 위도
+                    break
             
         except Exception:
+            # 오류는 '없음'으로 캐시하지 않음
             return None
-    
-    def _calculate_distance(self, coord1, coord2):
-        """두 좌표 간의 거리 계산 (km)"""
-        import math
-        
-        lat1, lon1 = coord1[1], coord1[0]
-        lat2, lon2 = coord2[1], coord2[0]
-        
-        # 하버사인 공식
-        R = 6371  # 지구의 반지름 (km)
-        
-        dlat = math.radians(lat2 - lat1)
-        dlon = math.radians(lon2 - lon1)
         
-        a = (math.sin(dlat/2) * math.sin(dlat/2) + 
-             math.cos(math.radians(lat1)) * math.cos(math.radians(lat2)) * 
-             math.sin(dlon/2) * math.sin(dlon/2))
-        
-        c = 2 * math.atan2(math.sqrt(a), math.sqrt(1-a))
-        distance = R * c
-        
-        return distance
+        geocode_cache.set(address, coords)
+        return coords
+
+
+def _short_code(item):
+    """시세 item의 6자리 단축코드"""
+    code = str(item.get('srtnCd', '')).strip()
+    return code[1:] if code.startswith('A') else code
+
+
+def format_base_date(bas_dt):
+    """'20240510' → '2024-05-10'"""
+    if not bas_dt or len(bas_dt) != 8:
+        return '-'
+    return f"{bas_dt[:4]}-{bas_dt[4:6]}-{bas_dt[6:]}"
+
+
+def next_quote_refresh(bas_dt, now=None):
+    """기준일 bas_dt 다음 거래일 시세가 공개될 수 있는 시각
+    
+    일별 시세는 다음 영업일 STOCK_PUBLISH_HOUR 시 이후 제공되므로,
+    (bas_dt 다음 평일)의 시세는 그다음 평일 STOCK_PUBLISH_HOUR 시에 나올 수 있습니다.
+    이미 지난 시각이면(공휴일, 공개 지연) STOCK_QUOTE_RECHECK 초 뒤 다시 확인합니다.
+    """
+    now = now or datetime.now()
+    try:
+        day = datetime.strptime(bas_dt, '%Y%m%d')
+    except (TypeError, ValueError):
+        return now + timedelta(seconds=STOCK_QUOTE_RECHECK)
+    
+    for _ in range(2):
+        day += timedelta(days=1)
+        while day.weekday() >= 5:  # 토, 일 제외
+            day += timedelta(days=1)
+    refresh_at = day.replace(hour=STOCK_PUBLISH_HOUR)
+    
+    if refresh_at <= now:
+        return now + timedelta(seconds=STOCK_QUOTE_RECHECK)
+    return refresh_at
+
+
+def cache_quote(code, item):
+    """시세 item을 다음 공개 예상 시각까지 캐시"""
+    now = datetime.now()
+    ttl = (next_quote_refresh(item.get('basDt'), now) - now).total_seconds()
+    quote_cache.set(code, item, ttl=ttl)
+
+
+def stock_lookup_message(query, candidates):
+    """종목을 하나로 정하지 못했을 때 안내 문구 (여러 종목과 맞으면 후보 표시)"""
+    if candidates:
+        names = ', '.join(f"{candidate.name}({candidate.code})" for candidate in candidates)
+        return f"'{query}'에 해당하는 종목이 여러 개입니다: {names}\n💡 이 중 정확한 종목명을 입력해주세요"
+    return f"'{query}' 종목을 찾을 수 없습니다.\n💡 정확한 종목명을 입력해주세요 (예: 삼성전자, SK하이닉스)"
+
+
+class StockApiError(Exception):
+    """공공데이터포털 주가 API가 정상('00')이 아닌 resultCode를 반환한 경우"""
+    
+    def __init__(self, code, message):
+        super().__init__(f"{code}: {message}")
+        self.code = code
+        self.message = message
 
 
 class KRXStockService:
@@ -175,7 +261,7 @@ class KRXStockService:
     def __init__(self):
         # 환경변수에서 공공데이터포털 API 키 가져오기
         self.api_key = os.getenv('STOCK_API_KEY')
-        self.base_url = "http://apis.data.go.kr/1160100/service/GetStockSecuritiesInfoService"
+        self.base_url = STOCK_BASE_URL
     
     def get_stock_info(self, stock_name):
         """주식 정보를 가져옵니다"""
@@ -183,150 +269,349 @@ class KRXStockService:
             return "공공데이터포털 API 키가 설정되지 않았습니다."
         
         try:
-            # 1. 종목 코드 검색
-            stock_code = self._search_stock_code(stock_name)
-            if not stock_code:
-                return f"'{stock_name}' 종목을 찾을 수 없습니다.\n💡 정확한 종목명을 입력해주세요 (예: 삼성전자, SK하이닉스)"
+            # 1. 종목 검색 (정확 → 접두어 → 오타 허용, 여러 종목과 맞으면 후보 안내)
+            listing, candidates = stock_index.resolve(stock_name)
+            if not listing:
+                return stock_lookup_message(stock_name, candidates)
             
             # 2. 주가 정보 조회
-            stock_data = self._get_stock_price(stock_code)
+            stock_data = self._get_stock_price(listing.code)
             if not stock_data:
                 return "주가 정보를 가져올 수 없습니다."
             
             # 3. 결과 포맷팅
-            return self._format_stock_info(stock_name, stock_code, stock_data)
+            return self._stock_result(listing.name, listing.code, stock_data)
+            
+        except Exception as e:
+            return f"주가 정보 조회 중 오류가 발생했습니다: {str(e)}"
+    
+    async def get_stock_info_async(self, stock_name):
+        """get_stock_info의 비동기 버전"""
+        if not self.api_key:
+            return "공공데이터포털 API 키가 설정되지 않았습니다."
+        
+        try:
+            listing, candidates = stock_index.resolve(stock_name)
+            if not listing:
+                return stock_lookup_message(stock_name, candidates)
+            
+            stock_data = await self._get_stock_price_async(listing.code)
+            if not stock_data:
+                return "주가 정보를 가져올 수 없습니다."
+            
+            return self._stock_result(listing.name, listing.code, stock_data)
             
         except Exception as e:
             return f"주가 정보 조회 중 오류가 발생했습니다: {str(e)}"
     
     def _search_stock_code(self, stock_name):
-        """종목명으로 종목코드 검색"""
-        # 주요 종목 코드 매핑
-        stock_codes = {
-            '삼성전자': '005930',
-            'SK하이닉스': '000660',
-            'NAVER': '035420',
-            '네이버': '035420',
-            '카카오': '035720',
-            'LG화학': '051910',
-            '현대차': '005380',
-            '현대자동차': '005380',
-            'POSCO홀딩스': '005490',
-            '포스코': '005490',
-            '한국전력': '015760',
-            '셀트리온': '068270',
-            'LG전자': '066570',
-            '기아': '000270',
-            '삼성바이오로직스': '207940',
-            'SK이노베이션': '096770',
-            '현대모비스': '012330',
-            '삼성SDI': '006400'
+        """종목명(영문명, 별칭, 종목코드 포함)으로 종목코드 검색"""
+        listing = stock_index.lookup(stock_name)
+        return listing.code if listing else None
+    
+    def get_quotes(self, queries):
+        """여러 종목의 시세를 한 번에 조회 → {'base_date', 'results': [종목별 결과]}
+        
+        업스트림 호출을 줄이기 위해 종목이 많으면 기준일 전체 시세를 큰 페이지로 받아 골라냅니다.
+        """
+        queries = [q.strip() for q in queries if q and q.strip()][:WATCHLIST_MAX_TICKERS]
+        results = []
+        listings = {}
+        
+        for query in queries:
+            listing, candidates = stock_index.resolve(query)
+            if listing:
+                listings[listing.code] = listing
+            results.append({'query': query, 'listing': listing, 'candidates': candidates})
+        
+        quotes = {}
+        error = None
+        if not self.api_key:
+            error = "공공데이터포털 API 키가 설정되지 않았습니다."
+        elif listings:
+            try:
+                quotes = self._fetch_quotes(list(listings.values()))
+            except Exception as e:
+                log_event('stock_batch_error', level='warning', error=str(e))
+                error = f"주가 정보 조회 중 오류가 발생했습니다: {str(e)}"
+        
+        base_dates = set()
+        for entry in results:
+            listing = entry.pop('listing')
+            candidates = entry.pop('candidates')
+            if candidates:
+                entry.update({'ok': False, 'error': '여러 종목과 일치합니다. 정확한 종목명을 입력해주세요.',
+                              'candidates': [candidate.to_dict() for candidate in candidates]})
+                continue
+            if not listing:
+                entry.update({'ok': False, 'error': '종목을 찾을 수 없습니다.'})
+                continue
+            
+            entry.update({'code': listing.code, 'name': listing.name, 'market': listing.market})
+            item = quotes.get(listing.code)
+            if not item:
+                entry.update({'ok': False, 'error': error or '주가 정보를 가져올 수 없습니다.'})
+                continue
+            
+            try:
+                entry.update({
+                    'ok': True,
+                    'price': int(item.get('clpr', 0)),
+                    'change': int(item.get('vs', 0)),
+                    'change_rate': float(item.get('fltRt', 0)),
+                    'base_date': item.get('basDt'),
+                })
+                base_dates.add(item.get('basDt'))
+            except (TypeError, ValueError) as e:
+                entry.update({'ok': False, 'error': f"주가 데이터 형식 오류: {str(e)}"})
+        
+        return {
+            'base_date': max((d for d in base_dates if d), default=None),
+            'results': results,
         }
+    
+    def _fetch_quotes(self, listings):
+        """종목코드 → 최신 시세 item (업스트림 호출 최소화)"""
+        codes = {listing.code for listing in listings}
+        
+        # 캐시에 있는 종목은 업스트림 호출 없이 사용
+        quotes = {}
+        for code in list(codes):
+            found, item = quote_cache.lookup(code)
+            if found and item:
+                quotes[code] = item
+                codes.discard(code)
+        if not codes:
+            return quotes
+        listings = [listing for listing in listings if listing.code in codes]
+        
+        # 종목이 적으면 종목별 조회를 동시에 실행하는 편이 호출 수가 적음
+        if len(codes) <= STOCK_BATCH_SINGLE_THRESHOLD:
+            futures = {code: _stock_executor.submit(self._get_stock_price, code) for code in codes}
+            for code, future in futures.items():
+                item = future.result()
+                if item:
+                    quotes[code] = item
+            return quotes
+        
+        # 1. 최신 기준일 확인 (1건 조회, 거래정지 종목이면 다음 종목으로 최대 3번)
+        base_date = None
+        for code in sorted(codes)[:3]:
+            latest = self._get_stock_price(code)
+            if latest and latest.get('basDt'):
+                quotes[code] = latest
+                base_date = latest['basDt']
+                break
+        if not base_date:
+            return quotes
         
-        return stock_codes.get(stock_name)
+        # 2. 시장별로 기준일 전체 시세를 큰 페이지로 받아 필요한 종목만 골라냄
+        markets = {listing.market for listing in listings}
+        if not markets <= {'KOSPI', 'KOSDAQ', 'KONEX'}:
+            markets = {None}
+        
+        for market in markets:
+            params = {'basDt': base_date, 'numOfRows': str(STOCK_BATCH_PAGE_SIZE)}
+            if market:
+                params['mrktCls'] = market
+            
+            items, total_count = self._request_price_items(dict(params, pageNo='1'))
+            self._collect_quotes(items, codes, quotes)
+            if codes <= quotes.keys():
+                break
+            
+            # 나머지 페이지는 동시에 조회
+            pages = range(2, -(-total_count // STOCK_BATCH_PAGE_SIZE) + 1)
+            futures = [_stock_executor.submit(self._request_price_items, dict(params, pageNo=str(page))) for page in pages]
+            for future in futures:
+                items, _ = future.result()
+                self._collect_quotes(items, codes, quotes)
+        
+        return quotes
+    
+    def fetch_listings(self, base_date=None):
+        """기준일 전체 시세에서 상장 종목 목록 → [{'code', 'name', 'market'}] (종목 스냅샷 갱신용, 오류는 예외로 전달)
+        
+        base_date를 생략하면 삼성전자 최신 시세의 기준일을 사용합니다.
+        """
+        if base_date is None:
+            items, _ = self._request_price_items(self._latest_price_params('005930'))
+            base_date = max((item.get('basDt', '') for item in items), default='')
+            if not base_date:
+                raise StockApiError('03', '최근 기준일 시세가 없습니다.')
+        
+        params = {'basDt': base_date, 'numOfRows': str(STOCK_BATCH_PAGE_SIZE)}
+        items, total_count = self._request_price_items(dict(params, pageNo='1'))
+        pages = range(2, -(-total_count // STOCK_BATCH_PAGE_SIZE) + 1)
+        futures = [_stock_executor.submit(self._request_price_items, dict(params, pageNo=str(page))) for page in pages]
+        for future in futures:
+            items += future.result()[0]
+        
+        listings = {}
+        for item in items:
+            code = _short_code(item)
+            name = str(item.get('itmsNm', '')).strip()
+            if code and name:
+                listings[code] = {'code': code, 'name': name, 'market': str(item.get('mrktCtg', '')).strip()}
+        return [listings[code] for code in sorted(listings)]
+    
+    def _collect_quotes(self, items, codes, quotes):
+        for item in items:
+            code = _short_code(item)
+            if code in codes and code not in quotes:
+                quotes[code] = item
+                cache_quote(code, item)
     
     def _get_stock_price(self, stock_code):
-        """종목코드로 주가 정보 조회"""
+        """종목코드로 최신 주가 정보 조회 (다음 거래일 데이터가 나올 때까지 캐시)"""
+        found, item = quote_cache.lookup(stock_code)
+        if found:
+            return item
+        
         try:
-            # 공공데이터포털 한국거래소 상장정보 API
-            url = f"{self.base_url}/getStockPriceInfo"
-            params = {
-                'serviceKey': self.api_key,
-                'numOfRows': '1',
-                'pageNo': '1',
-                'resultType': 'json',
-                'likeSrtnCd': stock_code
-            }
-            
-            response = requests.get(url, params=params, timeout=15)
-            response.raise_for_status()
-            
-            # JSON 응답 파싱
-            if response.text.strip().startswith('<'):
-                # XML 응답인 경우
-                return self._parse_xml_stock_response(response.text)
-            else:
-                data = response.json()
-                
-                # API 응답 구조 확인
-                if 'response' in data:
-                    header = data.get('response', {}).get('header', {})
-                    if header.get('resultCode') != '00':
-                        return None
-                    
-                    items = data.get('response', {}).get('body', {}).get('items', {})
-                    if isinstance(items, dict) and 'item' in items:
-                        items = items['item']
-                        return items[0] if isinstance(items, list) and items else items
-                
-                return None
+            items, _ = self._request_price_items(self._latest_price_params(stock_code))
+            return self._pick_latest(stock_code, items)
             
         except Exception as e:
-            print(f"주가 API 호출 오류: {e}")
+            log_event('stock_price_error', level='warning', code=stock_code, error=str(e))
             return None
     
-    def _parse_xml_stock_response(self, xml_text):
-        """XML 응답을 파싱합니다"""
+    async def _get_stock_price_async(self, stock_code):
+        """_get_stock_price의 비동기 버전"""
+        found, item = quote_cache.lookup(stock_code)
+        if found:
+            return item
+        
         try:
-            import xml.etree.ElementTree as ET
-            root = ET.fromstring(xml_text)
-            
-            # XML에서 오류 코드 확인
-            result_code = root.find('.//resultCode')
-            if result_code is not None and result_code.text != '00':
-                return None
-            
-            # 데이터 항목 찾기
-            items = root.findall('.//item')
-            if items:
-                item = items[0]
-                return {
-                    'mrktCtg': item.find('mrktCtg').text if item.find('mrktCtg') is not None else '',
-                    'clpr': item.find('clpr').text if item.find('clpr') is not None else '0',
-                    'vs': item.find('vs').text if item.find('vs') is not None else '0',
-                    'fltRt': item.find('fltRt').text if item.find('fltRt') is not None else '0'
-                }
+            items, _ = await self._request_price_items_async(self._latest_price_params(stock_code))
+            return self._pick_latest(stock_code, items)
             
+        except Exception as e:
+            log_event('stock_price_error', level='warning', code=stock_code, error=str(e))
             return None
-            
-        except Exception:
+    
+    def _latest_price_params(self, stock_code):
+        """최근 2주 안의 종목 시세 요청 파라미터"""
+        begin = (datetime.now() - timedelta(days=14)).strftime('%Y%m%d')
+        return {
+            'numOfRows': '10',
+            'pageNo': '1',
+            'likeSrtnCd': stock_code,
+            'beginBasDt': begin,
+        }
+    
+    def _pick_latest(self, stock_code, items):
+        """해당 종목의 가장 최근 기준일 시세를 골라 캐시 (응답에 해당 종목이 없으면 None)"""
+        items = [item for item in items if _short_code(item) == stock_code]
+        if not items:
             return None
+        
+        item = max(items, key=lambda i: i.get('basDt', ''))
+        cache_quote(stock_code, item)
+        return item
+    
+    def _request_price_items(self, params):
+        """getStockPriceInfo 호출 → (item 목록, 전체 건수), 오류 코드는 예외로 전달"""
+        # 공공데이터포털 한국거래소 상장정보 API
+        url = f"{self.base_url}/getStockPriceInfo"
+        response = http_client.get('stock', url, params=dict(params, serviceKey=self.api_key, resultType='json'))
+        return self._parse_price_response(response)
+    
+    async def _request_price_items_async(self, params):
+        """_request_price_items의 비동기 버전"""
+        url = f"{self.base_url}/getStockPriceInfo"
+        response = await async_runtime.get('stock', url, params=dict(params, serviceKey=self.api_key, resultType='json'))
+        return self._parse_price_response(response)
+    
+    def _parse_price_response(self, response):
+        """getStockPriceInfo 응답 → (item 목록, 전체 건수)"""
+        response.raise_for_status()
+        
+        if response.text.strip().startswith('<'):
+            # XML 응답인 경우
+            return self._parse_xml_stock_response(response.text)
+        
+        data = response.json()
+        header = data.get('response', {}).get('header', {})
+        if header.get('resultCode') != '00':
+            raise StockApiError(header.get('resultCode'), header.get('resultMsg'))
+        
+        body = data.get('response', {}).get('body', {})
+        items = body.get('items', {})
+        items = items.get('item', []) if isinstance(items, dict) else []
+        if isinstance(items, dict):
+            items = [items]
+        return items, int(body.get('totalCount') or len(items))
     
-    def _format_stock_info(self, stock_name, stock_code, stock_data):
-        """주가 정보를 포맷팅합니다"""
+    def _parse_xml_stock_response(self, xml_text):
+        """XML 응답을 파싱합니다 → (item 목록, 전체 건수)"""
+        import xml.etree.ElementTree as ET
+        root = ET.fromstring(xml_text)
+        
+        # XML에서 오류 코드 확인
+        result_code = root.find('.//resultCode')
+        if result_code is not None and result_code.text != '00':
+            result_msg = root.find('.//resultMsg')
+            raise StockApiError(result_code.text, result_msg.text if result_msg is not None else '')
+        
+        # 데이터 항목 찾기
+        items = [{child.tag: (child.text or '') for child in item} for item in root.findall('.//item')]
+        total_count = root.find('.//totalCount')
+        return items, int(total_count.text) if total_count is not None and total_count.text else len(items)
+    
+    def _stock_result(self, stock_name, stock_code, stock_data):
+        """시세 item → StockResult"""
         try:
-            # 현재가와 등락 정보 추출
-            current_price = int(stock_data.get('clpr', 0))  # 종가
-            change_amount = int(stock_data.get('vs', 0))    # 전일대비
-            change_rate = float(stock_data.get('fltRt', 0)) # 등락률
-            
-            # 등락 방향 결정
-            if change_rate > 0:
-                emoji = "📈"
-                sign = "+"
-                color = "🔴"
-            elif change_rate < 0:
-                emoji = "📉"
-                sign = ""
-                color = "🔵"
-            else:
-                emoji = "📊"
-                sign = ""
-                color = "⚪"
-            
-            result = f"{emoji} {stock_name} ({stock_code})\n\n"
-            result += f"💰 현재가: {current_price:,}원\n"
-            result += f"{color} 전일대비: {sign}{change_amount:,}원\n"
-            result += f"📊 등락률: {sign}{change_rate:.2f}%\n"
-            result += f"📅 업데이트: {datetime.now().strftime('%Y-%m-%d %H:%M')}\n"
-            result += f"📈 거래소: {stock_data.get('mrktCtg', 'KRX')}"
-            
-            return result
-            
+            return StockResult(
+                stock_name,
+                stock_code,
+                price=int(stock_data.get('clpr', 0)),      # 종가
+                change=int(stock_data.get('vs', 0)),       # 전일대비
+                rate=float(stock_data.get('fltRt', 0)),    # 등락률
+                base_date=format_base_date(stock_data.get('basDt')),
+                market=stock_data.get('mrktCtg', 'KRX'),
+            )
         except Exception as e:
             return f"주가 정보 포맷팅 오류: {str(e)}"
 
 
+def normalize_dish_name(food_name):
+    """레시피 캐시 키 (공백/대소문자 정리, '레시피' 같은 접미어 제거)"""
+    key = normalize_query(food_name)
+    for suffix in (' 레시피', '레시피', ' 만드는 법', ' 만드는법'):
+        if key.endswith(suffix) and len(key) > len(suffix):
+            key = key[:-len(suffix)].strip()
+            break
+    return key
+
+
+def parse_recipe_result(result):
+    """레시피 결과를 파싱하여 재료와 조리법을 분리"""
+    parts = result.split('[조리법]')
+    if len(parts) > 1:
+        # 조리법 부분을 정규표현식으로 분리
+        steps = re.split(r'\d+\.|\n', parts[1])
+        steps = [step.strip() for step in steps if step.strip()]
+        return {
+            'ingredients': parts[0].strip(),
+            'steps': steps
+        }
+    return {
+        'ingredients': result,
+        'steps': []
+    }
+
+
+# 음식 이름 → {'text': 레시피, 'parsed': parse_recipe_result 결과} 캐시
+recipe_cache = TTLCache(
+    'recipe',
+    max_size=int(os.getenv('RECIPE_CACHE_SIZE', 512)),
+    ttl=int(os.getenv('RECIPE_CACHE_TTL', 7 * 24 * 3600)),
+    store=SQLiteStore('recipe', max_entries=int(os.getenv('RECIPE_CACHE_DISK_MAX', 5000))),
+    key_func=normalize_dish_name,
+)
+
+
 class RecipeService:
     """OpenAI API를 사용한 레시피 서비스"""
     
@@ -335,88 +620,455 @@ class RecipeService:
         self.openai_api_key = os.getenv('OPENAI_API_KEY')
     
     def get_recipe(self, food_name):
-        """음식 이름으로 레시피 정보를 가져옵니다 - OpenAI Chain 사용"""
+        """음식 이름으로 레시피 정보를 가져옵니다 - OpenAI Chain 사용 (캐시 우선)"""
+        cached = recipe_cache.get(food_name)
+        if cached:
+            return cached['text']
+        
         if not self.openai_api_key:
             return f"🍳 {food_name} 레시피\n\n⚠️ OpenAI API 키가 설정되지 않았습니다.\n📝 OpenAI API 키 설정: 환경변수 OPENAI_API_KEY에 키 입력"
         
         try:
-            from openai import OpenAI
-            
-            # OpenAI 클라이언트 초기화 (v1.0+ 방식)
-            client = OpenAI(api_key=self.openai_api_key)
-            
-            # Chain 1: 레시피 기본 정보 생성
-            basic_prompt = f"""
-            '{food_name}' 요리의 레시피를 한국어로 작성해주세요.
-            
-            다음 형식으로 작성해주세요:
-            🍳 [음식명] 레시피
-            
-            📊 영양 정보 (1인분당)
-            • 칼로리: [칼로리]kcal
-            • 단백질: [단백질]g
-            • 지방: [지방]g
-            • 탄수화물: [탄수화물]g
-            
-            🥘 재료 ([인분]분)
-            • [재료명] [양]
-            • [재료명] [양]
-            ...
-            
-            👩‍🍳 조리법
-            1. [단계별 설명]
-            2. [단계별 설명]
-            ...
-            
-            💡 요리 팁
-            • [유용한 팁]
-            
-            정확하고 실용적인 레시피를 제공해주세요.
-            """
-            
-            response1 = client.chat.completions.create(
-                model="gpt-3.5-turbo",
-                messages=[
-                    {"role": "system", "content": "당신은 전문 요리사입니다. 정확하고 따라하기 쉬운 레시피를 제공합니다."},
-                    {"role": "user", "content": basic_prompt}
-                ],
-                max_tokens=1000,
-                temperature=0.7
-            )
-            
-            basic_recipe = response1.choices[0].message.content.strip()
-            
-            # Chain 2: 레시피 개선 및 추가 정보
-            improvement_prompt = f"""
-            다음 레시피를 검토하고 개선해주세요:
-            
-            {basic_recipe}
-            
-            개선 사항:
-            1. 조리 시간과 난이도 추가
-            2. 대체 재료 제안
-            3. 보관 방법 추가
-            4. 더 자세한 조리 팁
-            
-            개선된 레시피를 제공해주세요.
-            """
-            
-            response2 = client.chat.completions.create(
-                model="gpt-3.5-turbo",
-                messages=[
-                    {"role": "system", "content": "당신은 레시피 검토 전문가입니다. 레시피를 더 완벽하고 실용적으로 만듭니다."},
-                    {"role": "user", "content": improvement_prompt}
-                ],
-                max_tokens=1200,
-                temperature=0.5
-            )
-            
-            improved_recipe = response2.choices[0].message.content.strip()
+            recipe = self.generate_recipe(food_name)
+        except Exception as e:
+            return f"🍳 {food_name} 레시피\n\n❌ OpenAI API 오류: {str(e)}\n\n💡 API 키를 확인하고 다시 시도해주세요."
+        
+        self.store_recipe(food_name, recipe)
+        return recipe
+    
+    async def get_recipe_async(self, food_name):
+        """get_recipe의 비동기 버전 → RecipeResult (오류/안내는 문자열, 캐시 읽기/쓰기는 스레드에서)"""
+        cached = await asyncio.to_thread(recipe_cache.get, food_name)
+        if cached:
+            return RecipeResult(food_name, cached['text'], cached['parsed'])
+        
+        if not self.openai_api_key:
+            return await asyncio.to_thread(self.get_recipe, food_name)
+        
+        try:
+            basic_recipe = await llm_client.acomplete(self._basic_request(food_name), name='recipe_basic')
+            recipe = await llm_client.acomplete(self._improvement_request(basic_recipe), name='recipe_improve')
+        except Exception as e:
+            return f"🍳 {food_name} 레시피\n\n❌ OpenAI API 오류: {str(e)}\n\n💡 API 키를 확인하고 다시 시도해주세요."
+        
+        entry = await asyncio.to_thread(self.store_recipe, food_name, recipe)
+        return RecipeResult(food_name, entry['text'], entry['parsed'])
+    
+    def store_recipe(self, food_name, recipe, ttl=None):
+        """생성된 레시피와 파싱 결과를 캐시에 저장 (저장한 항목 반환)"""
+        entry = {'text': recipe, 'parsed': parse_recipe_result(recipe)}
+        recipe_cache.set(food_name, entry, ttl=ttl)
+        return entry
+    
+    def stream_recipe(self, food_name):
+        """레시피 생성 과정을 (이벤트, 데이터) 순서로 내보냅니다 (SSE용)
+        
+        이벤트: 'stage'(단계 시작), 'token'(생성된 글자 조각), 'done'(최종 결과), 'error'
+        """
+        cached = recipe_cache.get(food_name)
+        if cached:
+            yield 'done', {'text': cached['text'], 'parsed': cached['parsed'], 'cached': True}
+            return
+        
+        if not self.openai_api_key:
+            text = self.get_recipe(food_name)
+            yield 'done', {'text': text, 'parsed': parse_recipe_result(text)}
+            return
+        
+        try:
+            # Chain 1: 기본 레시피 (생성되는 대로 전달)
+            yield 'stage', {'stage': 1, 'label': '기본 레시피 작성 중'}
+            chunks = []
+            for delta in llm_client.stream(self._basic_request(food_name), name='recipe_basic'):
+                chunks.append(delta)
+                yield 'token', {'stage': 1, 'text': delta}
+            basic_recipe = ''.join(chunks).strip()
             
-            return improved_recipe
+            # Chain 2: 개선된 레시피
+            yield 'stage', {'stage': 2, 'label': '레시피 다듬는 중'}
+            chunks = []
+            for delta in llm_client.stream(self._improvement_request(basic_recipe), name='recipe_improve'):
+                chunks.append(delta)
+                yield 'token', {'stage': 2, 'text': delta}
+            recipe = ''.join(chunks).strip()
             
         except Exception as e:
-            return f"🍳 {food_name} 레시피\n\n❌ OpenAI API 오류: {str(e)}\n\n💡 API 키를 확인하고 다시 시도해주세요."
+            yield 'error', {'message': f"🍳 {food_name} 레시피\n\n❌ OpenAI API 오류: {str(e)}\n\n💡 API 키를 확인하고 다시 시도해주세요."}
+            return
+        
+        entry = self.store_recipe(food_name, recipe)
+        yield 'done', {'text': recipe, 'parsed': entry['parsed']}
+    
+    def generate_recipe(self, food_name):
+        """2단계 GPT 체인으로 레시피 생성 (오류는 예외로 전달)"""
+        basic_recipe = llm_client.complete(self._basic_request(food_name), name='recipe_basic')
+        return llm_client.complete(self._improvement_request(basic_recipe), name='recipe_improve')
+    
+    def _basic_request(self, food_name):
+        """Chain 1: 레시피 기본 정보 생성 요청"""
+        basic_prompt = f"""
+        '{food_name}' 요리의 레시피를 한국어로 작성해주세요.
+        
+        다음 형식으로 작성해주세요:
+        🍳 [음식명] 레시피
+        
+        📊 영양 정보 (1인분당)
+        • 칼로리: [칼로리]kcal
+        • 단백질: [단백질]g
+        • 지방: [지방]g
+        • 탄수화물: [탄수화물]g
+        
+        🥘 재료 ([인분]분)
+        • [재료명] [양]
+        • [재료명] [양]
+        ...
+        
+        👩‍🍳 조리법
+        1. [단계별 설명]
+        2. [단계별 설명]
+        ...
+        
+        💡 요리 팁
+        • [유용한 팁]
+        
+        정확하고 실용적인 레시피를 제공해주세요.
+        """
+        
+        return dict(
+            model="gpt-3.5-turbo",
+            messages=[
+                {"role": "system", "content": "당신은 전문 요리사입니다. 정확하고 따라하기 쉬운 레시피를 제공합니다."},
+                {"role": "user", "content": basic_prompt}
+            ],
+            max_tokens=1000,
+            temperature=0.7
+        )
+    
+    def _improvement_request(self, basic_recipe):
+        """Chain 2: 레시피 개선 및 추가 정보 요청"""
+        improvement_prompt = f"""
+        다음 레시피를 검토하고 개선해주세요:
+        
+        {basic_recipe}
+        
+        개선 사항:
+        1. 조리 시간과 난이도 추가
+        2. 대체 재료 제안
+        3. 보관 방법 추가
+        4. 더 자세한 조리 팁
+        
+        개선된 레시피를 제공해주세요.
+        """
+        
+        return dict(
+            model="gpt-3.5-turbo",
+            messages=[
+                {"role": "system", "content": "당신은 레시피 검토 전문가입니다. 레시피를 더 완벽하고 실용적으로 만듭니다."},
+                {"role": "user", "content": improvement_prompt}
+            ],
+            max_tokens=1200,
+            temperature=0.5
+        )
+
+
+def quote_topic_key(keyword=None):
+    """명언 주제 키 (키워드 없음은 '*')"""
+    keyword = normalize_query(keyword or '')
+    return keyword or '*'
+
+
+# 주제 → 미리 생성된 명언 목록 (pregenerate.py 가 채움)
+quote_store = TTLCache(
+    'quote_store',
+    max_size=int(os.getenv('QUOTE_STORE_SIZE', 256)),
+    ttl=int(os.getenv('QUOTE_STORE_TTL', 30 * 24 * 3600)),
+    store=SQLiteStore('quote_store'),
+)
+
+
+# 명언 풀 설정
+QUOTE_POOL_TOPICS_PATH = os.getenv(
+    'QUOTE_POOL_TOPICS_PATH',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'popular_quote_topics.txt')
+)
+QUOTE_POOL_SIZE = int(os.getenv('QUOTE_POOL_SIZE', 10))            # 주제별로 준비해 둘 명언 수
+QUOTE_POOL_LOW_WATER = int(os.getenv('QUOTE_POOL_LOW_WATER', 3))   # 이보다 적게 남으면 다시 채움
+QUOTE_POOL_WORKERS = int(os.getenv('QUOTE_POOL_WORKERS', 2))       # 동시에 채우는 주제 수
+QUOTE_POOL_HISTORY = 200                                          # 주제별로 기억해 두는 제공한 명언 수 (중복 방지)
+QUOTE_POOL_RETRY = 60                                             # 생성 실패 후 같은 주제 재시도 간격(초)
+QUOTE_POOL_CHECK_INTERVAL = float(os.getenv('QUOTE_POOL_CHECK_INTERVAL', 5))  # 다른 워커가 꺼내 간 만큼 채우려고 남은 수를 확인하는 주기(초)
+
+
+def load_quote_topics(path=QUOTE_POOL_TOPICS_PATH):
+    """명언 주제 목록 파일 읽기 (빈 줄, # 주석 제외)"""
+    topics = []
+    try:
+        with open(path, encoding='utf-8') as f:
+            for line in f:
+                line = line.split('#', 1)[0].strip()
+                if line and line not in topics:
+                    topics.append(line)
+    except OSError as e:
+        log_event('quote_topics_load_error', level='error', path=path, error=str(e))
+    return topics
+
+
+def quote_identity(quote):
+    """같은 명언인지 비교하는 키 (따옴표 안 문장, 없으면 전체 내용)"""
+    match = re.search(r'"([^"]+)"', quote)
+    return ''.join((match.group(1) if match else quote).split())
+
+
+class QuotePoolStore:
+    """주제별로 준비된 명언 목록 (SQLite 파일, serve.py 워커 프로세스들이 함께 꺼내 씀)
+
+    꺼내기는 DELETE ... RETURNING 한 번으로 처리하므로 같은 명언이 두 워커에 나가지 않고,
+    서버를 다시 시작해도 남은 명언을 그대로 씁니다.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or CACHE_DB_PATH
+        self._conn = None
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=5, check_same_thread=False)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS quote_pool ('
+                'id INTEGER PRIMARY KEY AUTOINCREMENT, topic TEXT NOT NULL, quote TEXT NOT NULL)'
+            )
+            conn.execute('CREATE INDEX IF NOT EXISTS quote_pool_topic ON quote_pool (topic, id)')
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def push(self, topic, quote):
+        try:
+            with self._lock:
+                conn = self._connect()
+                with conn:
+                    conn.execute('INSERT INTO quote_pool (topic, quote) VALUES (?, ?)', (topic, quote))
+        except sqlite3.Error as e:
+            log_event('quote_pool_store_error', level='error', op='push', topic=topic, error=str(e))
+
+    def pop(self, topic):
+        """가장 먼저 준비된 명언 하나를 꺼냄 (없으면 None)"""
+        try:
+            with self._lock:
+                conn = self._connect()
+                with conn:
+                    row = conn.execute(
+                        'DELETE FROM quote_pool WHERE id = ('
+                        'SELECT id FROM quote_pool WHERE topic = ? ORDER BY id LIMIT 1) RETURNING quote',
+                        (topic,)
+                    ).fetchone()
+        except sqlite3.Error as e:
+            log_event('quote_pool_store_error', level='error', op='pop', topic=topic, error=str(e))
+            return None
+        return row[0] if row else None
+
+    def quotes(self, topic):
+        try:
+            with self._lock:
+                rows = self._connect().execute(
+                    'SELECT quote FROM quote_pool WHERE topic = ? ORDER BY id', (topic,)
+                ).fetchall()
+        except sqlite3.Error as e:
+            log_event('quote_pool_store_error', level='error', op='read', topic=topic, error=str(e))
+            return []
+        return [row[0] for row in rows]
+
+    def counts(self):
+        """주제 키 → 남은 명언 수"""
+        try:
+            with self._lock:
+                rows = self._connect().execute(
+                    'SELECT topic, COUNT(*) FROM quote_pool GROUP BY topic'
+                ).fetchall()
+        except sqlite3.Error as e:
+            log_event('quote_pool_store_error', level='error', op='count', error=str(e))
+            return {}
+        return dict(rows)
+
+    def count(self, topic):
+        return self.counts().get(topic, 0)
+
+
+class QuotePool:
+    """자주 찾는 주제별로 명언을 미리 만들어 두고 바로 꺼내 주는 풀 (백그라운드 보충)
+
+    준비된 명언은 QuotePoolStore(공유 SQLite)에 두므로 serve.py 의 모든 워커가 꺼내 쓰고,
+    보충은 fill=True 로 시작한 워커 하나만 합니다.
+    """
+
+    def __init__(self, store=None, size=QUOTE_POOL_SIZE, low_water=QUOTE_POOL_LOW_WATER,
+                 max_workers=QUOTE_POOL_WORKERS):
+        self.store = store if store is not None else QuotePoolStore()
+        self.size = size
+        self.low_water = low_water
+        self.max_workers = max_workers
+        self.generator = None
+
+        self._keywords = {}      # 주제 키 → 생성에 쓸 키워드 (주제 없음은 None)
+        self._served = {}        # 주제 키 → 최근 만든/보유한 명언 키 (OrderedDict, 중복 방지)
+        self._failed_at = {}     # 주제 키 → 마지막 생성 실패 시각
+        self._pending = set()
+        self._queue = Queue()
+        self._lock = threading.Lock()
+        self._threads = []
+        self._stop = threading.Event()
+
+        self.taken = 0
+        self.empty = 0
+        self.generated = 0
+        self.duplicates = 0
+        self.errors = 0
+
+    def start(self, generator, topics=None, fill=True):
+        """주제 목록을 등록하고, fill이면 generator(keyword)로 풀을 채우기 시작 (pregenerate.py 결과가 있으면 먼저 사용)"""
+        if self.is_running():
+            return
+        topics = load_quote_topics() if topics is None else topics
+        with self._lock:
+            for topic in topics:
+                keyword = None if topic == '*' else topic
+                self._keywords[quote_topic_key(keyword)] = keyword
+        if not fill:
+            return
+
+        self.generator = generator
+        self._stop.clear()
+        for key in list(self._keywords):
+            # 이전 실행에서 남은 명언은 중복 확인에 넣고, 모자라면 미리 생성된 명언으로 채움
+            pooled = self.store.quotes(key)
+            with self._lock:
+                served = self._served.setdefault(key, OrderedDict())
+                for quote in pooled:
+                    served[quote_identity(quote)] = True
+            stored = list(quote_store.get(key) or [])
+            random.shuffle(stored)
+            for quote in stored[:max(0, self.size - len(pooled))]:
+                self._add(key, quote)
+
+        self._threads = [threading.Thread(target=self._run, name=f'quote-pool-{i}', daemon=True)
+                         for i in range(self.max_workers)]
+        self._threads.append(threading.Thread(target=self._watch, name='quote-pool-watch', daemon=True))
+        for thread in self._threads:
+            thread.start()
+
+    def stop(self):
+        self._stop.set()
+        for _ in range(self.max_workers):
+            self._queue.put(None)
+        self._threads = []
+
+    def is_running(self):
+        """이 프로세스에서 풀을 쓰고 있는지 (보충은 다른 워커가 할 수도 있음)"""
+        return bool(self._keywords)
+
+    def is_filling(self):
+        return any(thread.is_alive() for thread in self._threads)
+
+    def has_topic(self, keyword=None):
+        return quote_topic_key(keyword) in self._keywords
+
+    def take(self, keyword=None):
+        """준비된 명언 하나를 꺼냄 (비어 있으면 None), 적게 남았으면 보충 요청"""
+        key = quote_topic_key(keyword)
+        quote = self.store.pop(key) if key in self._keywords else None
+        with self._lock:
+            if quote is None:
+                self.empty += 1
+            else:
+                self.taken += 1
+        if self.is_filling():
+            self._request_refill(key)
+        return quote
+
+    def status(self):
+        counts = self.store.counts() if self._keywords else {}
+        with self._lock:
+            return {
+                'running': self.is_running(),
+                'filling': self.is_filling(),
+                'size': self.size,
+                'low_water': self.low_water,
+                'taken': self.taken,
+                'empty': self.empty,
+                'generated': self.generated,
+                'duplicates': self.duplicates,
+                'errors': self.errors,
+                'topics': {key: counts.get(key, 0) for key in self._keywords},
+            }
+
+    def _add(self, key, quote):
+        """중복이 아니면 공유 풀에 추가"""
+        identity = quote_identity(quote)
+        with self._lock:
+            served = self._served[key]
+            if not identity or identity in served:
+                return False
+            served[identity] = True
+            while len(served) > QUOTE_POOL_HISTORY:
+                served.popitem(last=False)
+        self.store.push(key, quote)
+        return True
+
+    def _request_refill(self, key):
+        if key not in self._keywords or self.store.count(key) >= self.low_water:
+            return
+        with self._lock:
+            if key in self._pending or time.time() - self._failed_at.get(key, 0) < QUOTE_POOL_RETRY:
+                return
+            self._pending.add(key)
+        self._queue.put(key)
+
+    def _watch(self):
+        """다른 워커가 꺼내 간 주제도 채우도록 남은 수를 주기적으로 확인"""
+        while not self._stop.is_set():
+            for key in list(self._keywords):
+                self._request_refill(key)
+            self._stop.wait(QUOTE_POOL_CHECK_INTERVAL)
+
+    def _run(self):
+        while True:
+            key = self._queue.get()
+            if key is None:
+                return
+            try:
+                self._refill(key)
+            finally:
+                with self._lock:
+                    self._pending.discard(key)
+
+    def _refill(self, key):
+        keyword = self._keywords[key]
+        attempts = 0
+        while self.store.count(key) < self.size and attempts < self.size * 2:
+            attempts += 1
+            try:
+                with background():
+                    quote = self.generator(keyword)
+            except Exception as e:
+                with self._lock:
+                    self.errors += 1
+                    self._failed_at[key] = time.time()
+                log_event('quote_pool_refill_error', level='warning', topic=key, error=str(e))
+                return
+            added = self._add(key, quote)
+            with self._lock:
+                if added:
+                    self.generated += 1
+                else:
+                    self.duplicates += 1
+
+
+# 명언 풀 인스턴스 (app.start_background_jobs 에서 시작)
+quote_pool = QuotePool()
 
 
 class QuoteService:
@@ -427,67 +1079,121 @@ class QuoteService:
         self.openai_api_key = os.getenv('OPENAI_API_KEY')
     
     def get_quote(self, keyword=None):
-        """키워드에 맞는 명언을 생성합니다"""
+        """키워드에 맞는 명언을 생성합니다 (명언 풀 → 미리 생성된 명언 → 새로 생성 순)"""
+        if quote_pool.is_running() and quote_pool.has_topic(keyword):
+            quote = quote_pool.take(keyword)
+            if quote:
+                return quote
+            return self._get_sample_quote(keyword, notice="⏳ 새 명언을 준비하고 있어 기본 명언을 제공합니다.")
+        
+        stored = quote_store.get(quote_topic_key(keyword))
+        if stored:
+            return random.choice(stored)
+        
         if not self.openai_api_key:
             return self._get_sample_quote(keyword)
         
         try:
-            from openai import OpenAI
+            return self.generate_quote(keyword)
+        except Exception as e:
+            return f"💫 명언 서비스\n\n❌ OpenAI API 오류: {str(e)}\n\n💡 API 키를 확인하고 다시 시도해주세요."
+    
+    async def get_quote_async(self, keyword=None):
+        """get_quote의 비동기 버전 (풀/저장소에서 바로 응답할 수 없을 때만 비동기 생성)
+        
+        풀 꺼내기와 저장소 조회는 SQLite를 쓰므로 이벤트 루프를 막지 않도록 스레드에서 실행합니다.
+        """
+        if quote_pool.is_running() and quote_pool.has_topic(keyword):
+            return await asyncio.to_thread(self.get_quote, keyword)
+        
+        stored = await asyncio.to_thread(quote_store.get, quote_topic_key(keyword))
+        if stored:
+            return random.choice(stored)
+        
+        if not self.openai_api_key:
+            return self._get_sample_quote(keyword)
+        
+        try:
+            return await llm_client.acomplete(self._quote_request(keyword), name='quote')
+        except Exception as e:
+            return f"💫 명언 서비스\n\n❌ OpenAI API 오류: {str(e)}\n\n💡 API 키를 확인하고 다시 시도해주세요."
+    
+    def generate_quote(self, keyword=None, name='quote'):
+        """명언 한 건 생성 (오류는 예외로 전달)"""
+        return llm_client.complete(self._quote_request(keyword), name=name)
+    
+    def stream_quote(self, keyword=None):
+        """명언 생성 과정을 (이벤트, 데이터) 순서로 내보냅니다 (SSE용)"""
+        if quote_pool.is_running() and quote_pool.has_topic(keyword):
+            quote = quote_pool.take(keyword)
+            if quote:
+                yield 'done', {'text': quote, 'cached': True}
+                return
+        
+        if not self.openai_api_key:
+            yield 'done', {'text': self._get_sample_quote(keyword)}
+            return
+        
+        try:
+            chunks = []
+            for delta in llm_client.stream(self._quote_request(keyword), name='quote'):
+                chunks.append(delta)
+                yield 'token', {'text': delta}
             
-            # OpenAI 클라이언트 초기화
-            client = OpenAI(api_key=self.openai_api_key)
+        except Exception as e:
+            yield 'error', {'message': f"💫 명언 서비스\n\n❌ OpenAI API 오류: {str(e)}\n\n💡 API 키를 확인하고 다시 시도해주세요."}
+            return
+        
+        yield 'done', {'text': ''.join(chunks).strip()}
+    
+    def _quote_request(self, keyword=None):
+        """명언 생성 요청"""
+        # 키워드가 있는 경우와 없는 경우 구분
+        if keyword and keyword.strip():
+            prompt = f"""
+            '{keyword}'와 관련된 의미있고 감동적인 명언을 만들어주세요.
             
-            # 키워드가 있는 경우와 없는 경우 구분
-            if keyword and keyword.strip():
-                prompt = f"""
-                '{keyword}'와 관련된 의미있고 감동적인 명언을 만들어주세요.
-                
-                다음 형식으로 작성해주세요:
-                💫 오늘의 명언
-                
-                "[명언 내용]"
-                
-                - 작가 또는 인물명
-                
-                💡 해설
-                [명언의 의미와 어떻게 적용할 수 있는지 간단히 설명]
-                
-                한국어로 작성하고, 실제 존재하는 명언이거나 그와 비슷한 수준의 깊이 있는 내용으로 만들어주세요.
-                """
-            else:
-                prompt = """
-                오늘 하루를 시작하거나 마무리할 때 도움이 되는 감동적이고 의미있는 명언을 만들어주세요.
-                
-                다음 형식으로 작성해주세요:
-                💫 오늘의 명언
-                
-                "[명언 내용]"
-                
-                - 작가 또는 인물명
-                
-                💡 해설
-                [명언의 의미와 어떻게 적용할 수 있는지 간단히 설명]
-                
-                한국어로 작성하고, 실제 존재하는 명언이거나 그와 비슷한 수준의 깊이 있는 내용으로 만들어주세요.
-                """
-            
-            response = client.chat.completions.create(
-                model="gpt-3.5-turbo",
-                messages=[
-                    {"role": "system", "content": "당신은 지혜로운 철학자이자 작가입니다. 사람들에게 영감을 주는 깊이 있는 명언을 제공합니다."},
-                    {"role": "user", "content": prompt}
-                ],
-                max_tokens=500,
-                temperature=0.8
-            )
+            다음 형식으로 작성해주세요:
+            💫 오늘의 명언
             
-            return response.choices[0].message.content.strip()
+            "[명언 내용]"
             
-        except Exception as e:
-            return f"💫 명언 서비스\n\n❌ OpenAI API 오류: {str(e)}\n\n💡 API 키를 확인하고 다시 시도해주세요."
+            - 작가 또는 인물명
+            
+            💡 해설
+            [명언의 의미와 어떻게 적용할 수 있는지 간단히 설명]
+            
+            한국어로 작성하고, 실제 존재하는 명언이거나 그와 비슷한 수준의 깊이 있는 내용으로 만들어주세요.
+            """
+        else:
+            prompt = """
+            오늘 하루를 시작하거나 마무리할 때 도움이 되는 감동적이고 의미있는 명언을 만들어주세요.
+            
+            다음 형식으로 작성해주세요:
+            💫 오늘의 명언
+            
+            "[명언 내용]"
+            
+            - 작가 또는 인물명
+            
+            💡 해설
+            [명언의 의미와 어떻게 적용할 수 있는지 간단히 설명]
+            
+            한국어로 작성하고, 실제 존재하는 명언이거나 그와 비슷한 수준의 깊이 있는 내용으로 만들어주세요.
+            """
+        
+        return dict(
+            model="gpt-3.5-turbo",
+            messages=[
+                {"role": "system", "content": "당신은 지혜로운 철학자이자 작가입니다. 사람들에게 영감을 주는 깊이 있는 명언을 제공합니다."},
+                {"role": "user", "content": prompt}
+            ],
+            max_tokens=500,
+            temperature=0.8
+        )
     
-    def _get_sample_quote(self, keyword=None):
-        """OpenAI API 키가 없을 때 샘플 명언 제공"""
+    def _get_sample_quote(self, keyword=None, notice=None):
+        """OpenAI API 키가 없거나 명언 풀이 비었을 때 샘플 명언 제공"""
         sample_quotes = [
             {
                 'quote': '성공은 최종 목적지가 아니라 여행하는 과정이다.',
@@ -506,16 +1212,19 @@ class QuoteService:
             }
         ]
         
-        import random
         selected_quote = random.choice(sample_quotes)
         
         result = "💫 오늘의 명언\n\n"
-        result += "⚠️ OpenAI API 키가 설정되지 않았습니다.\n"
-        result += "기본 명언을 제공합니다.\n\n"
+        if notice:
+            result += f"{notice}\n\n"
+        else:
+            result += "⚠️ OpenAI API 키가 설정되지 않았습니다.\n"
+            result += "기본 명언을 제공합니다.\n\n"
         result += f'"{selected_quote["quote"]}"\n\n'
         result += f'- {selected_quote["author"]}\n\n'
-        result += f'💡 해설\n{selected_quote["meaning"]}\n\n'
-        result += "📝 더 다양한 명언을 원하시면 OpenAI API 키를 설정해주세요!"
+        result += f'💡 해설\n{selected_quote["meaning"]}'
+        if not notice:
+            result += "\n\n📝 더 다양한 명언을 원하시면 OpenAI API 키를 설정해주세요!"
         
         return result
 
@@ -1,17 +1,40 @@
 
-from flask import Flask, render_template, request
+from flask import Flask, render_template, request, jsonify, Response, stream_with_context
 import os
 import re
+import json
 import openai
 import requests
-import math
+import asyncio
+import time
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from dotenv import load_dotenv
-from api_services import weather_service, kakao_service, krx_service, recipe_service, quote_service
+from api_services import weather_service, kakao_service, krx_service, recipe_service, quote_service, quote_pool, format_directions, KAKAO_BASE_URL
+from cache import geocode_cache, cache_stats, normalize_query, TTLCache, SQLiteStore
+from async_runtime import async_runtime, SingleFlight
+from http_client import http_client
+from llm_client import llm_client
+from metrics import metrics, log_event, merge_expositions
+from results import WeatherResult, TextResult, StaleResult, as_result, dump_result, load_result
+from circuit import circuit_stats
+from quota import quota_governor, background
+from geo import distance_matrix, rank_by_distance
+from subway import subway_network
+from kma import CITY_COORDS, KMAApiError, get_forecast, get_forecast_async, forecast_prewarmer, latlon_to_grid
 
 # .env 파일에서 환경변수 로드
 load_dotenv()
 
+# 좌표 검색용 스레드 풀
+# - _geocode_executor: 출발지/도착지 동시 조회
+# - _search_executor: 주소/키워드 검색 동시 실행 (작업 안에서 다른 작업을 기다리지 않으므로 교착 없음)
+_geocode_executor = ThreadPoolExecutor(max_workers=int(os.getenv('GEOCODE_WORKERS', 8)), thread_name_prefix='geocode')
+_search_executor = ThreadPoolExecutor(max_workers=int(os.getenv('GEOCODE_WORKERS', 8)) * 2, thread_name_prefix='kakao-search')
+
+KAKAO_LOCAL_URL = KAKAO_BASE_URL + "/v2/local/search/{search_type}.json"
+KAKAO_API_KEY_GUIDE = "⚠️ 카카오 API 키가 설정되지 않았습니다.\n📝 .env 파일에 KAKAO_API_KEY를 설정해주세요!"
+
 def get_kakao_directions_direct(departure, destination):
     """카카오 API를 직접 호출하여 교통 정보 제공"""
     
@@ -19,122 +42,171 @@ def get_kakao_directions_direct(departure, destination):
     KAKAO_API_KEY = os.getenv('KAKAO_API_KEY')
     
     if not KAKAO_API_KEY:
-        return "⚠️ 카카오 API 키가 설정되지 않았습니다.\n📝 .env 파일에 KAKAO_API_KEY를 설정해주세요!"
+        return KAKAO_API_KEY_GUIDE
     
     try:
-        # 1. 출발지 좌표 검색
-        dep_coords = get_coordinates(departure, KAKAO_API_KEY)
+        # 1. 출발지/도착지 좌표 동시 검색
+        dep_future = _geocode_executor.submit(get_coordinates, departure, KAKAO_API_KEY)
         dest_coords = get_coordinates(destination, KAKAO_API_KEY)
+        dep_coords = dep_future.result()
         
-        if not dep_coords or not dest_coords:
-            debug_info = f"❌ 주소를 찾을 수 없습니다.\n\n"
-            debug_info += f"🔍 디버그 정보:\n"
-            debug_info += f"출발지 '{departure}' 좌표: {dep_coords}\n"
-            debug_info += f"도착지 '{destination}' 좌표: {dest_coords}\n\n"
-            debug_info += f"💡 해결 방법:\n"
-            debug_info += f"• 정확한 주소를 입력해주세요 (예: 서울특별시 강남구)\n"
-            debug_info += f"• 지하철역명 + '역'을 붙여주세요 (예: 강남역)\n"
-            debug_info += f"• 유명한 건물명을 사용해보세요 (예: 롯데타워)"
-            return debug_info
-        
-        # 2. 거리 계산
-        distance = calculate_distance(dep_coords, dest_coords)
-        estimated_time = max(int(distance * 2.5), 15)  # 대략적인 시간 계산
-        
-        result = f"🚇 {departure} → {destination}\n\n"
-        result += f"📍 직선거리: {distance:.1f}km\n"
-        result += f"⏱️ 예상 소요시간: {estimated_time}분\n\n"
-        result += "🛤️ 추천 교통수단:\n"
-        
-        if distance < 2:
-            result += "🚶‍♂️ 도보 이용 권장 (15-20분)\n"
-        elif distance < 10:
-            result += "🚌 [버스] 또는 [지하철] 이용\n"
-            result += "🚇 환승 1회 예상\n"
-        else:
-            result += "🚇 [지하철] 또는 [버스] 이용 권장\n"
-        
-        result += f"\n📱 실시간 정보는 지하철앱을 확인하세요"
+        return format_directions(departure, destination, dep_coords, dest_coords)
         
-        return result
+    except Exception as e:
+        return f"❌ 교통 정보 조회 중 오류가 발생했습니다.\n오류: {str(e)}"
+
+async def get_kakao_directions_async(departure, destination):
+    """get_kakao_directions_direct의 비동기 버전"""
+    KAKAO_API_KEY = os.getenv('KAKAO_API_KEY')
+    
+    if not KAKAO_API_KEY:
+        return KAKAO_API_KEY_GUIDE
+    
+    try:
+        dep_coords, dest_coords = await asyncio.gather(
+            get_coordinates_async(departure, KAKAO_API_KEY),
+            get_coordinates_async(destination, KAKAO_API_KEY),
+        )
+        return format_directions(departure, destination, dep_coords, dest_coords)
         
     except Exception as e:
         return f"❌ 교통 정보 조회 중 오류가 발생했습니다.\n오류: {str(e)}"
 
 def get_coordinates(address, api_key):
-    """주소를 좌표로 변환"""
+    """주소를 좌표로 변환 (캐시 우선 조회)"""
+    found, coords = geocode_cache.lookup(address)
+    if found:
+        return tuple(coords) if coords else None
+
     try:
-        # 먼저 주소 검색 시도
-        url = "https://dapi.kakao.com/v2/local/search/address.json"
-        headers = {'Authorization': f'KakaoAK {api_key}'}
-        params = {'query': address}
-        
-        response = requests.get(url, headers=headers, params=params, timeout=10)
-        print(f"주소 검색 API 응답 상태: {response.status_code}")
-        response.raise_for_status()
-        data = response.json()
-        print(f"주소 '{address}' 검색 결과: {len(data.get('documents', []))}개 발견")
-        
-        if data['documents']:
-            doc = data['documents'][0]
-            coords = float(doc['x']), float(doc['y'])
-            print(f"좌표 변환 성공: {address} -> {coords}")
-            return coords
-        
-        # 주소 검색 실패 시 키워드 검색 시도
-        print(f"주소 검색 실패, 키워드 검색 시도: {address}")
-        url = "https://dapi.kakao.com/v2/local/search/keyword.json"
-        params = {'query': address}
-        
-        response = requests.get(url, headers=headers, params=params, timeout=10)
-        response.raise_for_status()
-        data = response.json()
-        print(f"키워드 '{address}' 검색 결과: {len(data.get('documents', []))}개 발견")
-        
-        if data['documents']:
-            doc = data['documents'][0]
-            coords = float(doc['x']), float(doc['y'])
-            print(f"키워드 검색 성공: {address} -> {coords}")
-            return coords
-        
-        print(f"'{address}' 좌표 검색 완전 실패")
+        coords = search_coordinates(address, api_key)
+    except requests.exceptions.RequestException as e:
+        log_event('geocode_error', level='warning', address=address, error=str(e))
         return None
-        
+    except Exception as e:
+        log_event('geocode_error', level='error', address=address, error=repr(e))
+        return None
+
+    # 검색 실패(None)도 잠시 기억해 같은 주소로 반복 호출하지 않음
+    geocode_cache.set(address, coords)
+    return coords
+
+async def get_coordinates_async(address, api_key):
+    """get_coordinates의 비동기 버전"""
+    found, coords = geocode_cache.lookup(address)
+    if found:
+        return tuple(coords) if coords else None
+
+    try:
+        coords = await search_coordinates_async(address, api_key)
     except requests.exceptions.RequestException as e:
-        print(f"API 요청 오류 ({address}): {e}")
+        log_event('geocode_error', level='warning', address=address, error=str(e))
         return None
     except Exception as e:
-        print(f"좌표 검색 일반 오류 ({address}): {e}")
+        log_event('geocode_error', level='error', address=address, error=repr(e))
         return None
 
-def calculate_distance(coord1, coord2):
-    """두 좌표 간의 거리 계산 (km)"""
-    lat1, lon1 = coord1[1], coord1[0]
-    lat2, lon2 = coord2[1], coord2[0]
+    geocode_cache.set(address, coords)
+    return coords
+
+def search_coordinates(address, api_key):
+    """카카오 주소 검색과 키워드 검색을 동시에 실행해 좌표 조회 (요청 오류는 예외로 전달)"""
+    address_future = _search_executor.submit(kakao_local_search, 'address', address, api_key)
+    keyword_future = _search_executor.submit(kakao_local_search, 'keyword', address, api_key)
     
-    # 하버사인 공식
-    R = 6371  # 지구의 반지름 (km)
+    # 주소 검색 결과를 우선 사용하고, 없을 때만 키워드 검색 결과 사용
+    address_error = None
+    try:
+        coords = address_future.result()
+    except Exception as e:
+        address_error = e
+        coords = None
     
-    dlat = math.radians(lat2 - lat1)
-    dlon = math.radians(lon2 - lon1)
+    if coords:
+        keyword_future.cancel()
+        return coords
     
-    a = (math.sin(dlat/2) * math.sin(dlat/2) + 
-         math.cos(math.radians(lat1)) * math.cos(math.radians(lat2)) * 
-         math.sin(dlon/2) * math.sin(dlon/2))
+    log_event('geocode_keyword_fallback', address=address)
+    try:
+        coords = keyword_future.result()
+    except Exception:
+        if address_error is None:
+            raise
+        raise address_error
     
-    c = 2 * math.atan2(math.sqrt(a), math.sqrt(1-a))
-    distance = R * c
+    if coords:
+        return coords
+    if address_error is not None:
+        # 주소 검색이 오류였다면 '없음'으로 단정하지 않음 (실패 결과 캐시 방지)
+        raise address_error
     
-    return distance
+    log_event('geocode_not_found', address=address)
+    return None
 
-def get_kma_weather_direct(location):
-    """한국 기상청 API로 날씨 정보 직접 조회"""
+async def search_coordinates_async(address, api_key):
+    """search_coordinates의 비동기 버전 (주소/키워드 검색을 동시에 기다림)"""
+    address_task = asyncio.ensure_future(kakao_local_search_async('address', address, api_key))
+    keyword_task = asyncio.ensure_future(kakao_local_search_async('keyword', address, api_key))
     
-    # 환경변수에서 기상청 API 키 가져오기
-    KMA_API_KEY = os.getenv('KMA_API_KEY')
+    try:
+        # 업스트림 종류(requests/httpx, 회로 차단, 한도, 응답 형식)와 관계없이 오류는 같은 방식으로 처리
+        address_error = None
+        try:
+            coords = await address_task
+        except Exception as e:
+            address_error = e
+            coords = None
+        
+        if coords:
+            return coords
+        
+        log_event('geocode_keyword_fallback', address=address)
+        try:
+            coords = await keyword_task
+        except Exception:
+            if address_error is None:
+                raise
+            raise address_error
+        if coords:
+            return coords
+        if address_error is not None:
+            raise address_error
+        
+        log_event('geocode_not_found', address=address)
+        return None
+    finally:
+        # 기다리지 않은 키워드 검색은 취소하고, 이미 끝난 오류는 확인해 미회수 경고가 남지 않게 함
+        keyword_task.cancel()
+        if keyword_task.done() and not keyword_task.cancelled():
+            keyword_task.exception()
+
+def kakao_local_search(search_type, query, api_key):
+    """카카오 로컬 검색 (search_type: 'address' 또는 'keyword')"""
+    response = http_client.get('kakao', KAKAO_LOCAL_URL.format(search_type=search_type), metric=f'kakao_{search_type}',
+                               headers={'Authorization': f'KakaoAK {api_key}'}, params={'query': query})
+    return parse_local_search(search_type, query, response)
+
+async def kakao_local_search_async(search_type, query, api_key):
+    """kakao_local_search의 비동기 버전"""
+    response = await async_runtime.get('kakao', KAKAO_LOCAL_URL.format(search_type=search_type),
+                                       headers={'Authorization': f'KakaoAK {api_key}'}, params={'query': query},
+                                       metric=f'kakao_{search_type}')
+    return parse_local_search(search_type, query, response)
+
+def parse_local_search(search_type, query, response):
+    """카카오 로컬 검색 응답에서 첫 번째 결과의 (경도, 위도)"""
+    response.raise_for_status()
+    data = response.json()
     
-    if not KMA_API_KEY:
-        return """🌤️ 한국 기상청 날씨 서비스
+    if data['documents']:
+        doc = data['documents'][0]
+        coords = float(doc['x']), float(doc['y'])
+        log_event('geocode_found', search_type=search_type, query=query,
+                  results=len(data['documents']), coords=coords)
+        return coords
+    return None
+
+KMA_API_KEY_GUIDE = """🌤️ 한국 기상청 날씨 서비스
         
 ⚠️ 기상청 API 키가 설정되지 않았습니다.
 
@@ -146,199 +218,163 @@ def get_kma_weather_direct(location):
 5. .env 파일에 KMA_API_KEY 설정
 
 💡 무료로 하루 1000건까지 사용 가능합니다!"""
+
+def get_kma_weather_direct(location):
+    """한국 기상청 API로 날씨 정보 직접 조회"""
+    
+    # 환경변수에서 기상청 API 키 가져오기
+    KMA_API_KEY = os.getenv('KMA_API_KEY')
+    
+    if not KMA_API_KEY:
+        return KMA_API_KEY_GUIDE
     
     try:
-        # 주요 도시 좌표 (기상청 격자 좌표)
-        city_coords = {
-            '서울': {'nx': 60, 'ny': 127, 'name': '서울특별시'},
-            '부산': {'nx': 98, 'ny': 76, 'name': '부산광역시'},
-            '대구': {'nx': 89, 'ny': 90, 'name': '대구광역시'},
-            '인천': {'nx': 55, 'ny': 124, 'name': '인천광역시'},
-            '광주': {'nx': 58, 'ny': 74, 'name': '광주광역시'},
-            '대전': {'nx': 67, 'ny': 100, 'name': '대전광역시'},
-            '울산': {'nx': 102, 'ny': 84, 'name': '울산광역시'},
-            '세종': {'nx': 66, 'ny': 103, 'name': '세종특별자치시'},
-            '수원': {'nx': 60, 'ny': 121, 'name': '경기도 수원'},
-            '춘천': {'nx': 73, 'ny': 134, 'name': '강원도 춘천'},
-            '청주': {'nx': 69, 'ny': 106, 'name': '충청북도 청주'},
-            '전주': {'nx': 63, 'ny': 89, 'name': '전라북도 전주'},
-            '포항': {'nx': 102, 'ny': 94, 'name': '경상북도 포항'},
-            '제주': {'nx': 52, 'ny': 38, 'name': '제주특별자치도'}
-        }
-        
-        # 도시 찾기
-        coords = None
-        city_name = location
-        for city, coord in city_coords.items():
-            if city in location:
-                coords = coord
-                city_name = coord['name']
-                break
+        # 지역 → 기상청 격자 좌표
+        coords, city_name = resolve_weather_location(location)
         
-        if not coords:
-            # 기본값: 서울
-            coords = city_coords['서울']
-            city_name = '서울특별시 (기본값)'
-        
-        # 기상청 API 호출
+        # 기상청 API 호출 (같은 격자/발표 시각은 캐시에서 응답)
         now = datetime.now()
-        base_date = now.strftime('%Y%m%d')
-        
-        # 발표시간 결정 (기상청은 매시 30분에 발표)
-        if now.minute < 30:
-            base_time = f"{now.hour-1:02d}30"
-        else:
-            base_time = f"{now.hour:02d}30"
-        
-        if base_time == "-130":
-            base_time = "2330"
-            base_date = (now.replace(day=now.day-1)).strftime('%Y%m%d')
-        
-        url = "http://apis.data.go.kr/1360000/VilageFcstInfoService_2.0/getUltraSrtFcst"
-        params = {
-            'serviceKey': KMA_API_KEY,
-            'pageNo': '1',
-            'numOfRows': '60',
-            'dataType': 'JSON',
-            'base_date': base_date,
-            'base_time': base_time,
-            'nx': coords['nx'],
-            'ny': coords['ny']
-        }
-        
-        response = requests.get(url, params=params, timeout=15)
-        response.raise_for_status()
-        data = response.json()
-        
-        # API 응답 확인
-        header = data.get('response', {}).get('header', {})
-        if header.get('resultCode') != '00':
-            return f"⚠️ 기상청 API 오류\n코드: {header.get('resultCode')}\n메시지: {header.get('resultMsg')}"
-        
-        items = data.get('response', {}).get('body', {}).get('items', {}).get('item', [])
-        
-        if not items:
-            return f"📍 {city_name} 날씨 데이터를 찾을 수 없습니다."
-        
-        # 시간대별 데이터 파싱
-        hourly_data = {}
-        for item in items:
-            fcst_time = item['fcstTime']
-            category = item['category']
-            fcst_value = item['fcstValue']
-            
-            if fcst_time not in hourly_data:
-                hourly_data[fcst_time] = {}
-            hourly_data[fcst_time][category] = fcst_value
-        
-        # 개선된 날씨 정보 포맷팅 (UI 최적화)
-        result = f"🌤️ 날씨 정보\n"
-        result += f"📍 {city_name}\n\n"
+        try:
+            hourly_data, base_date, base_time = get_forecast(coords['nx'], coords['ny'], KMA_API_KEY, now=now)
+        except KMAApiError as e:
+            return f"⚠️ 기상청 API 오류\n코드: {e.code}\n메시지: {e.message}"
         
-        # 현재 날씨 (더 상세하고 보기 좋게)
-        current_hour = now.strftime('%H00')
-        if current_hour in hourly_data:
-            current_data = hourly_data[current_hour]
-            temp = current_data.get('T1H', 'N/A')
-            sky = current_data.get('SKY', '1')
-            pty = current_data.get('PTY', '0')
-            humidity = current_data.get('REH', 'N/A')
-            wind_speed = current_data.get('WSD', 'N/A')
-            rainfall = current_data.get('RN1', '0')
-            
-            weather_emoji, weather_desc = get_kma_weather_status(sky, pty)
-            
-            result += f"🕐 현재 날씨 ({now.strftime('%H:%M')})\n"
-            result += f"┌─────────────────────┐\n"
-            result += f"│ {weather_emoji} {weather_desc:^15} │\n"
-            
-            if temp != 'N/A':
-                result += f"│ 🌡️  온도: {temp:>8}°C │\n"
-            if humidity != 'N/A':
-                result += f"│ 💧  습도: {humidity:>8}% │\n"
-            if wind_speed != 'N/A':
-                result += f"│ 💨  바람: {wind_speed:>7}m/s │\n"
-            if rainfall != '0' and rainfall != 'N/A':
-                result += f"│ 🌧️  강수: {rainfall:>8}mm │\n"
-            
-            result += f"└─────────────────────┘\n\n"
+        return build_weather_result(city_name, hourly_data, base_date, base_time, now)
         
-        # 시간대별 예보 (카드 형태로 개선)
-        target_times = [
-            ('0900', '🌅', '오전'),
-            ('1500', '☀️', '오후'),
-            ('2100', '🌙', '저녁')
-        ]
-        
-        forecast_found = False
-        forecast_data = []
-        
-        for time_code, time_emoji, time_label in target_times:
-            if time_code in hourly_data:
-                if not forecast_found:
-                    forecast_found = True
-                    
-                time_data = hourly_data[time_code]
-                temp = time_data.get('T1H', 'N/A')
-                sky = time_data.get('SKY', '1')
-                pty = time_data.get('PTY', '0')
-                
-                weather_emoji, weather_desc = get_kma_weather_status(sky, pty)
-                
-                forecast_data.append({
-                    'time_emoji': time_emoji,
-                    'time_label': time_label,
-                    'weather_emoji': weather_emoji,
-                    'weather_desc': weather_desc,
-                    'temp': temp
-                })
-        
-        if forecast_data:
-            result += f"📅 오늘의 예보\n"
-            
-            for forecast in forecast_data:
-                result += f"{forecast['time_emoji']} {forecast['time_label']:^4} │ "
-                result += f"{forecast['weather_emoji']} {forecast['weather_desc']:^6} │ "
-                if forecast['temp'] != 'N/A':
-                    result += f"🌡️ {forecast['temp']:>3}°C"
-                result += "\n"
-            
-            result += f"\n"
-        
-        # 추가 정보 (더 보기 좋게)
-        if current_hour in hourly_data:
-            current_data = hourly_data[current_hour]
-            wind_speed = current_data.get('WSD', 'N/A')
-            rainfall = current_data.get('RN1', '0')
-            
-            # 날씨 팁 추가
-            tips = []
-            if rainfall != '0' and rainfall != 'N/A':
-                tips.append("☂️ 우산을 챙기세요")
-            elif weather_desc in ['맑음']:
-                tips.append("😎 야외활동하기 좋은 날씨")
-            elif weather_desc in ['흐림', '구름많음']:
-                tips.append("☁️ 흐린 날씨, 실내활동 추천")
-            
-            if wind_speed != 'N/A' and float(wind_speed) > 5:
-                tips.append("💨 바람이 강해요")
-            
-            if tips:
-                result += f"💡 날씨 팁\n"
-                for tip in tips:
-                    result += f"   {tip}\n"
-                result += "\n"
+    except requests.exceptions.RequestException as e:
+        return f"🌐 기상청 API 연결 오류: {str(e)}"
+    except Exception as e:
+        return f"⚠️ 날씨 서비스 오류: {str(e)}"
+
+async def get_kma_weather_async(location):
+    """get_kma_weather_direct의 비동기 버전"""
+    KMA_API_KEY = os.getenv('KMA_API_KEY')
+    
+    if not KMA_API_KEY:
+        return KMA_API_KEY_GUIDE
+    
+    try:
+        coords, city_name = await resolve_weather_location_async(location)
         
-        # 업데이트 정보
-        result += f"📊 한국기상청 │ 업데이트: {base_date[4:6]}.{base_date[6:8]} {base_time[:2]}:{base_time[2:4]}"
+        now = datetime.now()
+        try:
+            hourly_data, base_date, base_time = await get_forecast_async(coords['nx'], coords['ny'], KMA_API_KEY, now=now)
+        except KMAApiError as e:
+            return f"⚠️ 기상청 API 오류\n코드: {e.code}\n메시지: {e.message}"
         
-        return result
+        return build_weather_result(city_name, hourly_data, base_date, base_time, now)
         
     except requests.exceptions.RequestException as e:
         return f"🌐 기상청 API 연결 오류: {str(e)}"
     except Exception as e:
         return f"⚠️ 날씨 서비스 오류: {str(e)}"
 
+def build_weather_result(city_name, hourly_data, base_date, base_time, now):
+    """시간대별 예보 데이터 → WeatherResult (데이터가 없으면 안내 문자열)"""
+    if not hourly_data:
+        return f"📍 {city_name} 날씨 데이터를 찾을 수 없습니다."
+    
+    # 현재 날씨
+    current = None
+    current_hour = now.strftime('%H00')
+    if current_hour in hourly_data:
+        current_data = hourly_data[current_hour]
+        weather_emoji, weather_desc = get_kma_weather_status(current_data.get('SKY', '1'), current_data.get('PTY', '0'))
+        current = {
+            'emoji': weather_emoji,
+            'desc': weather_desc,
+            'temp': current_data.get('T1H', 'N/A'),
+            'humidity': current_data.get('REH', 'N/A'),
+            'wind': current_data.get('WSD', 'N/A'),
+            'rain': current_data.get('RN1', '0'),
+        }
+    
+    # 시간대별 예보
+    target_times = [
+        ('0900', '🌅', '오전'),
+        ('1500', '☀️', '오후'),
+        ('2100', '🌙', '저녁')
+    ]
+    
+    forecast_data = []
+    for time_code, time_emoji, time_label in target_times:
+        if time_code in hourly_data:
+            time_data = hourly_data[time_code]
+            weather_emoji, weather_desc = get_kma_weather_status(time_data.get('SKY', '1'), time_data.get('PTY', '0'))
+            forecast_data.append({
+                'time_emoji': time_emoji,
+                'time_label': time_label,
+                'weather_emoji': weather_emoji,
+                'weather_desc': weather_desc,
+                'temp': time_data.get('T1H', 'N/A')
+            })
+    
+    # 날씨 팁
+    tips = []
+    if current:
+        if current['rain'] != '0' and current['rain'] != 'N/A':
+            tips.append("☂️ 우산을 챙기세요")
+        elif current['desc'] in ['맑음']:
+            tips.append("😎 야외활동하기 좋은 날씨")
+        elif current['desc'] in ['흐림', '구름많음']:
+            tips.append("☁️ 흐린 날씨, 실내활동 추천")
+        
+        if current['wind'] != 'N/A' and float(current['wind']) > 5:
+            tips.append("💨 바람이 강해요")
+    
+    return WeatherResult(city_name, now.strftime('%H:%M'), current, forecast_data, tips, base_date, base_time)
+
+def resolve_weather_location(location):
+    """지역명을 기상청 격자 좌표로 변환 → ({'nx', 'ny'}, 표시 이름)
+    
+    주요 도시명은 표에서 바로 찾고, 그 외 주소는 카카오 좌표 검색 후 격자로 변환합니다.
+    """
+    keyword = location.strip()
+    matched = match_city(keyword)
+    if matched:
+        return matched
+    
+    KAKAO_API_KEY = os.getenv('KAKAO_API_KEY')
+    if KAKAO_API_KEY:
+        lonlat = get_coordinates(keyword, KAKAO_API_KEY)
+        if lonlat:
+            nx, ny = latlon_to_grid(lonlat[1], lonlat[0])
+            return {'nx': nx, 'ny': ny}, keyword
+    
+    return fallback_city(keyword)
+
+async def resolve_weather_location_async(location):
+    """resolve_weather_location의 비동기 버전"""
+    keyword = location.strip()
+    matched = match_city(keyword)
+    if matched:
+        return matched
+    
+    KAKAO_API_KEY = os.getenv('KAKAO_API_KEY')
+    if KAKAO_API_KEY:
+        lonlat = await get_coordinates_async(keyword, KAKAO_API_KEY)
+        if lonlat:
+            nx, ny = latlon_to_grid(lonlat[1], lonlat[0])
+            return {'nx': nx, 'ny': ny}, keyword
+    
+    return fallback_city(keyword)
+
+def match_city(keyword):
+    """주요 도시명과 정확히 일치하면 (격자 좌표, 표시 이름)"""
+    for city, coord in CITY_COORDS.items():
+        if keyword in (city, coord['name']):
+            return coord, coord['name']
+    return None
+
+def fallback_city(keyword):
+    """좌표 검색이 불가능할 때 도시명 포함 여부로 찾기 (없으면 서울)"""
+    for city, coord in CITY_COORDS.items():
+        if city in keyword:
+            return coord, coord['name']
+    
+    # 기본값: 서울
+    return CITY_COORDS['서울'], '서울특별시 (기본값)'
+
 def get_kma_weather_status(sky, pty):
     """기상청 코드를 날씨 상태로 변환"""
     # 강수형태 우선 체크 (PTY)
@@ -366,42 +402,259 @@ app = Flask(__name__)
 
 CATEGORIES = ['날씨', '교통', '레시피', '주가', '명언']
 
-def get_result(category, keyword=None, departure=None, destination=None):
+# 동시에 들어온 같은 get_result 요청 합치기
+result_flight = SingleFlight('get_result')
+
+# 렌더링까지 끝난 결과 객체 캐시 (명언은 매번 달라야 하므로 제외)
+RESULT_CACHE_CATEGORIES = ('날씨', '교통', '주가', '레시피')
+result_cache = TTLCache(
+    'result',
+    max_size=int(os.getenv('RESULT_CACHE_SIZE', 1024)),
+    ttl=int(os.getenv('RESULT_CACHE_TTL', 60)),
+    key_func=str,
+)
+
+# 마지막으로 성공한 결과 (업스트림이 느리거나 실패할 때 대신 제공, SQLite에 저장해 모든 워커가 함께 씀)
+# - 결과 캐시가 만료된 뒤 STALE_REVALIDATE 안: 바로 돌려주고 백그라운드에서 새로 가져옴
+# - 받아 온 뒤 STALE_IF_ERROR 안: 새로 가져오기가 실패했을 때만 돌려줌
+# 카테고리별로 호출하는 업스트림 (사용 한도가 얼마 남지 않으면 저장된 결과로만 응답)
+CATEGORY_UPSTREAMS = {'날씨': ('kma',), '교통': ('kakao',), '주가': ('stock',), '레시피': ('openai',)}
+STALE_REVALIDATE = int(os.getenv('STALE_REVALIDATE', 300))
+STALE_IF_ERROR = int(os.getenv('STALE_IF_ERROR', 86400))
+last_good_results = TTLCache(
+    'result_last_good',
+    max_size=int(os.getenv('RESULT_CACHE_SIZE', 1024)),
+    ttl=STALE_IF_ERROR,
+    store=SQLiteStore('result_last_good', max_entries=int(os.getenv('RESULT_LAST_GOOD_DISK_MAX', 5000))),
+    key_func=str,
+)
+
+# 대시보드 (여러 카테고리 동시 조회) 설정
+DASHBOARD_MAX_ITEMS = int(os.getenv('DASHBOARD_MAX_ITEMS', 20))            # 한 번에 조회할 최대 항목 수
+DASHBOARD_ITEM_TIMEOUT = float(os.getenv('DASHBOARD_ITEM_TIMEOUT', 15))    # 항목별 기본 제한 시간(초)
+DASHBOARD_MAX_TIMEOUT = 60                                                 # 요청에서 지정할 수 있는 최대 제한 시간(초)
+
+# 거리표 (여러 출발지 × 도착지) 설정
+DISTANCE_MAX_PLACES = int(os.getenv('DISTANCE_MAX_PLACES', 200))         # 한 번에 검색할 최대 장소 수 (중복 제외)
+
+def load_last_good(key):
+    """저장된 마지막 성공 결과 → (결과 객체, 저장 시각), 없거나 읽을 수 없으면 None"""
+    stored = last_good_results.get(key)
+    if not stored:
+        return None
+    try:
+        return load_result(stored['result']), stored['stored_at']
+    except (KeyError, TypeError) as e:
+        log_event('last_good_load_error', level='warning', key=str(key), error=repr(e))
+        return None
+
+def result_error_message(category, error):
+    """결과 조회 중 난 예외 → 사용자 안내 문구"""
+    if isinstance(error, (TimeoutError, requests.exceptions.Timeout)):
+        return f'{category} 정보 응답이 늦어지고 있습니다. 잠시 후 다시 시도해주세요.'
+    return f'{category} 정보 조회 중 오류가 발생했습니다: {error}'
+
+async def get_result_async(category, keyword=None, departure=None, destination=None):
+    """카테고리별 결과 (업스트림 대기는 async_runtime 이벤트 루프에서 처리)
+    
+    캐시하는 카테고리는 같은 요청이 동시에 들어오면 업스트림은 한 번만 호출하고 결과를 함께 돌려줍니다.
+    (명언은 요청마다 다른 결과를 주도록 묶지 않음)
+    """
+    key = (category, normalize_query(keyword or ''), normalize_query(departure or ''), normalize_query(destination or ''))
+    if category not in RESULT_CACHE_CATEGORIES:
+        return as_result(await compute_result_async(category, keyword, departure, destination))
+    
+    found, result = result_cache.lookup(key)
+    if found:
+        return result
+    last_good = load_last_good(key)
+    
+    async def load():
+        result = as_result(await compute_result_async(category, keyword, departure, destination))
+        # 안내/오류 메시지(TextResult)는 캐시하지 않음
+        if not isinstance(result, TextResult):
+            result_cache.set(key, result)
+            last_good_results.set(key, {'result': dump_result(result), 'stored_at': time.time()})
+        return result
+    
+    if last_good is not None:
+        result, stored_at = last_good
+        age = time.time() - stored_at
+        if any([await quota_governor.is_low_async(upstream) for upstream in CATEGORY_UPSTREAMS.get(category, ())]):
+            return StaleResult(result, age, error='API 사용 한도가 얼마 남지 않아 저장된 정보를 표시합니다.')
+        if age < result_cache.ttl + STALE_REVALIDATE:
+            # 이전 결과를 바로 돌려주고 새 결과는 백그라운드 우선순위로 (같은 키는 한 번만)
+            async def refresh():
+                with background():
+                    return await result_flight.do(key, load)
+            task = asyncio.ensure_future(refresh())
+            task.add_done_callback(lambda done: done.cancelled() or done.exception())
+            return StaleResult(result, age)
+    
+    try:
+        fresh = await result_flight.do(key, load)
+    except Exception as e:
+        if last_good is None:
+            raise
+        log_event('result_error', level='warning', category=category, error=repr(e))
+        fresh = TextResult(result_error_message(category, e))
+    if isinstance(fresh, TextResult) and last_good is not None:
+        result, stored_at = last_good
+        return StaleResult(result, time.time() - stored_at, error=fresh.text)
+    return fresh
+
+async def compute_result_async(category, keyword=None, departure=None, destination=None):
+    """카테고리별 결과 (Result 객체 또는 안내/오류 문자열)"""
     # 카테고리별로 실제 API 서비스 사용
     if category == '날씨':
-        return get_kma_weather_direct(keyword)
+        return await get_kma_weather_async(keyword)
     elif category == '교통':
         # 임시로 카카오 API 직접 구현
-        return get_kakao_directions_direct(departure, destination)
+        return await get_kakao_directions_async(departure, destination)
     elif category == '주가':
-        return krx_service.get_stock_info(keyword)
+        return await krx_service.get_stock_info_async(keyword)
     elif category == '레시피':
-        return recipe_service.get_recipe(keyword)
+        return await recipe_service.get_recipe_async(keyword)
     elif category == '명언':
-        return quote_service.get_quote(keyword)
+        return await quote_service.get_quote_async(keyword)
     
     return "지원하지 않는 카테고리입니다."
 
-def parse_recipe_result(result):
-    """레시피 결과를 파싱하여 재료와 조리법을 분리"""
-    parts = result.split('[조리법]')
-    if len(parts) > 1:
-        # 조리법 부분을 정규표현식으로 분리
-        steps = re.split(r'\d+\.|\n', parts[1])
-        steps = [step.strip() for step in steps if step.strip()]
-        return {
-            'ingredients': parts[0].strip(),
-            'steps': steps
-        }
-    return {
-        'ingredients': result,
-        'steps': []
-    }
+def get_result(category, keyword=None, departure=None, destination=None):
+    """get_result_async를 동기 코드(HTML 라우트 등)에서 호출 (시간 초과/업스트림 오류는 안내 문구로 응답)"""
+    try:
+        return async_runtime.run(get_result_async(category, keyword=keyword, departure=departure, destination=destination))
+    except Exception as e:
+        log_event('result_error', level='warning', category=category, error=repr(e))
+        return TextResult(result_error_message(category, e))
+
+def parse_api_request(category, values):
+    """JSON API 요청 값 검증 → (get_result 인자, 오류 메시지)"""
+    if category not in CATEGORIES:
+        return None, '지원하지 않는 카테고리입니다.'
+    
+    if category == '교통':
+        departure = str(values.get('departure') or '').strip()
+        destination = str(values.get('destination') or '').strip()
+        if not departure or not destination:
+            return None, '출발지와 도착지를 입력해주세요.'
+        return {'departure': departure, 'destination': destination}, None
+    
+    keyword = str(values.get('q') or values.get('keyword') or '').strip()
+    if not keyword and category != '명언':
+        return None, '검색어를 입력해주세요.'
+    return {'keyword': keyword or None}, None
+
+def parse_dashboard_request(values):
+    """대시보드 요청 검증 → (실행할 항목 [(순번, 카테고리, 인자)], 잘못된 항목 응답, 제한 시간, 오류 메시지)"""
+    items = values.get('items') if isinstance(values, dict) else None
+    if not isinstance(items, list) or not items:
+        return None, None, None, '조회할 항목을 입력해주세요. (예: {"items": [{"category": "날씨", "q": "서울"}]})'
+    if len(items) > DASHBOARD_MAX_ITEMS:
+        return None, None, None, f'한 번에 최대 {DASHBOARD_MAX_ITEMS}개까지 조회할 수 있습니다.'
+    
+    try:
+        timeout = float(values.get('timeout') or DASHBOARD_ITEM_TIMEOUT)
+    except (TypeError, ValueError):
+        timeout = DASHBOARD_ITEM_TIMEOUT
+    timeout = min(max(timeout, 0.1), DASHBOARD_MAX_TIMEOUT)
+    
+    jobs = []
+    rejected = []
+    for index, item in enumerate(items):
+        item = item if isinstance(item, dict) else {}
+        category = item.get('category')
+        params, error = parse_api_request(category, item)
+        if error:
+            rejected.append({'index': index, 'category': category, 'ok': False, 'error': error})
+        else:
+            jobs.append((index, category, params))
+    return jobs, rejected, timeout, None
+
+async def dashboard_item_async(index, category, params, timeout):
+    """대시보드 항목 하나 (제한 시간을 넘기거나 오류가 나면 그 항목만 오류로 응답)"""
+    started = time.monotonic()
+    try:
+        result = await asyncio.wait_for(get_result_async(category, **params), timeout)
+    except asyncio.TimeoutError:
+        error = f'{timeout:g}초 안에 응답하지 않았습니다.'
+    except Exception as e:
+        log_event('dashboard_item_error', level='warning', category=category, error=repr(e))
+        error = result_error_message(category, e)
+    else:
+        payload = build_api_response(category, params, result, time.monotonic() - started)
+        payload.update(index=index, ok=True)
+        return payload
+    
+    return dict(params, index=index, category=category, ok=False, error=error,
+                elapsed_ms=round((time.monotonic() - started) * 1000, 1))
+
+def parse_places(values, key):
+    """'강남역,시청' 문자열 또는 목록 → 장소 이름 목록"""
+    places = values.get(key) if isinstance(values, dict) else None
+    if isinstance(places, str):
+        places = places.split(',')
+    if not isinstance(places, list):
+        return []
+    return [str(place).strip() for place in places if str(place).strip()]
+
+def parse_positive_int(value):
+    """1 이상의 정수 (문자열 '3'도 허용), 아니면 None"""
+    if isinstance(value, (bool, float)):
+        return None
+    try:
+        value = int(value)
+    except (TypeError, ValueError):
+        return None
+    return value if value >= 1 else None
+
+async def geocode_places_async(places, api_key):
+    """장소 이름 목록 → {정규화된 이름: 좌표 또는 None} (같은 장소는 한 번만 검색)"""
+    unique = {}
+    for place in places:
+        unique.setdefault(normalize_query(place), place)
+    coords = await asyncio.gather(*(get_coordinates_async(place, api_key) for place in unique.values()))
+    return dict(zip(unique, coords))
+
+def build_distance_table(origins, destinations, coords, top=None):
+    """출발지별로 도착지까지 거리와 가까운 순위 (좌표를 못 찾은 장소는 거리 null)"""
+    origin_coords = [coords[normalize_query(place)] for place in origins]
+    dest_coords = [coords[normalize_query(place)] for place in destinations]
+    found_origins = [i for i, c in enumerate(origin_coords) if c]
+    found_dests = [j for j, c in enumerate(dest_coords) if c]
+    
+    # 좌표를 찾은 장소끼리만 한 번에 계산
+    matrix = distance_matrix([origin_coords[i] for i in found_origins], [dest_coords[j] for j in found_dests])
+    
+    rows = []
+    computed = dict(zip(found_origins, matrix))
+    for i, origin in enumerate(origins):
+        distances = [None] * len(destinations)
+        for j, distance in zip(found_dests, computed.get(i, ())):
+            distances[j] = round(distance, 3)
+        ranked = rank_by_distance(distances)
+        rows.append({
+            'origin': origin,
+            'found': i in computed,
+            'distances_km': distances,
+            'ranked': [{'index': j, 'destination': destinations[j], 'distance_km': distances[j]}
+                       for j in ranked[:top]],
+        })
+    
+    not_found = sorted({place for place, c in zip(origins + destinations, origin_coords + dest_coords) if not c})
+    return {'origins': origins, 'destinations': destinations, 'rows': rows, 'not_found': not_found}
+
+def build_api_response(category, params, result, elapsed):
+    """JSON API 응답 본문 (result는 텍스트, data는 결과 객체의 구조화된 값)"""
+    payload = dict(params, category=category, type=result.kind, result=result.text, data=result.fields(),
+                   elapsed_ms=round(elapsed * 1000, 1))
+    if isinstance(result, StaleResult):
+        payload.update(stale=True, age_s=round(result.age), refresh_error=result.error)
+    return payload
 
 @app.route('/', methods=['GET', 'POST'])
 def index():
     result = None
-    parsed_recipe = None
     selected_category = CATEGORIES[0]
     keyword = ''
     departure = ''
@@ -419,23 +672,221 @@ def index():
             keyword = request.form.get('keyword', '').strip()
             if keyword:
                 result = get_result(selected_category, keyword=keyword)
-                if selected_category == '레시피':
-                    parsed_recipe = parse_recipe_result(result)
 
     return render_template(
         'index.html',
         categories=CATEGORIES,
         selected_category=selected_category,
         result=result,
-        parsed_recipe=parsed_recipe,
         keyword=keyword,
         departure=departure,
         destination=destination
     )
 
+def sse_event(event, data):
+    """Server-Sent Events 형식의 메시지 한 건"""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+@app.route('/api/stream/<category>')
+def stream(category):
+    """레시피/명언 생성 결과를 토큰 단위로 스트리밍 (SSE, ?q=검색어)"""
+    keyword = request.args.get('q', '').strip()
+    
+    if category == '레시피':
+        if not keyword:
+            return jsonify({'error': '요리를 입력해주세요.'}), 400
+        events = recipe_service.stream_recipe(keyword)
+    elif category == '명언':
+        events = quote_service.stream_quote(keyword or None)
+    else:
+        return jsonify({'error': '스트리밍을 지원하지 않는 카테고리입니다.'}), 404
+    
+    def generate():
+        # 프록시가 연결을 끊지 않도록 바로 첫 바이트 전송
+        yield ": stream start\n\n"
+        for event, data in events:
+            yield sse_event(event, data)
+    
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+@app.route('/api/<category>', methods=['GET', 'POST'])
+def api_result(category):
+    """카테고리별 결과 JSON (GET ?q=검색어&departure=&destination= 또는 POST JSON 같은 키)
+    
+    개발 서버에서는 요청마다 스레드가 결과를 기다립니다. 대기 중 스레드를 점유하지 않으려면
+    asgi.py 로 실행하세요.
+    """
+    values = (request.get_json(silent=True) or {}) if request.method == 'POST' else request.args
+    params, error = parse_api_request(category, values)
+    if error:
+        return jsonify({'error': error}), 404 if category not in CATEGORIES else 400
+    
+    started = time.monotonic()
+    result = get_result(category, **params)
+    return jsonify(build_api_response(category, params, result, time.monotonic() - started))
+
+@app.route('/api/dashboard', methods=['POST'])
+def dashboard():
+    """여러 카테고리를 동시에 조회해 끝나는 순서대로 한 줄씩 전달 (NDJSON)
+    
+    요청: {"items": [{"category": "날씨", "q": "서울"}, {"category": "주가", "q": "삼성전자"}], "timeout": 10}
+    """
+    jobs, rejected, timeout, error = parse_dashboard_request(request.get_json(silent=True) or {})
+    if error:
+        return jsonify({'error': error}), 400
+    
+    # 모든 항목을 먼저 이벤트 루프에 넣어 동시에 실행
+    futures = [async_runtime.submit(dashboard_item_async(index, category, params, timeout))
+               for index, category, params in jobs]
+    
+    def generate():
+        for entry in rejected:
+            yield json.dumps(entry, ensure_ascii=False) + '\n'
+        for future in as_completed(futures):
+            yield json.dumps(future.result(), ensure_ascii=False) + '\n'
+    
+    return Response(
+        stream_with_context(generate()),
+        mimetype='application/x-ndjson',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+@app.route('/api/distances', methods=['GET', 'POST'])
+def distances():
+    """여러 출발지 × 도착지 직선거리표 (출발지별로 가까운 순위 포함)
+    
+    요청: GET ?origins=강남역&destinations=시청,잠실역,판교역&top=3
+          POST {"origins": ["강남역"], "destinations": ["시청", "잠실역"], "top": 3}
+    destinations를 생략하면 origins끼리의 거리표를 만듭니다.
+    """
+    values = (request.get_json(silent=True) or {}) if request.method == 'POST' else request.args
+    origins = parse_places(values, 'origins')
+    destinations = parse_places(values, 'destinations') or origins
+    if not origins:
+        return jsonify({'error': '출발지를 입력해주세요. (예: {"origins": ["강남역"], "destinations": ["시청", "잠실역"]})'}), 400
+    if len({normalize_query(place) for place in origins + destinations}) > DISTANCE_MAX_PLACES:
+        return jsonify({'error': f'한 번에 최대 {DISTANCE_MAX_PLACES}개 장소까지 조회할 수 있습니다.'}), 400
+    top = values.get('top')
+    if top not in (None, ''):
+        top = parse_positive_int(top)
+        if top is None:
+            return jsonify({'error': 'top은 1 이상의 정수로 입력해주세요.'}), 400
+    else:
+        top = None
+    
+    api_key = os.getenv('KAKAO_API_KEY')
+    if not api_key:
+        return jsonify({'error': KAKAO_API_KEY_GUIDE}), 503
+    
+    started = time.monotonic()
+    coords = async_runtime.run(geocode_places_async(origins + destinations, api_key))
+    geocoded = time.monotonic()
+    table = build_distance_table(origins, destinations, coords, top=top)
+    table.update(
+        pairs=len(origins) * len(destinations),
+        geocode_ms=round((geocoded - started) * 1000, 1),
+        compute_ms=round((time.monotonic() - geocoded) * 1000, 1),
+    )
+    return jsonify(table)
+
+@app.route('/api/stocks', methods=['GET', 'POST'])
+def stock_watchlist():
+    """여러 종목 시세 일괄 조회 (GET ?q=삼성전자,SK하이닉스 또는 POST {"tickers": [...]})"""
+    if request.method == 'POST':
+        body = request.get_json(silent=True)
+        tickers = body.get('tickers') if isinstance(body, dict) else None
+        if isinstance(tickers, str):
+            tickers = tickers.split(',')
+        if not isinstance(tickers, list) or not all(isinstance(t, str) for t in tickers):
+            return jsonify({'error': '종목 목록을 {"tickers": ["삼성전자", "SK하이닉스"]} 형식으로 보내주세요.'}), 400
+    else:
+        tickers = request.args.get('q', '').split(',')
+    
+    tickers = [t.strip() for t in tickers if t.strip()]
+    if not tickers:
+        return jsonify({'error': '조회할 종목을 입력해주세요.'}), 400
+    
+    quotes = krx_service.get_quotes(tickers)
+    quotes['failed'] = sum(1 for item in quotes['results'] if not item['ok'])
+    return jsonify(quotes)
+
+# 워커 프로세스별 통계/지표 (serve.py 워커가 주기적으로 기록, 모든 워커가 같은 파일을 읽음)
+worker_stats_store = SQLiteStore('worker_stats')
+worker_metrics_store = SQLiteStore('worker_metrics')
+
+def worker_info():
+    """현재 프로세스 정보 (serve.py 로 실행하면 워커 번호 포함)"""
+    return {'id': os.getenv('ONEWORD_WORKER_ID'), 'pid': os.getpid()}
+
+def collect_stats():
+    """현재 프로세스의 캐시/HTTP/OpenAI/비동기 실행 통계"""
+    return {
+        'worker': worker_info(),
+        'caches': cache_stats(),
+        'http': http_client.stats(),
+        'llm': llm_client.stats(),
+        'async': async_runtime.stats(),
+        'single_flight': result_flight.stats(),
+        'circuits': circuit_stats(),
+        'quota': quota_governor.stats(),
+        'kma_prewarm': forecast_prewarmer.status(),
+        'quote_pool': quote_pool.status(),
+        'subway': subway_network.status(),
+    }
+
+@app.route('/stats')
+def stats():
+    """캐시 적중/실패, HTTP 커넥션 재사용, OpenAI 호출 통계 (응답한 워커 기준)"""
+    return jsonify(collect_stats())
+
+@app.route('/stats/workers')
+def worker_stats():
+    """모든 워커의 최근 통계 (serve.py 로 실행한 경우)"""
+    return jsonify({'workers': dict(worker_stats_store.items())})
+
+def render_metrics():
+    """현재 프로세스의 지표 (serve.py 워커면 모든 시계열에 worker 레이블)"""
+    worker_id = os.getenv('ONEWORD_WORKER_ID')
+    return metrics.render(caches=cache_stats(), llm=llm_client.stats(), circuits=circuit_stats(),
+                          quota=quota_governor.stats(),
+                          labels={'worker': worker_id} if worker_id is not None else None)
+
+@app.route('/metrics')
+def prometheus_metrics():
+    """업스트림 응답 시간/오류, 캐시 적중, 진행 중 요청 수 (Prometheus 텍스트 형식)
+
+    serve.py 로 실행하면 어느 워커가 응답하든 모든 워커의 지표를 worker 레이블로 구분해 함께 내보냅니다.
+    (응답한 워커는 지금 값, 나머지는 WORKER_STATS_INTERVAL 마다 기록된 값)
+    """
+    body = render_metrics()
+    worker_id = os.getenv('ONEWORD_WORKER_ID')
+    if worker_id is not None:
+        others = [text for key, text in worker_metrics_store.items() if key != worker_id]
+        body = merge_expositions([body] + others)
+    return Response(body, content_type='text/plain; version=0.0.4; charset=utf-8')
+
+def start_background_jobs(primary=True):
+    """환경변수 설정에 따라 백그라운드 작업 시작
+
+    primary가 아니면 (serve.py 의 워커 0 이외) 미리 받기/명언 생성은 하지 않고,
+    공유 저장소에 준비된 명언을 꺼내 쓰기만 합니다.
+    """
+    async_runtime.start()
+    if primary and os.getenv('KMA_PREWARM', '0') == '1' and os.getenv('KMA_API_KEY'):
+        forecast_prewarmer.start(os.getenv('KMA_API_KEY'))
+    if os.getenv('QUOTE_POOL', '0') == '1' and os.getenv('OPENAI_API_KEY'):
+        quote_pool.start(lambda keyword: quote_service.generate_quote(keyword, name='quote_pool'), fill=primary)
+
     
 
 
 if __name__ == '__main__':
     port = int(os.environ.get("PORT", 5000))  # Railway에서 PORT 할당
+    # 디버그 리로더의 감시 프로세스에서는 백그라운드 작업을 띄우지 않음
+    if os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        start_background_jobs()
     app.run(host="0.0.0.0", port=port, debug=True)
\ No newline at end of file
@@ -0,0 +1,187 @@
+"""ASGI 진입점
+
+/api/<카테고리> 는 이벤트 루프에서 바로 처리하므로 업스트림을 기다리는 동안 스레드를 점유하지 않습니다.
+나머지 경로(HTML 화면, SSE, /stats 등)는 기존 Flask 앱을 스레드 풀에서 실행합니다.
+
+실행 예:
+    uvicorn asgi:app --host 0.0.0.0 --port 5000
+"""
+import asyncio
+import io
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qsl
+
+from app import (app as flask_app, get_result_async, parse_api_request, build_api_response, parse_dashboard_request,
+                 dashboard_item_async, result_error_message, start_background_jobs, CATEGORIES)
+from async_runtime import async_runtime
+from metrics import log_event
+from results import TextResult
+
+# Flask(WSGI) 경로를 실행할 스레드 수
+_wsgi_executor = ThreadPoolExecutor(max_workers=int(os.getenv('ASGI_WSGI_WORKERS', 16)), thread_name_prefix='wsgi')
+
+
+async def app(scope, receive, send):
+    if scope['type'] == 'lifespan':
+        await lifespan(receive, send)
+        return
+    if scope['type'] != 'http':
+        return
+
+    path = scope['path']
+    if path == '/api/dashboard' and scope['method'] == 'POST':
+        await dashboard(receive, send)
+    elif path.startswith('/api/') and path[len('/api/'):] in CATEGORIES:
+        await api_result(scope, receive, send, path[len('/api/'):])
+    else:
+        await call_wsgi(scope, receive, send)
+
+
+async def lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            start_background_jobs()
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+
+async def api_result(scope, receive, send, category):
+    """app.api_result와 같은 요청/응답 형식 (결과는 async_runtime 루프에서 계산)"""
+    body = await read_body(receive)
+    if scope['method'] == 'POST':
+        try:
+            values = json.loads(body or b'{}')
+        except ValueError:
+            values = {}
+        if not isinstance(values, dict):
+            values = {}
+    else:
+        values = dict(parse_qsl(scope['query_string'].decode('utf-8', 'replace')))
+
+    params, error = parse_api_request(category, values)
+    if error:
+        await send_json(send, 400, {'error': error})
+        return
+
+    started = time.monotonic()
+    try:
+        result = await async_runtime.wrap(get_result_async(category, **params))
+    except Exception as e:
+        log_event('result_error', level='warning', category=category, error=repr(e))
+        result = TextResult(result_error_message(category, e))
+    await send_json(send, 200, build_api_response(category, params, result, time.monotonic() - started))
+
+
+async def dashboard(receive, send):
+    """app.dashboard와 같은 형식 (NDJSON, 끝나는 순서대로 전달)"""
+    try:
+        values = json.loads(await read_body(receive) or b'{}')
+    except ValueError:
+        values = {}
+    jobs, rejected, timeout, error = parse_dashboard_request(values)
+    if error:
+        await send_json(send, 400, {'error': error})
+        return
+
+    tasks = [asyncio.ensure_future(async_runtime.wrap(dashboard_item_async(index, category, params, timeout)))
+             for index, category, params in jobs]
+    await send({
+        'type': 'http.response.start',
+        'status': 200,
+        'headers': [(b'content-type', b'application/x-ndjson; charset=utf-8'), (b'cache-control', b'no-cache')],
+    })
+    for entry in rejected:
+        await send_line(send, entry)
+    for next_done in asyncio.as_completed(tasks):
+        await send_line(send, await next_done)
+    await send({'type': 'http.response.body', 'body': b''})
+
+
+async def send_line(send, payload):
+    line = json.dumps(payload, ensure_ascii=False).encode('utf-8') + b'\n'
+    await send({'type': 'http.response.body', 'body': line, 'more_body': True})
+
+
+async def read_body(receive):
+    body = b''
+    while True:
+        message = await receive()
+        body += message.get('body', b'')
+        if not message.get('more_body'):
+            return body
+
+
+async def send_json(send, status, payload):
+    body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+    await send({
+        'type': 'http.response.start',
+        'status': status,
+        'headers': [(b'content-type', b'application/json; charset=utf-8'),
+                    (b'content-length', str(len(body)).encode())],
+    })
+    await send({'type': 'http.response.body', 'body': body})
+
+
+def build_environ(scope, body):
+    """ASGI scope → WSGI environ"""
+    server = scope.get('server') or ('localhost', 80)
+    client = scope.get('client') or ('', 0)
+    environ = {
+        'REQUEST_METHOD': scope['method'],
+        'SCRIPT_NAME': scope.get('root_path', '').encode('utf-8').decode('latin-1'),
+        'PATH_INFO': scope['path'].encode('utf-8').decode('latin-1'),
+        'QUERY_STRING': scope['query_string'].decode('latin-1'),
+        'SERVER_NAME': server[0],
+        'SERVER_PORT': str(server[1]),
+        'SERVER_PROTOCOL': f"HTTP/{scope.get('http_version', '1.1')}",
+        'REMOTE_ADDR': client[0],
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        'wsgi.input': io.BytesIO(body),
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': True,
+        'wsgi.run_once': False,
+    }
+    for name, value in scope['headers']:
+        name = name.decode('latin-1').upper().replace('-', '_')
+        value = value.decode('latin-1')
+        if name == 'CONTENT_TYPE' or name == 'CONTENT_LENGTH':
+            environ[name] = value
+            continue
+        key = f'HTTP_{name}'
+        environ[key] = f"{environ[key]},{value}" if key in environ else value
+    return environ
+
+
+async def call_wsgi(scope, receive, send):
+    """Flask 앱을 스레드 풀에서 실행하고 응답을 조각 단위로 전달 (SSE 포함)"""
+    loop = asyncio.get_running_loop()
+    environ = build_environ(scope, await read_body(receive))
+    started = {}
+
+    def start_response(status, headers, exc_info=None):
+        started['status'] = int(status.split(' ', 1)[0])
+        started['headers'] = [(k.lower().encode('latin-1'), v.encode('latin-1')) for k, v in headers]
+
+    iterable = await loop.run_in_executor(_wsgi_executor, flask_app, environ, start_response)
+    iterator = iter(iterable)
+    try:
+        # 첫 조각을 받은 뒤에야 start_response가 호출되는 앱도 있으므로 먼저 한 조각 읽음
+        chunk = await loop.run_in_executor(_wsgi_executor, next, iterator, None)
+        await send({'type': 'http.response.start', 'status': started['status'], 'headers': started['headers']})
+        while chunk is not None:
+            if chunk:
+                await send({'type': 'http.response.body', 'body': chunk, 'more_body': True})
+            chunk = await loop.run_in_executor(_wsgi_executor, next, iterator, None)
+        await send({'type': 'http.response.body', 'body': b''})
+    finally:
+        if hasattr(iterable, 'close'):
+            await loop.run_in_executor(_wsgi_executor, iterable.close)
@@ -0,0 +1,244 @@
+import asyncio
+import contextvars
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from http_client import http_client, load_service_config, RETRY_BACKOFF
+from circuit import circuit, is_upstream_failure, CircuitOpenError
+from metrics import metrics, log_event
+from quota import quota_governor, QuotaExceededError
+
+try:
+    import httpx
+except ImportError:  # httpx가 없으면 공용 세션(http_client)을 스레드 풀에서 실행
+    httpx = None
+
+ASYNC_MAX_CONNECTIONS = int(os.getenv('ASYNC_MAX_CONNECTIONS', 200))  # 서비스별 최대 동시 연결 수
+ASYNC_RESULT_TIMEOUT = float(os.getenv('ASYNC_RESULT_TIMEOUT', 120))   # 동기 호출자가 결과를 기다리는 최대 시간(초)
+ASYNC_FALLBACK_WORKERS = int(os.getenv('ASYNC_FALLBACK_WORKERS', 32))  # httpx가 없을 때 HTTP 요청용 스레드 수
+
+RETRY_STATUSES = (502, 503, 504)
+
+
+class AsyncResponse:
+    """httpx 응답을 requests.Response 처럼 쓰기 위한 최소 래퍼 (오류도 requests 예외로 변환)"""
+
+    def __init__(self, status_code, text, url):
+        self.status_code = status_code
+        self.text = text
+        self.url = url
+
+    def json(self):
+        return json.loads(self.text)
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.exceptions.HTTPError(f"{self.status_code} Error for url: {self.url}")
+
+
+class AsyncRuntime:
+    """백그라운드 스레드 하나에서 도는 asyncio 이벤트 루프
+
+    업스트림 대기는 모두 이 루프에서 코루틴으로 처리하므로, 대기 중인 요청이
+    수천 건이어도 스레드를 점유하지 않습니다. 동기 코드는 run()으로 결과를 기다립니다.
+    """
+
+    def __init__(self):
+        self._loop = None
+        self._thread = None
+        self._lock = threading.Lock()
+        self._clients = {}
+        self._configs = {}
+        self._counters = {}
+        self._fallback_executor = None
+        self.in_flight = 0   # 응답을 기다리는 업스트림 요청 수
+        self.active = 0      # 실행 중인 코루틴 수 (submit 기준)
+
+    @property
+    def loop(self):
+        if self._loop is None:
+            with self._lock:
+                if self._loop is None:
+                    loop = asyncio.new_event_loop()
+                    self._thread = threading.Thread(target=loop.run_forever, name='async-runtime', daemon=True)
+                    self._thread.start()
+                    self._loop = loop
+                    self._log_backend()
+        return self._loop
+
+    def _log_backend(self):
+        """사용하는 HTTP 방식을 시작할 때 한 번 기록 (httpx가 없으면 스레드 풀이라 경고)"""
+        if httpx is not None:
+            log_event('async_runtime_started', sampled=False, backend='httpx',
+                      max_connections=ASYNC_MAX_CONNECTIONS)
+        else:
+            log_event('async_runtime_started', level='warning', backend='thread-pool',
+                      workers=ASYNC_FALLBACK_WORKERS, hint='pip install httpx')
+
+    def start(self):
+        """이벤트 루프를 미리 띄움 (첫 요청 전에 사용하는 HTTP 방식이 로그에 남음)"""
+        return self.loop
+
+    def submit(self, coro):
+        """코루틴을 루프에 넣고 concurrent.futures.Future 반환"""
+        future = asyncio.run_coroutine_threadsafe(coro, self.loop)
+        with self._lock:
+            self.active += 1
+        future.add_done_callback(self._finished)
+        return future
+
+    def _finished(self, future):
+        with self._lock:
+            self.active -= 1
+
+    def run(self, coro, timeout=ASYNC_RESULT_TIMEOUT):
+        """동기 코드에서 코루틴 결과를 기다림 (루프 스레드 안에서는 호출 불가)"""
+        if threading.current_thread() is self._thread:
+            raise RuntimeError('이벤트 루프 스레드에서는 run()을 호출할 수 없습니다.')
+        future = self.submit(coro)
+        try:
+            return future.result(timeout)
+        except BaseException:
+            future.cancel()
+            raise
+
+    async def wrap(self, coro):
+        """다른 이벤트 루프(ASGI 서버 등)에서 이 루프의 코루틴 결과를 기다림"""
+        return await asyncio.wrap_future(self.submit(coro))
+
+    async def get(self, service, url, params=None, headers=None, metric=None):
+        """비동기 GET (서비스별 타임아웃/재시도 설정은 http_client와 동일)"""
+        counters = self._counters.setdefault(service, {'requests': 0, 'errors': 0})
+        counters['requests'] += 1
+        self.in_flight += 1
+        try:
+            if httpx is None:
+                # 지표/한도/회로 차단은 http_client.get에서 처리 (우선순위가 전달되도록 context 복사)
+                loop = asyncio.get_running_loop()
+                context = contextvars.copy_context()
+                return await loop.run_in_executor(
+                    self._executor(),
+                    lambda: context.run(http_client.get, service, url, metric=metric, params=params, headers=headers)
+                )
+            breaker = circuit(service)
+            try:
+                # 회로가 열려 있으면 한도를 쓰지 않고 바로 실패
+                breaker.before()
+                try:
+                    await quota_governor.acquire_async(service)
+                except (QuotaExceededError, asyncio.CancelledError):
+                    breaker.release()
+                    raise
+            except (QuotaExceededError, CircuitOpenError):
+                metrics.reject(metric or service)
+                raise
+            started = metrics.begin(metric or service)
+            try:
+                response = await self._httpx_get(service, url, params, headers)
+            except requests.exceptions.RequestException as e:
+                metrics.end(metric or service, started, error=e)
+                breaker.record(True)
+                raise
+            except BaseException as e:
+                metrics.end(metric or service, started, error=e)
+                raise
+            metrics.end(metric or service, started, status=response.status_code)
+            breaker.record(is_upstream_failure(status=response.status_code))
+            return response
+        except requests.exceptions.RequestException:
+            counters['errors'] += 1
+            raise
+        finally:
+            self.in_flight -= 1
+
+    async def _httpx_get(self, service, url, params, headers):
+        client = self._client(service)
+        retries = self._configs[service]['retries']
+        for attempt in range(retries + 1):
+            try:
+                response = await client.get(url, params=params, headers=headers)
+            except httpx.TimeoutException as e:
+                if attempt >= retries:
+                    raise requests.exceptions.Timeout(str(e) or 'timeout')
+            except httpx.TransportError as e:
+                if attempt >= retries:
+                    raise requests.exceptions.ConnectionError(str(e))
+            else:
+                if response.status_code not in RETRY_STATUSES or attempt >= retries:
+                    return AsyncResponse(response.status_code, response.text, str(response.url))
+            await asyncio.sleep(RETRY_BACKOFF * (2 ** attempt))
+
+    def _client(self, service):
+        client = self._clients.get(service)
+        if client is None:
+            config = load_service_config(service)
+            client = httpx.AsyncClient(
+                timeout=config['timeout'],
+                limits=httpx.Limits(max_connections=ASYNC_MAX_CONNECTIONS,
+                                    max_keepalive_connections=config['pool_maxsize']),
+            )
+            self._configs[service] = config
+            self._clients[service] = client
+        return client
+
+    def _executor(self):
+        if self._fallback_executor is None:
+            self._fallback_executor = ThreadPoolExecutor(max_workers=ASYNC_FALLBACK_WORKERS,
+                                                         thread_name_prefix='async-http')
+        return self._fallback_executor
+
+    def stats(self):
+        return {
+            'backend': 'httpx' if httpx is not None else 'thread-pool',
+            'running': self._thread is not None and self._thread.is_alive(),
+            'in_flight': self.in_flight,
+            'active': self.active,
+            'requests': {service: dict(counters) for service, counters in self._counters.items()},
+        }
+
+
+class SingleFlight:
+    """같은 키의 작업이 동시에 여러 번 요청되면 한 번만 실행하고 결과를 함께 받음
+
+    async_runtime 루프 안에서만 사용하므로 별도 잠금이 필요 없습니다.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self._calls = {}     # 키 → 실행 중인 Task
+        self.executed = 0    # 실제로 실행한 횟수
+        self.merged = 0      # 실행 중인 작업에 합쳐진 호출 수
+
+    async def do(self, key, func):
+        """func()가 돌려주는 코루틴을 키별로 한 번만 실행"""
+        task = self._calls.get(key)
+        if task is None:
+            task = asyncio.ensure_future(func())
+            self._calls[key] = task
+            self.executed += 1
+            task.add_done_callback(lambda done: self._forget(key, done))
+        else:
+            self.merged += 1
+        # 기다리던 호출자 하나가 취소되어도 공유 작업은 계속 진행
+        return await asyncio.shield(task)
+
+    def _forget(self, key, task):
+        if self._calls.get(key) is task:
+            del self._calls[key]
+
+    def stats(self):
+        total = self.executed + self.merged
+        return {
+            'executed': self.executed,
+            'merged': self.merged,
+            'merge_rate': round(self.merged / total, 4) if total else 0.0,
+            'in_flight': len(self._calls),
+        }
+
+
+# 공용 비동기 실행기 인스턴스
+async_runtime = AsyncRuntime()
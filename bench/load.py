@@ -0,0 +1,273 @@
+"""부하/지연 측정
+
+화면(POST /)과 JSON API를 지정한 동시 요청 수로 호출하고 p50/p95/p99 지연과 초당 요청 수를 출력합니다.
+결과는 실행마다 한 줄씩 JSON Lines 파일에 추가되므로 실행끼리 비교할 수 있습니다.
+
+사용 예:
+    python bench/load.py --concurrency 32 --duration 30
+    python bench/load.py --scenario api:주가=3 --scenario page:날씨 --keys 5 --label warm-cache --compare
+"""
+import argparse
+import json
+import os
+import random
+import re
+import subprocess
+import sys
+import threading
+import time
+from datetime import datetime
+
+import requests
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_DIR = os.path.join(ROOT_DIR, 'data')
+DEFAULT_OUT = os.path.join(ROOT_DIR, 'bench', 'results.jsonl')
+
+CATEGORIES = ('날씨', '교통', '주가', '레시피', '명언')
+CITIES = ['서울', '부산', '대구', '인천', '광주', '대전', '울산', '세종', '수원', '춘천', '청주', '전주', '포항', '제주']
+PLACES = ['강남역', '시청', '홍대입구역', '잠실역', '서울역', '여의도역', '판교역', '광화문']
+ERROR_MARKER = '❌'   # 명언 오류 메시지 표시 (명언은 정상 결과도 텍스트)
+
+
+def read_lines(path):
+    with open(path, encoding='utf-8') as f:
+        return [line.split('#', 1)[0].strip() for line in f if line.split('#', 1)[0].strip()]
+
+
+def load_keywords(keys):
+    """카테고리별 검색어 목록 (keys개로 제한하면 같은 검색어가 반복되어 캐시 적중이 늘어남)"""
+    stocks = [line.split(',')[1] for line in read_lines(os.path.join(DATA_DIR, 'krx_listings.csv'))[1:]]
+    keywords = {
+        '날씨': CITIES,
+        '교통': [(a, b) for a in PLACES for b in PLACES if a != b],
+        '주가': stocks,
+        '레시피': read_lines(os.path.join(DATA_DIR, 'popular_dishes.txt')),
+        '명언': [t for t in read_lines(os.path.join(DATA_DIR, 'popular_quote_topics.txt')) if t != '*'],
+    }
+    if keys:
+        keywords = {category: values[:keys] for category, values in keywords.items()}
+    return keywords
+
+
+def parse_scenarios(values):
+    """['api:주가=3', 'page:날씨'] → [(이름, 가중치)]"""
+    if not values:
+        return [(f"{kind}:{category}", 1) for kind in ('page', 'api') for category in CATEGORIES]
+    scenarios = []
+    for value in values:
+        name, _, weight = value.partition('=')
+        kind, _, category = name.partition(':')
+        if name != 'dashboard' and (kind not in ('page', 'api') or category not in CATEGORIES):
+            raise SystemExit(f"알 수 없는 시나리오: {name} (page:<카테고리>, api:<카테고리>, dashboard)")
+        scenarios.append((name, float(weight or 1)))
+    return scenarios
+
+
+def build_request(scenario, keywords):
+    """시나리오 → (method, path, requests 인자)"""
+    if scenario == 'dashboard':
+        items = [{'category': '날씨', 'q': random.choice(keywords['날씨'])},
+                 {'category': '주가', 'q': random.choice(keywords['주가'])},
+                 {'category': '명언', 'q': random.choice(keywords['명언'])}]
+        return 'POST', '/api/dashboard', {'json': {'items': items}}
+
+    kind, category = scenario.split(':', 1)
+    keyword = random.choice(keywords[category])
+    if category == '교통':
+        values = {'departure': keyword[0], 'destination': keyword[1]}
+    else:
+        values = {'keyword' if kind == 'page' else 'q': keyword}
+    if kind == 'page':
+        return 'POST', '/', {'data': dict(values, category=category)}
+    return 'GET', f'/api/{category}', {'params': values}
+
+
+def result_ok(category, kind, text):
+    """결과 종류/본문으로 성공 여부 판단 (명언 외 카테고리의 텍스트 결과는 안내/오류 메시지)"""
+    if category == '명언':
+        return ERROR_MARKER not in (text or '')
+    return kind is not None and kind != 'text'
+
+
+def response_ok(scenario, response):
+    """상태 코드와 본문으로 성공 여부 판단 (앱은 업스트림 오류도 200 + 안내 메시지로 응답)"""
+    if not 200 <= response.status_code < 300:
+        return False
+    if scenario == 'dashboard':
+        try:
+            items = [json.loads(line) for line in response.text.splitlines() if line.strip()]
+        except ValueError:
+            return False
+        return bool(items) and all(item.get('ok') and result_ok(item.get('category'), item.get('type'), item.get('result'))
+                                   for item in items)
+
+    kind, category = scenario.split(':', 1)
+    if kind == 'api':
+        try:
+            body = response.json()
+        except ValueError:
+            return False
+        return 'error' not in body and result_ok(category, body.get('type'), body.get('result'))
+    match = re.search(r'<div class="result" data-kind="(\w+)">', response.text)
+    return match is not None and result_ok(category, match.group(1), response.text)
+
+
+def percentile(values, ratio):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * ratio))]
+
+
+def summarize(samples, elapsed):
+    latencies = [latency for latency, ok in samples]
+    errors = sum(1 for latency, ok in samples if not ok)
+    return {
+        'requests': len(samples),
+        'errors': errors,
+        'rps': round(len(samples) / elapsed, 1) if elapsed else 0.0,
+        'p50_ms': round(percentile(latencies, 0.5) * 1000, 1),
+        'p95_ms': round(percentile(latencies, 0.95) * 1000, 1),
+        'p99_ms': round(percentile(latencies, 0.99) * 1000, 1),
+        'max_ms': round(max(latencies) * 1000, 1) if latencies else 0.0,
+    }
+
+
+def run(args):
+    scenarios = parse_scenarios(args.scenario)
+    names = [name for name, weight in scenarios]
+    weights = [weight for name, weight in scenarios]
+    keywords = load_keywords(args.keys)
+
+    samples = {name: [] for name in names}
+    lock = threading.Lock()
+    started = time.monotonic()
+    measure_from = started + args.warmup
+    deadline = measure_from + args.duration
+    remaining = [args.requests] if args.requests else None
+
+    def worker():
+        session = requests.Session()
+        while True:
+            if remaining is not None:
+                with lock:
+                    if remaining[0] <= 0:
+                        return
+                    remaining[0] -= 1
+            elif time.monotonic() >= deadline:
+                return
+
+            scenario = random.choices(names, weights)[0]
+            method, path, kwargs = build_request(scenario, keywords)
+            begin = time.monotonic()
+            try:
+                response = session.request(method, args.base_url + path, timeout=args.timeout, **kwargs)
+                response.content   # 스트리밍 응답(대시보드)은 끝까지 받은 시간으로 측정
+                ok = response_ok(scenario, response)
+            except requests.exceptions.RequestException:
+                ok = False
+            end = time.monotonic()
+            if begin >= measure_from:
+                with lock:
+                    samples[scenario].append((end - begin, ok))
+
+    threads = [threading.Thread(target=worker, daemon=True) for _ in range(args.concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.monotonic() - max(measure_from, started)
+
+    all_samples = [sample for values in samples.values() for sample in values]
+    return {
+        'total': summarize(all_samples, elapsed),
+        'scenarios': {name: summarize(values, elapsed) for name, values in samples.items() if values},
+        'elapsed_s': round(elapsed, 2),
+    }
+
+
+def git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT_DIR,
+                              capture_output=True, text=True, timeout=5).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def previous_run(path, label):
+    """같은 label로 기록된 직전 결과"""
+    if not os.path.exists(path):
+        return None
+    previous = None
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            if record.get('label') == label:
+                previous = record
+    return previous
+
+
+def print_report(result, previous=None):
+    def delta(name, key):
+        if previous is None:
+            return ''
+        before = (previous['results']['total'] if name == '전체' else
+                  previous['results']['scenarios'].get(name, {})).get(key)
+        if not before:
+            return ''
+        now = result['total'][key] if name == '전체' else result['scenarios'][name][key]
+        return f" ({(now - before) / before:+.0%})"
+
+    print(f"{'시나리오':<14} {'요청':>7} {'오류':>6} {'RPS':>9} {'p50(ms)':>10} {'p95(ms)':>10} {'p99(ms)':>10}")
+    rows = list(result['scenarios'].items()) + [('전체', result['total'])]
+    for name, stats in rows:
+        print(f"{name:<14} {stats['requests']:>7} {stats['errors']:>6} {stats['rps']:>9}"
+              f" {stats['p50_ms']:>10} {stats['p95_ms']:>10} {stats['p99_ms']:>10}"
+              f"{delta(name, 'rps')}{delta(name, 'p95_ms')}")
+    if previous is not None:
+        print(f"\n괄호 안은 직전 실행({previous['timestamp']}, {previous.get('revision')}) 대비 RPS, p95 변화")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='oneWord 부하/지연 측정')
+    parser.add_argument('--base-url', default='http://127.0.0.1:5000', help='앱 주소')
+    parser.add_argument('--scenario', action='append',
+                        help="page:<카테고리>, api:<카테고리>, dashboard (=가중치, 여러 번 사용 가능, 기본값: 화면/API 전체)")
+    parser.add_argument('--concurrency', type=int, default=16, help='동시 요청 수')
+    parser.add_argument('--duration', type=float, default=20, help='측정 시간(초)')
+    parser.add_argument('--requests', type=int, default=0, help='지정하면 시간 대신 총 요청 수만큼 실행')
+    parser.add_argument('--warmup', type=float, default=2, help='측정에서 제외할 처음 시간(초)')
+    parser.add_argument('--keys', type=int, default=0, help='카테고리별 검색어 수 제한 (작을수록 캐시 적중 증가)')
+    parser.add_argument('--timeout', type=float, default=60, help='요청 제한 시간(초)')
+    parser.add_argument('--label', default='default', help='결과 구분 이름 (--compare 는 같은 이름끼리 비교)')
+    parser.add_argument('--out', default=DEFAULT_OUT, help='결과를 추가할 JSON Lines 파일')
+    parser.add_argument('--compare', action='store_true', help='같은 label의 직전 결과와 비교')
+    args = parser.parse_args(argv)
+    if args.requests:
+        args.warmup = 0
+
+    previous = previous_run(args.out, args.label) if args.compare else None
+    result = run(args)
+    record = {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'label': args.label,
+        'revision': git_revision(),
+        'config': {key: getattr(args, key) for key in
+                   ('base_url', 'scenario', 'concurrency', 'duration', 'requests', 'warmup', 'keys')},
+        'results': result,
+    }
+    os.makedirs(os.path.dirname(os.path.abspath(args.out)), exist_ok=True)
+    with open(args.out, 'a', encoding='utf-8') as f:
+        f.write(json.dumps(record, ensure_ascii=False) + '\n')
+
+    print_report(result, previous)
+    print(f"\n결과 저장: {args.out}")
+    return 1 if result['total']['requests'] == 0 else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,313 @@
+"""벤치마크용 가짜 업스트림 서버
+
+기상청 초단기예보, 카카오 로컬 검색, 공공데이터포털 주식시세, OpenAI chat API를
+로컬 포트에서 흉내 냅니다. 서비스별로 응답 지연과 실패 비율을 정할 수 있습니다.
+
+사용 예:
+    python bench/stubs.py                                        # 기본 지연 50ms, 실패 없음
+    python bench/stubs.py --latency 0.1 --latency openai=1.5 --fail-rate stock=0.05
+
+앱은 출력되는 환경변수로 실행하면 가짜 서버를 사용합니다.
+"""
+import argparse
+import csv
+import hashlib
+import json
+import os
+import random
+import sys
+import threading
+import time
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+LISTINGS_PATH = os.path.join(ROOT_DIR, 'data', 'krx_listings.csv')
+
+SERVICES = ('kma', 'kakao', 'stock', 'openai')
+DEFAULT_PORTS = {'kma': 9101, 'kakao': 9102, 'stock': 9103, 'openai': 9104}
+
+RECIPE_TEXT = """🍳 {name} 레시피
+
+📊 영양 정보 (1인분당)
+• 칼로리: 450kcal
+• 단백질: 20g
+
+🥘 재료 (2인분)
+• 주재료 200g
+• 양파 1개
+• 간장 2큰술
+
+[조리법]
+1. 재료를 손질합니다.
+2. 팬에 기름을 두르고 볶습니다.
+3. 양념을 넣고 5분간 끓입니다."""
+
+QUOTE_TEXT = """"작은 일을 꾸준히 하는 것이 큰 일을 이룬다."
+- 벤치마크 {n}"""
+
+
+def parse_settings(values, default):
+    """['0.1', 'openai=1.5'] → 서비스별 값 (숫자만 있으면 전체 값, 서비스별 지정이 우선)"""
+    values = values or []
+    for value in values:
+        if '=' not in value:
+            default = float(value)
+    settings = dict.fromkeys(SERVICES, default)
+    for value in values:
+        if '=' in value:
+            service, number = value.split('=', 1)
+            if service not in SERVICES:
+                raise SystemExit(f"알 수 없는 서비스: {service} ({', '.join(SERVICES)})")
+            settings[service] = float(number)
+    return settings
+
+
+def load_listings():
+    with open(LISTINGS_PATH, encoding='utf-8') as f:
+        return [row for row in csv.DictReader(f) if row.get('code')]
+
+
+def last_business_day():
+    day = datetime.now() - timedelta(days=1)
+    while day.weekday() >= 5:
+        day -= timedelta(days=1)
+    return day.strftime('%Y%m%d')
+
+
+def stable_number(text, low, high):
+    """같은 입력에는 항상 같은 값 (응답이 요청마다 달라지지 않도록)"""
+    digest = int(hashlib.md5(text.encode('utf-8')).hexdigest()[:8], 16)
+    return low + (high - low) * (digest / 0xFFFFFFFF)
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'   # keep-alive (커넥션 풀 재사용 확인용)
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        self._handle()
+
+    def do_POST(self):
+        self._handle()
+
+    def _handle(self):
+        server = self.server
+        url = urlsplit(self.path)
+        query = {key: values[0] for key, values in parse_qs(url.query).items()}
+        length = int(self.headers.get('Content-Length') or 0)
+        body = self.rfile.read(length) if length else b''
+
+        if url.path == '/_stub/stats':
+            self._send_json(200, server.stats())
+            return
+
+        server.count('requests')
+        delay = random.gauss(server.latency, server.latency * server.jitter) if server.latency else 0
+        time.sleep(max(0.0, delay))
+        if random.random() < server.fail_rate:
+            server.count('failures')
+            self._send_json(503, {'error': 'stub failure'})
+            return
+
+        handler = getattr(self, f'_{server.service}')
+        handler(url.path, query, body)
+
+    # 기상청 getUltraSrtFcst
+    def _kma(self, path, query, body):
+        base_time = query.get('base_time', '0030')
+        start = datetime.strptime(query.get('base_date', '20240101') + base_time[:2], '%Y%m%d%H') + timedelta(hours=1)
+        seed = f"{query.get('nx')},{query.get('ny')}"
+        items = []
+        for hour in range(6):
+            moment = start + timedelta(hours=hour)
+            values = {
+                'T1H': str(round(stable_number(seed + str(hour), -5, 30))),
+                'SKY': random.choice(['1', '3', '4']),
+                'PTY': random.choice(['0', '0', '0', '1']),
+                'REH': str(round(stable_number(seed, 30, 90))),
+                'WSD': f"{stable_number(seed, 0, 8):.1f}",
+                'RN1': '강수없음',
+            }
+            for category, value in values.items():
+                items.append({'baseDate': query.get('base_date'), 'baseTime': base_time, 'category': category,
+                              'fcstDate': moment.strftime('%Y%m%d'), 'fcstTime': moment.strftime('%H00'),
+                              'fcstValue': value, 'nx': query.get('nx'), 'ny': query.get('ny')})
+        self._send_json(200, {'response': {
+            'header': {'resultCode': '00', 'resultMsg': 'NORMAL_SERVICE'},
+            'body': {'dataType': 'JSON', 'items': {'item': items}, 'totalCount': len(items)},
+        }})
+
+    # 카카오 로컬 검색 (주소 검색은 '역'으로 끝나는 검색어를 찾지 못해 키워드 검색 경로도 실행됨)
+    def _kakao(self, path, query, body):
+        text = query.get('query', '')
+        documents = []
+        if path.endswith('/keyword.json') or not text.endswith('역'):
+            documents.append({
+                'x': f"{stable_number(text, 126.8, 127.2):.6f}",
+                'y': f"{stable_number(text[::-1], 37.45, 37.7):.6f}",
+                'address_name': text,
+            })
+        self._send_json(200, {'documents': documents, 'meta': {'total_count': len(documents)}})
+
+    # 공공데이터포털 getStockPriceInfo
+    def _stock(self, path, query, body):
+        listings = self.server.listings
+        if query.get('likeSrtnCd'):
+            listings = [row for row in listings if row['code'].startswith(query['likeSrtnCd'])]
+        if query.get('mrktCls'):
+            listings = [row for row in listings if row['market'] == query['mrktCls']]
+        rows = int(query.get('numOfRows', 10))
+        page = int(query.get('pageNo', 1))
+        base_date = query.get('basDt') or last_business_day()
+
+        items = []
+        for row in listings[(page - 1) * rows:page * rows]:
+            price = int(stable_number(row['code'], 1000, 300000)) // 10 * 10
+            change = int(stable_number(row['code'] + base_date, -0.05, 0.05) * price)
+            items.append({'basDt': base_date, 'srtnCd': row['code'], 'itmsNm': row['name'],
+                          'mrktCtg': row['market'], 'clpr': str(price), 'vs': str(change),
+                          'fltRt': f"{change / price * 100:.2f}"})
+        self._send_json(200, {'response': {
+            'header': {'resultCode': '00', 'resultMsg': 'NORMAL SERVICE.'},
+            'body': {'numOfRows': rows, 'pageNo': page, 'totalCount': len(listings), 'items': {'item': items}},
+        }})
+
+    # OpenAI chat.completions (stream 포함)
+    def _openai(self, path, query, body):
+        request = json.loads(body or b'{}')
+        prompt = ' '.join(str(message.get('content', '')) for message in request.get('messages', []))
+        if '명언' in prompt:
+            content = QUOTE_TEXT.format(n=random.randint(1, 100000))
+        else:
+            content = RECIPE_TEXT.format(name='벤치마크 요리')
+        usage = {'prompt_tokens': len(prompt) // 2, 'completion_tokens': len(content) // 2,
+                 'total_tokens': (len(prompt) + len(content)) // 2}
+        created = int(time.time())
+        model = request.get('model', 'gpt-stub')
+
+        if not request.get('stream'):
+            self._send_json(200, {
+                'id': 'chatcmpl-stub', 'object': 'chat.completion', 'created': created, 'model': model,
+                'choices': [{'index': 0, 'message': {'role': 'assistant', 'content': content},
+                             'finish_reason': 'stop'}],
+                'usage': usage,
+            })
+            return
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.end_headers()
+        for start in range(0, len(content), 8):
+            chunk = {'id': 'chatcmpl-stub', 'object': 'chat.completion.chunk', 'created': created, 'model': model,
+                     'choices': [{'index': 0, 'delta': {'content': content[start:start + 8]}, 'finish_reason': None}]}
+            self._write_chunk(f"data: {json.dumps(chunk, ensure_ascii=False)}\n\n")
+        final = {'id': 'chatcmpl-stub', 'object': 'chat.completion.chunk', 'created': created, 'model': model,
+                 'choices': [], 'usage': usage}
+        self._write_chunk(f"data: {json.dumps(final)}\n\n")
+        self._write_chunk("data: [DONE]\n\n")
+        self.wfile.write(b'0\r\n\r\n')
+
+    def _write_chunk(self, text):
+        data = text.encode('utf-8')
+        self.wfile.write(f"{len(data):x}\r\n".encode() + data + b'\r\n')
+        self.wfile.flush()
+
+    def _send_json(self, status, payload):
+        data = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+class StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 1024
+
+    def __init__(self, service, port, latency, jitter, fail_rate, host='127.0.0.1', listings=None):
+        super().__init__((host, port), StubHandler)
+        self.service = service
+        self.latency = latency
+        self.jitter = jitter
+        self.fail_rate = fail_rate
+        self.listings = listings or []
+        self._counts = {'requests': 0, 'failures': 0}
+        self._lock = threading.Lock()
+
+    def count(self, name):
+        with self._lock:
+            self._counts[name] += 1
+
+    def stats(self):
+        with self._lock:
+            return dict(self._counts, service=self.service, latency=self.latency, fail_rate=self.fail_rate)
+
+
+def start_servers(latency, fail_rate, jitter=0.2, host='127.0.0.1', ports=None):
+    """서비스별 가짜 서버를 백그라운드 스레드로 시작 → {서비스: StubServer}"""
+    ports = ports or DEFAULT_PORTS
+    listings = load_listings()
+    servers = {}
+    for service in SERVICES:
+        server = StubServer(service, ports[service], latency[service], jitter, fail_rate[service],
+                            host=host, listings=listings)
+        threading.Thread(target=server.serve_forever, name=f'stub-{service}', daemon=True).start()
+        servers[service] = server
+    return servers
+
+
+def app_environment(servers):
+    """앱이 가짜 서버를 사용하도록 하는 환경변수"""
+    address = {service: f"http://{server.server_address[0]}:{server.server_address[1]}"
+               for service, server in servers.items()}
+    return {
+        'KMA_BASE_URL': address['kma'],
+        'KAKAO_BASE_URL': address['kakao'],
+        'STOCK_BASE_URL': address['stock'],
+        'OPENAI_BASE_URL': f"{address['openai']}/v1",
+        'KMA_API_KEY': 'stub',
+        'KAKAO_API_KEY': 'stub',
+        'STOCK_API_KEY': 'stub',
+        'OPENAI_API_KEY': 'stub',
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='벤치마크용 가짜 업스트림 서버')
+    parser.add_argument('--latency', action='append',
+                        help="평균 응답 지연(초), '0.1' 또는 'openai=1.5' 처럼 서비스별 지정 (여러 번 사용 가능)")
+    parser.add_argument('--fail-rate', action='append',
+                        help="503 응답 비율(0~1), '0.01' 또는 'stock=0.1' 처럼 서비스별 지정")
+    parser.add_argument('--jitter', type=float, default=0.2, help='지연 시간 표준편차 (평균 대비 비율)')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port-base', type=int, default=9100, help='kma=+1, kakao=+2, stock=+3, openai=+4')
+    args = parser.parse_args(argv)
+
+    ports = {service: args.port_base + index + 1 for index, service in enumerate(SERVICES)}
+    servers = start_servers(parse_settings(args.latency, 0.05), parse_settings(args.fail_rate, 0.0),
+                            jitter=args.jitter, host=args.host, ports=ports)
+
+    for service, server in servers.items():
+        print(f"{service:7} http://{args.host}:{ports[service]}  지연 {server.latency}s  실패 {server.fail_rate:.0%}")
+    print('\n앱 실행 시 환경변수:')
+    for key, value in app_environment(servers).items():
+        print(f"export {key}={value}")
+    sys.stdout.flush()
+
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        for server in servers.values():
+            print(json.dumps(server.stats(), ensure_ascii=False))
+            server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
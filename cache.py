@@ -0,0 +1,274 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from metrics import log_event
+
+# 디스크 캐시 위치 (기본값: 프로젝트 폴더의 .cache)
+CACHE_DIR = os.getenv('ONEWORD_CACHE_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), '.cache'))
+CACHE_DB_PATH = os.path.join(CACHE_DIR, 'oneword.sqlite3')
+# 최대 항목 수를 넘었는지 몇 번 쓸 때마다 확인할지 (그 사이에는 잠시 넘을 수 있음)
+DISK_CACHE_PRUNE_EVERY = int(os.getenv('DISK_CACHE_PRUNE_EVERY', 100))
+
+# 이름별로 등록된 캐시 (통계 조회용)
+CACHES = {}
+
+
+def normalize_query(text):
+    """검색어 정규화 (앞뒤 공백 제거, 연속 공백 축소, 소문자 변환)"""
+    return ' '.join(str(text).split()).lower()
+
+
+class SQLiteStore:
+    """캐시 항목을 SQLite 파일에 보관하는 디스크 저장소"""
+
+    def __init__(self, namespace, path=None, max_entries=None):
+        self.namespace = namespace
+        self.path = path or CACHE_DB_PATH
+        self.max_entries = max_entries  # 초과 시 만료가 가까운 항목부터 삭제
+        self._writes = 0
+        self._conn = None
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=5, check_same_thread=False)
+            # WAL: 여러 워커 프로세스가 읽는 동안에도 쓰기가 막히지 않음
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS cache ('
+                'namespace TEXT NOT NULL, key TEXT NOT NULL, value TEXT, expires_at REAL, '
+                'PRIMARY KEY (namespace, key))'
+            )
+            conn.execute('CREATE INDEX IF NOT EXISTS cache_expires ON cache (namespace, expires_at)')
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def get(self, key):
+        """(값, 만료시각) 반환, 없으면 None"""
+        try:
+            with self._lock:
+                row = self._connect().execute(
+                    'SELECT value, expires_at FROM cache WHERE namespace = ? AND key = ?',
+                    (self.namespace, key)
+                ).fetchone()
+        except sqlite3.Error as e:
+            log_event('disk_cache_error', level='error', op='read', namespace=self.namespace, error=str(e))
+            return None
+
+        if row is None:
+            return None
+        return json.loads(row[0]), row[1]
+
+    def set(self, key, value, expires_at):
+        try:
+            with self._lock:
+                conn = self._connect()
+                conn.execute(
+                    'INSERT OR REPLACE INTO cache (namespace, key, value, expires_at) VALUES (?, ?, ?, ?)',
+                    (self.namespace, key, json.dumps(value, ensure_ascii=False), expires_at)
+                )
+                if self.max_entries and self._writes % DISK_CACHE_PRUNE_EVERY == 0:
+                    self._prune(conn)
+                self._writes += 1
+                conn.commit()
+        except (sqlite3.Error, TypeError, ValueError) as e:
+            log_event('disk_cache_error', level='error', op='write', namespace=self.namespace, error=str(e))
+
+    def _prune(self, conn):
+        """최대 항목 수를 넘었을 때만 만료가 가까운 항목부터 삭제 (잠금을 잡은 상태에서 호출)"""
+        count = conn.execute('SELECT COUNT(*) FROM cache WHERE namespace = ?', (self.namespace,)).fetchone()[0]
+        if count <= self.max_entries:
+            return
+        conn.execute(
+            'DELETE FROM cache WHERE namespace = ? AND key IN ('
+            'SELECT key FROM cache WHERE namespace = ? ORDER BY expires_at DESC LIMIT -1 OFFSET ?)',
+            (self.namespace, self.namespace, self.max_entries)
+        )
+
+    def items(self, now=None):
+        """만료되지 않은 (키, 값) 목록"""
+        now = time.time() if now is None else now
+        try:
+            with self._lock:
+                rows = self._connect().execute(
+                    'SELECT key, value FROM cache WHERE namespace = ? AND expires_at > ? ORDER BY key',
+                    (self.namespace, now)
+                ).fetchall()
+        except sqlite3.Error as e:
+            log_event('disk_cache_error', level='error', op='items', namespace=self.namespace, error=str(e))
+            return []
+        return [(key, json.loads(value)) for key, value in rows]
+
+    def delete(self, key):
+        try:
+            with self._lock:
+                conn = self._connect()
+                conn.execute('DELETE FROM cache WHERE namespace = ? AND key = ?', (self.namespace, key))
+                conn.commit()
+        except sqlite3.Error as e:
+            log_event('disk_cache_error', level='error', op='delete', namespace=self.namespace, error=str(e))
+
+    def purge_expired(self, now=None):
+        """만료된 항목 정리"""
+        now = time.time() if now is None else now
+        try:
+            with self._lock:
+                conn = self._connect()
+                conn.execute('DELETE FROM cache WHERE namespace = ? AND expires_at <= ?', (self.namespace, now))
+                conn.commit()
+        except sqlite3.Error as e:
+            log_event('disk_cache_error', level='error', op='purge', namespace=self.namespace, error=str(e))
+
+
+class TTLCache:
+    """LRU 방식의 메모리 캐시 (TTL, 실패 결과 캐시, 디스크 백업 지원)
+
+    값이 None이면 '찾을 수 없음' 결과로 보고 negative_ttl 동안만 보관합니다.
+    negative_ttl이 없으면 None은 캐시하지 않습니다.
+    """
+
+    def __init__(self, name, max_size=1024, ttl=3600, negative_ttl=None, store=None, key_func=normalize_query):
+        self.name = name
+        self.max_size = max_size
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.store = store
+        self.key_func = key_func
+
+        self._data = OrderedDict()  # key -> (value, expires_at)
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.negative_hits = 0
+        self.disk_hits = 0
+        self.evictions = 0
+
+        CACHES[name] = self
+
+    def lookup(self, key):
+        """(찾음 여부, 값) 반환"""
+        key = self.key_func(key)
+        now = time.time()
+
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                if entry[1] > now:
+                    self._data.move_to_end(key)
+                    self._record_hit(entry[0])
+                    return True, entry[0]
+                del self._data[key]
+
+        # 메모리에 없으면 디스크 확인
+        if self.store is not None:
+            stored = self.store.get(key)
+            if stored is not None and stored[1] > now:
+                value, expires_at = stored
+                with self._lock:
+                    self._put(key, value, expires_at)
+                    self.disk_hits += 1
+                    self._record_hit(value)
+                return True, value
+
+        with self._lock:
+            self.misses += 1
+        return False, None
+
+    def get(self, key, default=None):
+        found, value = self.lookup(key)
+        return value if found else default
+
+    def set(self, key, value, ttl=None):
+        """값 저장 (None은 실패 결과로 취급)"""
+        if ttl is None:
+            ttl = self.ttl if value is not None else self.negative_ttl
+        if ttl is None or ttl <= 0:
+            return
+
+        key = self.key_func(key)
+        expires_at = time.time() + ttl
+        with self._lock:
+            self._put(key, value, expires_at)
+        if self.store is not None:
+            self.store.set(key, value, expires_at)
+
+    def delete(self, key):
+        key = self.key_func(key)
+        with self._lock:
+            self._data.pop(key, None)
+        if self.store is not None:
+            self.store.delete(key)
+
+    def remaining_ttl(self, key):
+        """남은 유효 시간(초), 없거나 만료됐으면 None (통계에 반영하지 않음)"""
+        key = self.key_func(key)
+        now = time.time()
+        with self._lock:
+            entry = self._data.get(key)
+        if entry is None and self.store is not None:
+            entry = self.store.get(key)
+        if entry is None or entry[1] <= now:
+            return None
+        return entry[1] - now
+
+    def get_or_load(self, key, loader):
+        """캐시에 없으면 loader()로 값을 만들어 저장 후 반환"""
+        found, value = self.lookup(key)
+        if found:
+            return value
+        value = loader()
+        self.set(key, value)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self):
+        with self._lock:
+            requests_total = self.hits + self.misses
+            return {
+                'size': len(self._data),
+                'max_size': self.max_size,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / requests_total, 4) if requests_total else 0.0,
+                'negative_hits': self.negative_hits,
+                'disk_hits': self.disk_hits,
+                'evictions': self.evictions,
+            }
+
+    def _record_hit(self, value):
+        self.hits += 1
+        if value is None:
+            self.negative_hits += 1
+
+    def _put(self, key, value, expires_at):
+        self._data[key] = (value, expires_at)
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_size:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+
+def cache_stats():
+    """등록된 모든 캐시의 통계"""
+    return {name: cache.stats() for name, cache in CACHES.items()}
+
+
+# 주소 → 좌표(경도, 위도) 캐시
+geocode_cache = TTLCache(
+    'geocode',
+    max_size=int(os.getenv('GEOCODE_CACHE_SIZE', 2048)),
+    ttl=int(os.getenv('GEOCODE_CACHE_TTL', 30 * 24 * 3600)),
+    negative_ttl=int(os.getenv('GEOCODE_NEGATIVE_TTL', 300)),
+    store=SQLiteStore('geocode'),
+)
@@ -0,0 +1,110 @@
+import os
+import threading
+import time
+
+import requests
+
+# 회로 차단 설정
+CIRCUIT_FAILURES = int(os.getenv('CIRCUIT_FAILURES', 5))        # 연속 실패가 이만큼 쌓이면 회로를 엶
+CIRCUIT_RESET = float(os.getenv('CIRCUIT_RESET', 30))          # 회로를 연 뒤 시험 요청을 보내기까지 기다릴 시간(초)
+
+
+class CircuitOpenError(requests.exceptions.ConnectionError):
+    """업스트림 오류가 계속되어 요청을 보내지 않고 바로 실패 (기존 요청 오류 처리 경로를 그대로 탐)"""
+
+
+def is_upstream_failure(error=None, status=None):
+    """업스트림 장애로 볼 결과인지 (연결 오류, 타임아웃, 5xx, 429)"""
+    if error is not None:
+        status = getattr(error, 'status_code', None)
+        return status is None or status >= 500 or status == 429
+    return status is not None and (status >= 500 or status == 429)
+
+
+class CircuitBreaker:
+    """업스트림별 회로 차단기
+
+    closed: 정상, 연속 실패를 셈
+    open: reset_timeout 동안 요청을 보내지 않고 바로 CircuitOpenError
+    half_open: 시험 요청 하나만 보내고 성공하면 closed, 실패하면 다시 open
+    """
+
+    def __init__(self, name, failures=CIRCUIT_FAILURES, reset_timeout=CIRCUIT_RESET):
+        self.name = name
+        self.failure_threshold = failures
+        self.reset_timeout = reset_timeout
+        self.state = 'closed'
+        self.failures = 0
+        self.opened_at = 0.0
+        self.trial_started = None
+        self.opened = 0      # 회로를 연 횟수
+        self.rejected = 0    # 보내지 않고 거절한 요청 수
+        self._lock = threading.Lock()
+
+    def before(self):
+        """요청 전에 호출 (회로가 열려 있으면 CircuitOpenError)"""
+        with self._lock:
+            now = time.monotonic()
+            if self.state == 'closed':
+                return
+            if self.state == 'open' and now - self.opened_at >= self.reset_timeout:
+                self.state = 'half_open'
+                self.trial_started = None
+            if self.state == 'half_open':
+                # 시험 요청의 결과가 기록되지 않은 채 오래 지나면 (취소 등) 다음 요청으로 다시 시험
+                if self.trial_started is None or now - self.trial_started >= self.reset_timeout:
+                    self.trial_started = now
+                    return
+            self.rejected += 1
+            wait = max(0.0, self.reset_timeout - (now - self.opened_at))
+        raise CircuitOpenError(f"{self.name} 응답 오류가 계속되어 잠시 요청을 멈췄습니다 ({wait:.0f}초 후 다시 시도)")
+
+    def release(self):
+        """before() 통과 후 요청을 보내지 않은 경우 (사용 한도 부족 등) 시험 요청 자리를 돌려줌"""
+        with self._lock:
+            if self.state == 'half_open':
+                self.trial_started = None
+
+    def record(self, failed):
+        """요청 결과 기록"""
+        with self._lock:
+            if not failed:
+                self.state = 'closed'
+                self.failures = 0
+                self.trial_started = None
+                return
+            self.failures += 1
+            if self.state == 'half_open' or (self.state == 'closed' and self.failures >= self.failure_threshold):
+                self.state = 'open'
+                self.opened_at = time.monotonic()
+                self.trial_started = None
+                self.opened += 1
+
+    def stats(self):
+        with self._lock:
+            return {
+                'state': self.state,
+                'consecutive_failures': self.failures,
+                'opened': self.opened,
+                'rejected': self.rejected,
+                'failure_threshold': self.failure_threshold,
+                'reset_timeout': self.reset_timeout,
+            }
+
+
+# 업스트림 이름 → 회로 차단기
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+
+def circuit(name):
+    """업스트림별 회로 차단기 (처음 호출 시 생성)"""
+    breaker = _breakers.get(name)
+    if breaker is None:
+        with _breakers_lock:
+            breaker = _breakers.setdefault(name, CircuitBreaker(name))
+    return breaker
+
+
+def circuit_stats():
+    return {name: breaker.stats() for name, breaker in list(_breakers.items())}
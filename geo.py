@@ -0,0 +1,66 @@
+"""좌표 간 거리 계산 (하버사인)
+
+좌표는 카카오 검색 결과와 같은 (경도, 위도) 순서입니다.
+여러 출발지 × 도착지 거리는 numpy가 설치되어 있으면 배열 연산으로 한 번에 계산합니다.
+"""
+import math
+
+try:
+    import numpy as np
+except ImportError:  # numpy가 없으면 순수 파이썬으로 계산
+    np = None
+
+EARTH_RADIUS_KM = 6371  # 지구의 반지름 (km)
+
+
+def haversine_km(coord1, coord2):
+    """두 좌표 간의 거리 계산 (km)"""
+    lat1, lon1 = coord1[1], coord1[0]
+    lat2, lon2 = coord2[1], coord2[0]
+
+    dlat = math.radians(lat2 - lat1)
+    dlon = math.radians(lon2 - lon1)
+
+    a = (math.sin(dlat / 2) * math.sin(dlat / 2) +
+         math.cos(math.radians(lat1)) * math.cos(math.radians(lat2)) *
+         math.sin(dlon / 2) * math.sin(dlon / 2))
+
+    c = 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
+    return EARTH_RADIUS_KM * c
+
+
+def distance_matrix(origins, destinations):
+    """출발지 목록 × 도착지 목록 거리(km) → [[출발지0→도착지0, 출발지0→도착지1, ...], ...]
+
+    numpy가 있으면 수천 쌍을 수 밀리초 안에 계산합니다.
+    """
+    if not origins or not destinations:
+        return [[] for _ in origins]
+
+    if np is None:
+        # 좌표별 라디안/코사인은 한 번만 계산
+        dest = [(math.radians(lat), math.radians(lon), math.cos(math.radians(lat))) for lon, lat in destinations]
+        rows = []
+        for lon, lat in origins:
+            lat1, lon1 = math.radians(lat), math.radians(lon)
+            cos1 = math.cos(lat1)
+            row = []
+            for lat2, lon2, cos2 in dest:
+                a = math.sin((lat2 - lat1) / 2) ** 2 + cos1 * cos2 * math.sin((lon2 - lon1) / 2) ** 2
+                row.append(2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a))))
+            rows.append(row)
+        return rows
+
+    origins = np.radians(np.asarray(origins, dtype=np.float64))
+    destinations = np.radians(np.asarray(destinations, dtype=np.float64))
+    lon1, lat1 = origins[:, 0:1], origins[:, 1:2]          # (출발지 수, 1)
+    lon2, lat2 = destinations[:, 0], destinations[:, 1]    # (도착지 수,)
+
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return (2 * EARTH_RADIUS_KM * np.arcsin(np.minimum(1.0, np.sqrt(a)))).tolist()
+
+
+def rank_by_distance(distances):
+    """거리 목록 → 가까운 순 인덱스 (None은 제외)"""
+    return sorted((index for index, distance in enumerate(distances) if distance is not None),
+                  key=lambda index: distances[index])
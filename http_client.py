@@ -0,0 +1,157 @@
+import os
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from circuit import circuit, is_upstream_failure, CircuitOpenError
+from metrics import metrics
+from quota import quota_governor, QuotaExceededError
+
+# 업스트림 서비스별 기본 설정
+# - timeout: 요청 타임아웃(초)
+# - retries: 연결 실패/일시 오류(502, 503, 504) 재시도 횟수
+# - pool_maxsize: 호스트당 유지할 최대 커넥션 수
+SERVICE_DEFAULTS = {
+    'kma': {'timeout': 15, 'retries': 2, 'pool_maxsize': 10},
+    'kakao': {'timeout': 10, 'retries': 1, 'pool_maxsize': 20},
+    'stock': {'timeout': 15, 'retries': 2, 'pool_maxsize': 10},
+}
+
+# 모든 서비스 공통 설정
+POOL_CONNECTIONS = int(os.getenv('HTTP_POOL_CONNECTIONS', 4))  # 서비스별로 유지할 호스트 풀 수
+POOL_BLOCK = os.getenv('HTTP_POOL_BLOCK', '0') == '1'          # 호스트당 커넥션 수를 pool_maxsize로 엄격히 제한
+RETRY_BACKOFF = float(os.getenv('HTTP_RETRY_BACKOFF', 0.3))
+
+
+def load_service_config(service):
+    """서비스 설정 (환경변수 HTTP_<SERVICE>_TIMEOUT 등으로 덮어쓰기 가능)"""
+    config = dict(SERVICE_DEFAULTS.get(service, {'timeout': 10, 'retries': 1, 'pool_maxsize': 10}))
+    prefix = f"HTTP_{service.upper()}_"
+    if os.getenv(prefix + 'TIMEOUT'):
+        config['timeout'] = float(os.getenv(prefix + 'TIMEOUT'))
+    if os.getenv(prefix + 'RETRIES'):
+        config['retries'] = int(os.getenv(prefix + 'RETRIES'))
+    if os.getenv(prefix + 'POOL_MAXSIZE'):
+        config['pool_maxsize'] = int(os.getenv(prefix + 'POOL_MAXSIZE'))
+    return config
+
+
+class HttpClient:
+    """업스트림 서비스별 커넥션 풀(keep-alive)을 유지하는 공용 HTTP 클라이언트"""
+
+    def __init__(self):
+        self._sessions = {}
+        self._configs = {}
+        self._counters = {}
+        self._lock = threading.Lock()
+
+    def session(self, service):
+        """서비스 전용 세션 (처음 호출 시 생성)"""
+        session = self._sessions.get(service)
+        if session is not None:
+            return session
+
+        with self._lock:
+            if service not in self._sessions:
+                config = load_service_config(service)
+                retry = Retry(
+                    total=config['retries'],
+                    connect=config['retries'],
+                    read=config['retries'],
+                    status=config['retries'],
+                    backoff_factor=RETRY_BACKOFF,
+                    status_forcelist=(502, 503, 504),
+                    allowed_methods=frozenset(['GET']),
+                    raise_on_status=False,
+                )
+                adapter = HTTPAdapter(
+                    pool_connections=POOL_CONNECTIONS,
+                    pool_maxsize=config['pool_maxsize'],
+                    pool_block=POOL_BLOCK,
+                    max_retries=retry,
+                )
+                session = requests.Session()
+                session.mount('http://', adapter)
+                session.mount('https://', adapter)
+
+                self._configs[service] = config
+                self._counters[service] = {'requests': 0, 'errors': 0}
+                self._sessions[service] = session
+            return self._sessions[service]
+
+    def get(self, service, url, metric=None, **kwargs):
+        """GET 요청 (timeout 미지정 시 서비스 기본값 사용, metric: 지표 이름, 기본값은 서비스 이름)"""
+        session = self.session(service)
+        kwargs.setdefault('timeout', self._configs[service]['timeout'])
+
+        counters = self._counters[service]
+        with self._lock:
+            counters['requests'] += 1
+        breaker = circuit(service)
+        try:
+            # 회로가 열려 있으면 한도를 쓰지 않고 바로 실패
+            breaker.before()
+            try:
+                quota_governor.acquire(service)
+            except QuotaExceededError:
+                breaker.release()
+                raise
+        except (QuotaExceededError, CircuitOpenError):
+            metrics.reject(metric or service)
+            with self._lock:
+                counters['errors'] += 1
+            raise
+        started = metrics.begin(metric or service)
+        try:
+            response = session.get(url, **kwargs)
+        except requests.exceptions.RequestException as e:
+            metrics.end(metric or service, started, error=e)
+            breaker.record(True)
+            with self._lock:
+                counters['errors'] += 1
+            raise
+        metrics.end(metric or service, started, status=response.status_code)
+        breaker.record(is_upstream_failure(status=response.status_code))
+        return response
+
+    def stats(self):
+        """서비스별 요청 수와 커넥션 재사용 통계"""
+        result = {}
+        with self._lock:
+            services = list(self._sessions.items())
+
+        for service, session in services:
+            opened = 0
+            pooled_requests = 0
+            adapter = session.get_adapter('https://')
+            pools = adapter.poolmanager.pools
+            for key in pools.keys():
+                try:
+                    pool = pools[key]
+                except KeyError:
+                    continue
+                opened += pool.num_connections
+                pooled_requests += pool.num_requests
+
+            result[service] = {
+                'requests': self._counters[service]['requests'],
+                'errors': self._counters[service]['errors'],
+                'connections_opened': opened,
+                'connections_reused': max(pooled_requests - opened, 0),
+                'timeout': self._configs[service]['timeout'],
+                'retries': self._configs[service]['retries'],
+                'pool_maxsize': self._configs[service]['pool_maxsize'],
+            }
+        return result
+
+    def close(self):
+        with self._lock:
+            for session in self._sessions.values():
+                session.close()
+            self._sessions.clear()
+
+
+# 공용 HTTP 클라이언트 인스턴스
+http_client = HttpClient()
@@ -0,0 +1,349 @@
+import math
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timedelta
+
+from cache import TTLCache, SQLiteStore
+from async_runtime import async_runtime
+from http_client import http_client
+from quota import background
+
+try:
+    import numpy as np
+except ImportError:  # numpy가 없으면 일괄 변환도 순수 파이썬으로 계산
+    np = None
+
+# 업스트림 주소 (벤치마크 등에서 가짜 서버로 바꿀 수 있음)
+KMA_BASE_URL = os.getenv('KMA_BASE_URL', "http://apis.data.go.kr/1360000/VilageFcstInfoService_2.0")
+KMA_FORECAST_URL = f"{KMA_BASE_URL}/getUltraSrtFcst"
+
+# 주요 도시 좌표 (기상청 격자 좌표)
+CITY_COORDS = {
+    '서울': {'nx': 60, 'ny': 127, 'name': '서울특별시'},
+    '부산': {'nx': 98, 'ny': 76, 'name': '부산광역시'},
+    '대구': {'nx': 89, 'ny': 90, 'name': '대구광역시'},
+    '인천': {'nx': 55, 'ny': 124, 'name': '인천광역시'},
+    '광주': {'nx': 58, 'ny': 74, 'name': '광주광역시'},
+    '대전': {'nx': 67, 'ny': 100, 'name': '대전광역시'},
+    '울산': {'nx': 102, 'ny': 84, 'name': '울산광역시'},
+    '세종': {'nx': 66, 'ny': 103, 'name': '세종특별자치시'},
+    '수원': {'nx': 60, 'ny': 121, 'name': '경기도 수원'},
+    '춘천': {'nx': 73, 'ny': 134, 'name': '강원도 춘천'},
+    '청주': {'nx': 69, 'ny': 106, 'name': '충청북도 청주'},
+    '전주': {'nx': 63, 'ny': 89, 'name': '전라북도 전주'},
+    '포항': {'nx': 102, 'ny': 94, 'name': '경상북도 포항'},
+    '제주': {'nx': 52, 'ny': 38, 'name': '제주특별자치도'}
+}
+
+
+# 기상청 동네예보 격자(DFS) 람베르트 정각원추도법 상수
+GRID_RE = 6371.00877   # 지구 반경 (km)
+GRID_SIZE = 5.0        # 격자 간격 (km)
+GRID_SLAT1 = 30.0      # 표준위도 1
+GRID_SLAT2 = 60.0      # 표준위도 2
+GRID_OLON = 126.0      # 기준점 경도
+GRID_OLAT = 38.0       # 기준점 위도
+GRID_XO = 43           # 기준점 X 격자
+GRID_YO = 136          # 기준점 Y 격자
+
+
+def _grid_constants():
+    """투영 상수 (re, sn, sf, ro, olon) 계산"""
+    degrad = math.pi / 180.0
+    re = GRID_RE / GRID_SIZE
+    slat1 = GRID_SLAT1 * degrad
+    slat2 = GRID_SLAT2 * degrad
+    olat = GRID_OLAT * degrad
+
+    sn = math.tan(math.pi * 0.25 + slat2 * 0.5) / math.tan(math.pi * 0.25 + slat1 * 0.5)
+    sn = math.log(math.cos(slat1) / math.cos(slat2)) / math.log(sn)
+    sf = math.tan(math.pi * 0.25 + slat1 * 0.5)
+    sf = math.pow(sf, sn) * math.cos(slat1) / sn
+    ro = math.tan(math.pi * 0.25 + olat * 0.5)
+    ro = re * sf / math.pow(ro, sn)
+    return re, sn, sf, ro, GRID_OLON * degrad
+
+
+_RE, _SN, _SF, _RO, _OLON = _grid_constants()
+
+
+def latlon_to_grid(lat, lon):
+    """위도/경도 → 기상청 격자 좌표 (nx, ny)"""
+    ra = math.tan(math.pi * 0.25 + math.radians(lat) * 0.5)
+    ra = _RE * _SF / math.pow(ra, _SN)
+    theta = math.radians(lon) - _OLON
+    if theta > math.pi:
+        theta -= 2.0 * math.pi
+    if theta < -math.pi:
+        theta += 2.0 * math.pi
+    theta *= _SN
+
+    nx = int(math.floor(ra * math.sin(theta) + GRID_XO + 0.5))
+    ny = int(math.floor(_RO - ra * math.cos(theta) + GRID_YO + 0.5))
+    return nx, ny
+
+
+def latlon_to_grid_batch(lats, lons):
+    """위도/경도 목록을 한 번에 격자 좌표로 변환 → [(nx, ny), ...]
+
+    numpy가 설치되어 있으면 배열 연산으로 수천 개 좌표를 한 번에 계산합니다.
+    """
+    if np is None:
+        return [latlon_to_grid(lat, lon) for lat, lon in zip(lats, lons)]
+
+    lats = np.asarray(lats, dtype=np.float64)
+    lons = np.asarray(lons, dtype=np.float64)
+
+    ra = _RE * _SF / np.power(np.tan(np.pi * 0.25 + np.radians(lats) * 0.5), _SN)
+    theta = np.radians(lons) - _OLON
+    theta = np.where(theta > np.pi, theta - 2.0 * np.pi, theta)
+    theta = np.where(theta < -np.pi, theta + 2.0 * np.pi, theta)
+    theta *= _SN
+
+    nx = np.floor(ra * np.sin(theta) + GRID_XO + 0.5).astype(int)
+    ny = np.floor(_RO - ra * np.cos(theta) + GRID_YO + 0.5).astype(int)
+    return list(zip(nx.tolist(), ny.tolist()))
+
+
+class KMAApiError(Exception):
+    """기상청 API가 정상('00')이 아닌 resultCode를 반환한 경우"""
+
+    def __init__(self, code, message):
+        super().__init__(f"{code}: {message}")
+        self.code = code
+        self.message = message
+
+
+def get_base_datetime(now=None):
+    """초단기예보 발표 기준 (base_date, base_time) 계산 (기상청은 매시 30분에 발표)"""
+    now = now or datetime.now()
+    issued = now if now.minute >= 30 else now - timedelta(hours=1)
+    return issued.strftime('%Y%m%d'), f"{issued.hour:02d}30"
+
+
+def next_release_time(base_date, base_time):
+    """해당 발표 다음의 발표 시각"""
+    issued = datetime.strptime(base_date + base_time, '%Y%m%d%H%M')
+    return issued + timedelta(hours=1)
+
+
+def forecast_params(nx, ny, base_date, base_time, api_key):
+    """초단기예보 요청 파라미터"""
+    return {
+        'serviceKey': api_key,
+        'pageNo': '1',
+        'numOfRows': '60',
+        'dataType': 'JSON',
+        'base_date': base_date,
+        'base_time': base_time,
+        'nx': nx,
+        'ny': ny
+    }
+
+
+def parse_forecast(response):
+    """초단기예보 응답 → 시간대별 데이터 {fcstTime: {category: value}}"""
+    response.raise_for_status()
+    data = response.json()
+
+    # API 응답 확인
+    header = data.get('response', {}).get('header', {})
+    if header.get('resultCode') != '00':
+        raise KMAApiError(header.get('resultCode'), header.get('resultMsg'))
+
+    items = data.get('response', {}).get('body', {}).get('items', {}).get('item', [])
+
+    # 시간대별 데이터 파싱
+    hourly_data = {}
+    for item in items:
+        fcst_time = item['fcstTime']
+        category = item['category']
+        fcst_value = item['fcstValue']
+
+        if fcst_time not in hourly_data:
+            hourly_data[fcst_time] = {}
+        hourly_data[fcst_time][category] = fcst_value
+
+    return hourly_data
+
+
+def fetch_forecast(nx, ny, base_date, base_time, api_key):
+    """기상청 초단기예보를 조회해 시간대별 데이터 {fcstTime: {category: value}} 반환"""
+    response = http_client.get('kma', KMA_FORECAST_URL, params=forecast_params(nx, ny, base_date, base_time, api_key))
+    return parse_forecast(response)
+
+
+async def fetch_forecast_async(nx, ny, base_date, base_time, api_key):
+    """fetch_forecast의 비동기 버전"""
+    response = await async_runtime.get('kma', KMA_FORECAST_URL,
+                                       params=forecast_params(nx, ny, base_date, base_time, api_key))
+    return parse_forecast(response)
+
+
+# 격자 좌표 + 발표 시각별 예보 캐시 (다음 발표 시각에 만료)
+forecast_cache = TTLCache(
+    'kma_forecast',
+    max_size=int(os.getenv('KMA_FORECAST_CACHE_SIZE', 512)),
+    ttl=3600,
+    store=SQLiteStore('kma_forecast'),
+)
+
+
+def forecast_cache_key(nx, ny, base_date, base_time):
+    return f"{nx}:{ny}:{base_date}:{base_time}"
+
+
+def get_forecast(nx, ny, api_key, now=None):
+    """캐시를 거쳐 예보 조회 → (hourly_data, base_date, base_time)"""
+    now = now or datetime.now()
+    base_date, base_time = get_base_datetime(now)
+    key = forecast_cache_key(nx, ny, base_date, base_time)
+
+    found, hourly_data = forecast_cache.lookup(key)
+    if found:
+        return hourly_data, base_date, base_time
+
+    hourly_data = fetch_forecast(nx, ny, base_date, base_time, api_key)
+    store_forecast(key, hourly_data, base_date, base_time, now)
+    return hourly_data, base_date, base_time
+
+
+async def get_forecast_async(nx, ny, api_key, now=None):
+    """get_forecast의 비동기 버전"""
+    now = now or datetime.now()
+    base_date, base_time = get_base_datetime(now)
+    key = forecast_cache_key(nx, ny, base_date, base_time)
+
+    found, hourly_data = forecast_cache.lookup(key)
+    if found:
+        return hourly_data, base_date, base_time
+
+    hourly_data = await fetch_forecast_async(nx, ny, base_date, base_time, api_key)
+    store_forecast(key, hourly_data, base_date, base_time, now)
+    return hourly_data, base_date, base_time
+
+
+def store_forecast(key, hourly_data, base_date, base_time, now):
+    """다음 발표 시각까지 예보 캐시 (빈 응답은 아직 발표 전일 수 있으므로 캐시하지 않음)"""
+    if hourly_data:
+        ttl = (next_release_time(base_date, base_time) - now).total_seconds()
+        forecast_cache.set(key, hourly_data, ttl=ttl)
+
+
+# 발표 직후 미리 받기 설정
+PREWARM_DELAY = int(os.getenv('KMA_PREWARM_DELAY', 60))            # 발표 시각(매시 30분) 이후 대기 시간(초)
+PREWARM_WORKERS = int(os.getenv('KMA_PREWARM_WORKERS', 4))         # 동시 요청 수
+PREWARM_BACKOFF_START = int(os.getenv('KMA_PREWARM_BACKOFF', 30))  # 실패 시 첫 재시도 간격(초)
+PREWARM_BACKOFF_MAX = 600
+
+
+class ForecastPrewarmer:
+    """매 발표 직후 CITY_COORDS의 모든 격자 예보를 미리 받아 캐시를 채우는 백그라운드 작업"""
+
+    def __init__(self, cities=None, delay=PREWARM_DELAY, max_workers=PREWARM_WORKERS):
+        self.cities = cities or CITY_COORDS
+        self.delay = delay
+        self.max_workers = max_workers
+        self.api_key = None
+
+        self._freshness = {city: {'base_date': None, 'base_time': None, 'fetched_at': None, 'error': None}
+                           for city in self.cities}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self.backoff = 0
+
+    def start(self, api_key):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self.api_key = api_key
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='kma-prewarm', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def run_once(self, cities=None, now=None):
+        """현재 발표분을 받아 캐시에 채우고, 실패한 도시 목록 반환"""
+        now = now or datetime.now()
+        cities = list(cities or self.cities)
+        failed = []
+
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='kma-prewarm') as executor:
+            futures = {executor.submit(self._fetch_city, city, now): city for city in cities}
+            for future in as_completed(futures):
+                if not future.result():
+                    failed.append(futures[future])
+        return failed
+
+    def status(self):
+        """도시별 예보 신선도"""
+        now = datetime.now()
+        current = get_base_datetime(now)
+        result = {}
+        with self._lock:
+            for city, info in self._freshness.items():
+                fetched_at = info['fetched_at']
+                result[city] = {
+                    'base_date': info['base_date'],
+                    'base_time': info['base_time'],
+                    'fresh': (info['base_date'], info['base_time']) == current,
+                    'age_seconds': int((now - fetched_at).total_seconds()) if fetched_at else None,
+                    'error': info['error'],
+                }
+        return {'running': self._thread is not None and self._thread.is_alive(),
+                'backoff_seconds': self.backoff, 'cities': result}
+
+    def _fetch_city(self, city, now):
+        coords = self.cities[city]
+        try:
+            with background():
+                hourly_data, base_date, base_time = get_forecast(coords['nx'], coords['ny'], self.api_key, now=now)
+        except KMAApiError as e:
+            # 아직 발표 전이거나 한도 초과 등 → 백오프 후 재시도
+            self._record(city, error=f"resultCode {e.code}: {e.message}")
+            return False
+        except Exception as e:
+            self._record(city, error=str(e))
+            return False
+
+        if not hourly_data:
+            self._record(city, error='empty response')
+            return False
+
+        self._record(city, base_date=base_date, base_time=base_time)
+        return True
+
+    def _record(self, city, base_date=None, base_time=None, error=None):
+        with self._lock:
+            info = self._freshness[city]
+            info['error'] = error
+            if error is None:
+                info['base_date'] = base_date
+                info['base_time'] = base_time
+                info['fetched_at'] = datetime.now()
+
+    def _run(self):
+        while not self._stop.is_set():
+            release = get_base_datetime()
+            pending = self.run_once()
+
+            # 실패한 도시는 같은 발표 주기 안에서 지수 백오프로 재시도
+            self.backoff = PREWARM_BACKOFF_START
+            while pending and not self._stop.is_set() and get_base_datetime() == release:
+                if self._stop.wait(self.backoff):
+                    return
+                pending = self.run_once(pending)
+                self.backoff = min(self.backoff * 2, PREWARM_BACKOFF_MAX)
+            self.backoff = 0
+
+            # 다음 발표 시각 + delay 까지 대기
+            wake_at = next_release_time(*release) + timedelta(seconds=self.delay)
+            wait_seconds = (wake_at - datetime.now()).total_seconds()
+            if wait_seconds > 0 and self._stop.wait(wait_seconds):
+                return
+
+
+forecast_prewarmer = ForecastPrewarmer()
@@ -0,0 +1,337 @@
+import asyncio
+import functools
+import os
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from circuit import circuit, is_upstream_failure, CircuitOpenError
+from metrics import metrics
+from quota import quota_governor, QuotaExceededError
+
+# OpenAI 호출 공통 설정
+LLM_TIMEOUT = float(os.getenv('LLM_TIMEOUT', 60))                # 호출 한 건의 최대 시간(초, 스트리밍은 전체 시간)
+LLM_MAX_CONCURRENCY = int(os.getenv('LLM_MAX_CONCURRENCY', 8))   # 동시에 진행할 수 있는 호출 수
+LLM_QUEUE_TIMEOUT = float(os.getenv('LLM_QUEUE_TIMEOUT', 5))     # 빈 자리를 기다리는 최대 시간(초)
+LLM_MAX_RETRIES = int(os.getenv('LLM_MAX_RETRIES', 1))           # 연결 오류/일시 오류 재시도 횟수
+LLM_RESERVE_TOKENS = 1000                                        # max_tokens가 없는 요청이 미리 잡아 둘 토큰 수
+LATENCY_WINDOW = 200                                             # 지연 시간 분위수 계산에 쓰는 최근 호출 수
+
+_STREAM_END = object()   # 스트리밍 응답이 끝났음을 알리는 표시
+
+
+class LLMBusyError(Exception):
+    """동시 호출 한도가 차서 제한 시간 안에 자리를 얻지 못함"""
+
+
+class LLMTimeoutError(Exception):
+    """응답이 전체 제한 시간을 넘김"""
+
+
+def _percentile(values, ratio):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * ratio))]
+
+
+class LLMClient:
+    """OpenAI 클라이언트 하나를 공유하며 동시 호출 수, 제한 시간, 지연/토큰 통계를 관리"""
+
+    def __init__(self, max_concurrency=LLM_MAX_CONCURRENCY, timeout=LLM_TIMEOUT, queue_timeout=LLM_QUEUE_TIMEOUT):
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self.queue_timeout = queue_timeout
+        self._client = None
+        self._async_client = None
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+        # 비동기 호출이 자리를 기다리는 스레드 (기다리는 동안 공용 스레드 풀의 정산 작업을 막지 않도록 따로 둠)
+        self._slot_waiters = ThreadPoolExecutor(max_workers=max_concurrency * 4, thread_name_prefix='llm-slot')
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._stats = {}
+
+    def client(self):
+        """공용 OpenAI 클라이언트 (처음 호출 시 생성, 커넥션 풀 재사용)"""
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    from openai import OpenAI
+                    self._client = OpenAI(
+                        api_key=os.getenv('OPENAI_API_KEY'),
+                        timeout=self.timeout,
+                        max_retries=LLM_MAX_RETRIES,
+                    )
+        return self._client
+
+    def async_client(self):
+        """공용 AsyncOpenAI 클라이언트 (async_runtime 루프에서만 사용)"""
+        if self._async_client is None:
+            from openai import AsyncOpenAI
+            self._async_client = AsyncOpenAI(
+                api_key=os.getenv('OPENAI_API_KEY'),
+                timeout=self.timeout,
+                max_retries=LLM_MAX_RETRIES,
+            )
+        return self._async_client
+
+    def complete(self, request, name='chat', timeout=None):
+        """chat.completions 한 건 호출 후 응답 텍스트 반환"""
+        reserved = self._reserve(request)
+        started = self._acquire(name, reserved)
+        usage = None
+        try:
+            response = self.client().chat.completions.create(timeout=timeout or self.timeout, **request)
+            usage = getattr(response, 'usage', None)
+            text = response.choices[0].message.content.strip()
+        except Exception as e:
+            self._release(name, started, reserved, usage, e)
+            raise
+        self._release(name, started, reserved, usage)
+        return text
+
+    def stream(self, request, name='chat', timeout=None):
+        """chat.completions 스트리밍 응답에서 텍스트 조각만 꺼냅니다 (전체 제한 시간 적용)
+
+        업스트림 응답은 별도 스레드에서 끝까지 읽어 큐에 넣으므로, 받는 쪽이 느려도 응답이 끝나면 바로 자리를 돌려줍니다.
+        조각이 오지 않아도 제한 시간이 지나면 LLMTimeoutError, 받는 쪽이 중간에 그만 읽으면 (close)
+        업스트림 응답을 닫고 그 자리에서 자리를 돌려줍니다.
+        """
+        timeout = timeout or self.timeout
+        reserved = self._reserve(request)
+        started = self._acquire(name, reserved)
+        deadline = started + timeout
+        chunks = queue.Queue()
+        state = {'response': None, 'stop': None, 'released': False}   # stop: 받는 쪽이 먼저 끝낸 이유 (시간 초과, 읽기 중단)
+        state_lock = threading.Lock()
+
+        def finish(usage, error):
+            # 읽기 스레드와 받는 쪽 중 먼저 끝난 쪽이 한 번만 정산하고 자리를 돌려줌
+            with state_lock:
+                if state['released']:
+                    return
+                state['released'] = True
+            self._release(name, started, reserved, usage, error)
+
+        def close_response():
+            response = state['response']
+            if response is not None and hasattr(response, 'close'):
+                try:
+                    response.close()
+                except Exception:
+                    pass
+
+        def read():
+            usage = None
+            error = None
+            try:
+                response = self.client().chat.completions.create(
+                    stream=True, stream_options={'include_usage': True}, timeout=timeout, **request
+                )
+                with state_lock:
+                    state['response'] = response
+                for chunk in response:
+                    if state['stop'] is not None:
+                        break
+                    if getattr(chunk, 'usage', None):
+                        usage = chunk.usage
+                    if chunk.choices and chunk.choices[0].delta.content:
+                        chunks.put(chunk.choices[0].delta.content)
+                error = state['stop']
+            except BaseException as e:
+                # 받는 쪽이 응답을 닫아서 난 오류면 닫은 이유로 기록
+                error = state['stop'] or e
+            finally:
+                close_response()
+                finish(usage, error)
+                chunks.put(_STREAM_END if error is None else error)
+
+        threading.Thread(target=read, name=f'llm-stream-{name}', daemon=True).start()
+        try:
+            while True:
+                try:
+                    # 이미 받은 조각은 제한 시간이 지나도 마저 전달
+                    item = chunks.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    raise LLMTimeoutError(f"응답이 {timeout:g}초 안에 끝나지 않았습니다.")
+                if item is _STREAM_END:
+                    return
+                if isinstance(item, BaseException):
+                    raise item
+                yield item
+        except BaseException as e:
+            with state_lock:
+                if state['stop'] is None:
+                    state['stop'] = e
+            close_response()
+            finish(None, e)
+            raise
+
+    async def acomplete(self, request, name='chat', timeout=None):
+        """complete의 비동기 버전 (동시 호출 한도는 동기 호출과 함께 적용)"""
+        timeout = timeout or self.timeout
+        # 회로 확인과 한도 차감(SQLite 쓰기)은 이벤트 루프 밖에서
+        reserved = await asyncio.to_thread(self._reserve, request)
+        started = await self._acquire_async(name, reserved)
+        usage = None
+        try:
+            response = await asyncio.wait_for(
+                self.async_client().chat.completions.create(timeout=timeout, **request), timeout
+            )
+            usage = getattr(response, 'usage', None)
+            text = response.choices[0].message.content.strip()
+        except asyncio.TimeoutError:
+            error = LLMTimeoutError(f"응답이 {timeout:g}초 안에 끝나지 않았습니다.")
+            self._release_soon(name, started, reserved, usage, error)
+            raise error
+        except BaseException as e:
+            self._release_soon(name, started, reserved, usage, e)
+            raise
+        self._release_soon(name, started, reserved, usage)
+        return text
+
+    def _release_soon(self, *args):
+        """_release를 이벤트 루프 밖 스레드에서 실행 (취소된 호출도 정산되도록 기다리지 않음)"""
+        asyncio.get_running_loop().run_in_executor(None, functools.partial(self._release, *args))
+
+    def _reserve(self, request):
+        """하루 토큰 한도에서 max_tokens만큼 미리 잡아 둠 (응답 후 실제 사용량으로 정산)"""
+        self._check_circuit()
+        reserved = request.get('max_tokens') or LLM_RESERVE_TOKENS
+        try:
+            quota_governor.acquire('openai', reserved)
+        except QuotaExceededError:
+            circuit('openai').release()
+            metrics.reject('openai')
+            raise
+        return reserved
+
+    def _acquire(self, name, reserved):
+        if not self._slots.acquire(timeout=self.queue_timeout):
+            quota_governor.settle('openai', reserved, 0)
+            self._reject(name)
+        return self._start()
+
+    async def _acquire_async(self, name, reserved):
+        """_acquire의 비동기 버전 (동기 호출과 같은 자리를 전용 스레드에서 기다려 이벤트 루프를 막지 않음)"""
+        deadline = time.monotonic() + self.queue_timeout
+        waiting = asyncio.get_running_loop().run_in_executor(self._slot_waiters, self._wait_slot, deadline)
+        try:
+            acquired = await asyncio.shield(waiting)
+        except asyncio.CancelledError:
+            # 기다리던 스레드가 나중에 자리를 얻으면 돌려주고, 보내지 않은 요청이므로 한도/회로 예약도 되돌림
+            waiting.add_done_callback(self._abandon_slot)
+            asyncio.get_running_loop().run_in_executor(None, self._unreserve, reserved)
+            raise
+        if not acquired:
+            await quota_governor.settle_async('openai', reserved, 0)
+            self._reject(name)
+        return self._start()
+
+    def _wait_slot(self, deadline):
+        return self._slots.acquire(timeout=max(0.0, deadline - time.monotonic()))
+
+    def _abandon_slot(self, waiting):
+        if not waiting.cancelled() and waiting.exception() is None and waiting.result():
+            self._slots.release()
+
+    def _unreserve(self, reserved):
+        """보내지 않고 취소된 요청의 예약 되돌리기 (토큰 환불, 회로 시험 자리 반환)"""
+        quota_governor.settle('openai', reserved, 0)
+        circuit('openai').release()
+
+    def _check_circuit(self):
+        try:
+            circuit('openai').before()
+        except CircuitOpenError:
+            metrics.reject('openai')
+            raise
+
+    def _reject(self, name):
+        # 보내지 않은 요청이므로 회로의 시험 요청 자리도 돌려줌
+        circuit('openai').release()
+        metrics.reject('openai')
+        with self._lock:
+            self._entry(name)['rejected'] += 1
+        raise LLMBusyError('요청이 많아 잠시 후 다시 시도해주세요.')
+
+    def _start(self):
+        with self._lock:
+            self._in_flight += 1
+        return metrics.begin('openai')
+
+    def _release(self, name, started, reserved, usage=None, error=None):
+        """보낸 요청의 마무리 (토큰 정산, 지표/회로 기록, 자리 반환)
+
+        보내기 전에 거절된 요청(자리 없음, 회로/한도)은 여기까지 오지 않고 0으로 정산합니다.
+        """
+        elapsed = time.monotonic() - started
+        if usage is not None:
+            used = (getattr(usage, 'prompt_tokens', 0) or 0) + (getattr(usage, 'completion_tokens', 0) or 0)
+        elif error is not None and getattr(error, 'status_code', None) is not None:
+            used = 0          # 오류 응답(4xx/5xx)은 생성 결과가 없어 과금되지 않음
+        else:
+            used = reserved   # 보낸 뒤 시간 초과/중단된 요청은 과금될 수 있으므로 미리 잡은 만큼 사용으로 봄
+        quota_governor.settle('openai', reserved, used)
+        metrics.end('openai', started, error=error)
+        if error is None:
+            circuit('openai').record(False)
+        elif not isinstance(error, (GeneratorExit, asyncio.CancelledError)):
+            circuit('openai').record(is_upstream_failure(error))
+        self._slots.release()
+        with self._lock:
+            self._in_flight -= 1
+            entry = self._entry(name)
+            entry['calls'] += 1
+            entry['latencies'].append(elapsed)
+            entry['latency_total'] += elapsed
+            entry['latency_max'] = max(entry['latency_max'], elapsed)
+            if error is not None and not isinstance(error, (GeneratorExit, asyncio.CancelledError)):
+                entry['errors'] += 1
+                if isinstance(error, LLMTimeoutError) or error.__class__.__name__ == 'APITimeoutError':
+                    entry['timeouts'] += 1
+            if usage is not None:
+                entry['prompt_tokens'] += getattr(usage, 'prompt_tokens', 0) or 0
+                entry['completion_tokens'] += getattr(usage, 'completion_tokens', 0) or 0
+
+    def _entry(self, name):
+        entry = self._stats.get(name)
+        if entry is None:
+            entry = self._stats[name] = {
+                'calls': 0, 'errors': 0, 'timeouts': 0, 'rejected': 0,
+                'prompt_tokens': 0, 'completion_tokens': 0,
+                'latency_total': 0.0, 'latency_max': 0.0,
+                'latencies': deque(maxlen=LATENCY_WINDOW),
+            }
+        return entry
+
+    def stats(self):
+        """호출 이름별 호출 수, 오류, 지연 시간(ms), 토큰 사용량"""
+        with self._lock:
+            calls = {}
+            for name, entry in self._stats.items():
+                latencies = list(entry['latencies'])
+                calls[name] = {
+                    'calls': entry['calls'],
+                    'errors': entry['errors'],
+                    'timeouts': entry['timeouts'],
+                    'rejected': entry['rejected'],
+                    'prompt_tokens': entry['prompt_tokens'],
+                    'completion_tokens': entry['completion_tokens'],
+                    'latency_avg_ms': round(entry['latency_total'] / entry['calls'] * 1000, 1) if entry['calls'] else 0.0,
+                    'latency_p50_ms': round(_percentile(latencies, 0.5) * 1000, 1),
+                    'latency_p95_ms': round(_percentile(latencies, 0.95) * 1000, 1),
+                    'latency_max_ms': round(entry['latency_max'] * 1000, 1),
+                }
+            return {
+                'in_flight': self._in_flight,
+                'max_concurrency': self.max_concurrency,
+                'timeout': self.timeout,
+                'calls': calls,
+            }
+
+
+# 공용 OpenAI 클라이언트 인스턴스
+llm_client = LLMClient()
@@ -0,0 +1,248 @@
+"""업스트림 지표(Prometheus 텍스트 형식)와 구조화 로그
+
+지표는 /metrics 에서, 로그는 stderr 로 한 줄에 JSON 하나씩 출력합니다.
+로그는 큐를 거쳐 별도 스레드에서 쓰므로 요청 스레드가 출력 때문에 멈추지 않습니다.
+"""
+import asyncio
+import atexit
+import json
+import logging
+import os
+import queue
+import random
+import sys
+import threading
+import time
+from logging.handlers import QueueHandler, QueueListener
+
+# 응답 시간 히스토그램 구간(초)
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 15, 30, 60)
+# 처음부터 0으로 노출할 업스트림 이름
+UPSTREAMS = ('kma', 'kakao_address', 'kakao_keyword', 'stock', 'openai')
+OUTCOMES = ('ok', 'error', 'timeout', 'rejected')
+
+LOG_EVENTS = os.getenv('LOG_EVENTS', '1') == '1'               # 0이면 구조화 로그를 모두 끔
+LOG_SAMPLE_RATE = float(os.getenv('LOG_SAMPLE_RATE', 0.1))     # info 로그를 남길 비율 (경고/오류는 모두 기록)
+
+LOG_LEVELS = {'info': logging.INFO, 'warning': logging.WARNING, 'error': logging.ERROR}
+
+
+def is_timeout(error):
+    """요청/OpenAI/asyncio 타임아웃 예외인지"""
+    import requests
+
+    if isinstance(error, (requests.exceptions.Timeout, asyncio.TimeoutError)):
+        return True
+    return error.__class__.__name__ in ('LLMTimeoutError', 'APITimeoutError', 'TimeoutException')
+
+
+class UpstreamMetrics:
+    """업스트림별 응답 시간 히스토그램, 결과별 요청 수, 진행 중인 요청 수"""
+
+    def __init__(self, buckets=LATENCY_BUCKETS, upstreams=UPSTREAMS):
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self._series = {}
+        for upstream in upstreams:
+            self._entry(upstream)
+
+    def begin(self, upstream):
+        """요청 시작 (시작 시각 반환, end()에 그대로 전달)"""
+        with self._lock:
+            self._entry(upstream)['in_flight'] += 1
+        return time.monotonic()
+
+    def end(self, upstream, started, error=None, status=None):
+        """요청 종료 (예외나 5xx 응답은 오류로 집계, 호출자 취소는 성공으로 집계)"""
+        elapsed = time.monotonic() - started
+        if error is not None and not isinstance(error, (GeneratorExit, asyncio.CancelledError)):
+            outcome = 'timeout' if is_timeout(error) else 'error'
+        elif status is not None and status >= 500:
+            outcome = 'error'
+        else:
+            outcome = 'ok'
+
+        with self._lock:
+            entry = self._entry(upstream)
+            entry['in_flight'] -= 1
+            entry['outcomes'][outcome] += 1
+            entry['sum'] += elapsed
+            entry['count'] += 1
+            for index, bound in enumerate(self.buckets):
+                if elapsed <= bound:
+                    entry['buckets'][index] += 1
+                    break
+            else:
+                entry['buckets'][-1] += 1
+
+    def reject(self, upstream):
+        """보내기 전에 거절된 요청 (동시 호출 한도 초과 등)"""
+        with self._lock:
+            self._entry(upstream)['outcomes']['rejected'] += 1
+
+    def _entry(self, upstream):
+        entry = self._series.get(upstream)
+        if entry is None:
+            entry = self._series[upstream] = {
+                'in_flight': 0,
+                'sum': 0.0,
+                'count': 0,
+                'buckets': [0] * (len(self.buckets) + 1),   # 마지막 칸은 +Inf
+                'outcomes': dict.fromkeys(OUTCOMES, 0),
+            }
+        return entry
+
+    def snapshot(self):
+        with self._lock:
+            return {upstream: dict(entry, buckets=list(entry['buckets']), outcomes=dict(entry['outcomes']))
+                    for upstream, entry in self._series.items()}
+
+    def render(self, caches=None, llm=None, circuits=None, quota=None, labels=None):
+        """Prometheus 텍스트 형식 (caches: cache_stats(), llm: llm_client.stats(), circuits: circuit_stats(),
+        quota: quota_governor.stats(), labels: 모든 시계열에 붙일 레이블 (예: {'worker': '0'}))"""
+        series = self.snapshot()
+        lines = []
+
+        def header(name, kind, help_text):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+
+        header('oneword_upstream_request_duration_seconds', 'histogram', '업스트림 응답 시간(초)')
+        for upstream, entry in sorted(series.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + ('+Inf',), entry['buckets']):
+                cumulative += count
+                lines.append(f'oneword_upstream_request_duration_seconds_bucket'
+                             f'{{upstream="{upstream}",le="{bound}"}} {cumulative}')
+            lines.append(f'oneword_upstream_request_duration_seconds_sum{{upstream="{upstream}"}} {entry["sum"]:.6f}')
+            lines.append(f'oneword_upstream_request_duration_seconds_count{{upstream="{upstream}"}} {entry["count"]}')
+
+        header('oneword_upstream_requests_total', 'counter', '업스트림 요청 수 (결과별)')
+        for upstream, entry in sorted(series.items()):
+            for outcome, count in entry['outcomes'].items():
+                lines.append(f'oneword_upstream_requests_total{{upstream="{upstream}",outcome="{outcome}"}} {count}')
+
+        header('oneword_upstream_in_flight', 'gauge', '응답을 기다리는 업스트림 요청 수')
+        for upstream, entry in sorted(series.items()):
+            lines.append(f'oneword_upstream_in_flight{{upstream="{upstream}"}} {entry["in_flight"]}')
+
+        if caches is not None:
+            for name, kind, key, help_text in (
+                ('oneword_cache_hits_total', 'counter', 'hits', '캐시 적중 수'),
+                ('oneword_cache_misses_total', 'counter', 'misses', '캐시 실패 수'),
+                ('oneword_cache_evictions_total', 'counter', 'evictions', '용량 초과로 밀려난 항목 수'),
+                ('oneword_cache_entries', 'gauge', 'size', '메모리 캐시 항목 수'),
+            ):
+                header(name, kind, help_text)
+                for cache, stats in sorted(caches.items()):
+                    lines.append(f'{name}{{cache="{cache}"}} {stats[key]}')
+
+        if circuits is not None:
+            header('oneword_circuit_open', 'gauge', '회로 차단기 상태 (0: 정상, 1: 열림, 0.5: 시험 중)')
+            for upstream, stats in sorted(circuits.items()):
+                value = {'closed': 0, 'open': 1, 'half_open': 0.5}[stats['state']]
+                lines.append(f'oneword_circuit_open{{upstream="{upstream}"}} {value}')
+            header('oneword_circuit_rejected_total', 'counter', '회로가 열려 보내지 않은 요청 수')
+            for upstream, stats in sorted(circuits.items()):
+                lines.append(f'oneword_circuit_rejected_total{{upstream="{upstream}"}} {stats["rejected"]}')
+
+        if quota is not None:
+            header('oneword_quota_used', 'gauge', '오늘 사용한 한도 (openai는 토큰 수)')
+            for upstream, stats in sorted(quota.items()):
+                lines.append(f'oneword_quota_used{{upstream="{upstream}"}} {stats["used_today"]}')
+            header('oneword_quota_budget', 'gauge', '하루 한도')
+            for upstream, stats in sorted(quota.items()):
+                lines.append(f'oneword_quota_budget{{upstream="{upstream}"}} {stats["budget"]}')
+            header('oneword_quota_denied_total', 'counter', '한도 부족으로 보내지 않은 요청 수 (우선순위별)')
+            for upstream, stats in sorted(quota.items()):
+                for priority, count in stats['denied'].items():
+                    lines.append(f'oneword_quota_denied_total{{upstream="{upstream}",priority="{priority}"}} {count}')
+
+        if llm is not None:
+            header('oneword_llm_tokens_total', 'counter', 'OpenAI 토큰 사용량 (호출 이름별)')
+            for call, stats in sorted(llm['calls'].items()):
+                lines.append(f'oneword_llm_tokens_total{{call="{call}",type="prompt"}} {stats["prompt_tokens"]}')
+                lines.append(f'oneword_llm_tokens_total{{call="{call}",type="completion"}} {stats["completion_tokens"]}')
+
+        if labels:
+            lines = [add_labels(line, labels) for line in lines]
+        return '\n'.join(lines) + '\n'
+
+
+def add_labels(line, labels):
+    """시계열 한 줄에 레이블 추가 (# 주석 줄은 그대로)"""
+    if line.startswith('#'):
+        return line
+    extra = ','.join(f'{key}="{value}"' for key, value in labels.items())
+    name, _, rest = line.partition(' ')
+    if name.endswith('}'):
+        return f"{name[:-1]},{extra}}} {rest}"
+    return f"{name}{{{extra}}} {rest}"
+
+
+def merge_expositions(texts):
+    """여러 프로세스의 Prometheus 텍스트를 하나로 합침 (지표별로 HELP/TYPE 한 번, 시계열은 이어 붙임)
+
+    시계열은 프로세스마다 다른 레이블(worker 등)이 붙어 있어야 합니다.
+    """
+    headers = {}
+    samples = {}
+    for text in texts:
+        family = None
+        for line in text.splitlines():
+            if not line:
+                continue
+            if line.startswith('# HELP ') or line.startswith('# TYPE '):
+                family = line.split(' ', 3)[2]
+                headers.setdefault(family, [])
+                samples.setdefault(family, [])
+                if len(headers[family]) < 2 and line not in headers[family]:
+                    headers[family].append(line)
+            elif family is not None:
+                samples[family].append(line)
+
+    lines = []
+    for family, header in headers.items():
+        lines.extend(header)
+        lines.extend(samples[family])
+    return '\n'.join(lines) + '\n'
+
+
+_logger = None
+_logger_lock = threading.Lock()
+
+
+def _get_logger():
+    """stderr 출력은 QueueListener 스레드가 담당 (처음 로그를 남길 때 설정)"""
+    global _logger
+    if _logger is None:
+        with _logger_lock:
+            if _logger is None:
+                records = queue.SimpleQueue()
+                handler = logging.StreamHandler(sys.stderr)
+                handler.setFormatter(logging.Formatter('%(message)s'))
+                listener = QueueListener(records, handler)
+                listener.start()
+                atexit.register(listener.stop)
+
+                logger = logging.getLogger('oneword')
+                logger.setLevel(logging.INFO)
+                logger.propagate = False
+                logger.addHandler(QueueHandler(records))
+                _logger = logger
+    return _logger
+
+
+def log_event(event, level='info', sampled=True, **fields):
+    """구조화 로그 한 줄 (info는 LOG_SAMPLE_RATE 비율만 기록, 시작 정보처럼 한 번만 남기는 로그는 sampled=False)"""
+    if not LOG_EVENTS:
+        return
+    if level == 'info' and sampled and random.random() >= LOG_SAMPLE_RATE:
+        return
+    record = {'ts': round(time.time(), 3), 'level': level, 'event': event}
+    record.update(fields)
+    _get_logger().log(LOG_LEVELS[level], json.dumps(record, ensure_ascii=False, default=str))
+
+
+# 공용 지표 인스턴스
+metrics = UpstreamMetrics()
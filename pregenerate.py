@@ -0,0 +1,175 @@
+"""인기 레시피/명언 미리 생성 작업
+
+레시피는 recipe_cache, 명언은 quote_store 에 저장되며 서비스는 이 저장소를 먼저 확인합니다.
+이미 저장된 항목은 건너뛰므로 중단 후 다시 실행하면 이어서 진행합니다.
+
+사용 예:
+    python pregenerate.py --recipes data/popular_dishes.txt --quotes data/popular_quote_topics.txt
+    python pregenerate.py --recipes dishes.txt --workers 2 --rpm 30 --refresh-within 86400
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from api_services import recipe_service, quote_service, recipe_cache, quote_store, quote_topic_key
+from quota import background
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data')
+MAX_RETRIES = 5
+
+
+class RateLimiter:
+    """분당 요청 수 제한 (토큰 버킷)"""
+
+    def __init__(self, per_minute):
+        self.rate = per_minute / 60.0
+        self.capacity = max(1.0, per_minute / 10.0)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, count=1):
+        """count개 요청을 보낼 수 있을 때까지 대기"""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= count:
+                    self.tokens -= count
+                    return
+                wait = (count - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+def read_items(path):
+    """한 줄에 하나씩 읽기 (빈 줄, # 주석 제외, 중복 제거)"""
+    items = []
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            line = line.split('#', 1)[0].strip()
+            if line and line not in items:
+                items.append(line)
+    return items
+
+
+def retry_after(error, attempt):
+    """OpenAI 한도 초과 시 대기 시간 (Retry-After 헤더 우선, 없으면 지수 백오프)"""
+    response = getattr(error, 'response', None)
+    header = response.headers.get('retry-after') if response is not None else None
+    try:
+        return float(header)
+    except (TypeError, ValueError):
+        return min(2 ** attempt * 5, 120)
+
+
+def call_with_retry(func, *args):
+    """한도 초과(429)와 일시 오류는 기다렸다가 다시 시도"""
+    import openai
+
+    for attempt in range(MAX_RETRIES):
+        try:
+            return func(*args)
+        except (openai.RateLimitError, openai.APITimeoutError, openai.APIConnectionError) as e:
+            if attempt == MAX_RETRIES - 1:
+                raise
+            wait = retry_after(e, attempt)
+            print(f"  ⏳ 요청 한도/연결 오류, {wait:.0f}초 후 재시도: {e.__class__.__name__}")
+            time.sleep(wait)
+
+
+def needs_refresh(cache, key, refresh_within):
+    remaining = cache.remaining_ttl(key)
+    return remaining is None or remaining < refresh_within
+
+
+def generate_recipe(food_name, limiter, args):
+    if not args.force and not needs_refresh(recipe_cache, food_name, args.refresh_within):
+        return 'skip'
+    limiter.acquire(2)  # 2단계 체인 = 요청 2번
+    with background():
+        recipe = call_with_retry(recipe_service.generate_recipe, food_name)
+    recipe_service.store_recipe(food_name, recipe, ttl=args.ttl)
+    return 'done'
+
+
+def generate_quotes(keyword, limiter, args):
+    key = quote_topic_key(keyword)
+    quotes = [] if args.force or needs_refresh(quote_store, key, args.refresh_within) else list(quote_store.get(key) or [])
+    if len(quotes) >= args.quotes_per_topic:
+        return 'skip'
+
+    attempts = 0
+    while len(quotes) < args.quotes_per_topic and attempts < args.quotes_per_topic * 2:
+        attempts += 1
+        limiter.acquire()
+        with background():
+            quote = call_with_retry(quote_service.generate_quote, keyword)
+        if quote not in quotes:
+            quotes.append(quote)
+            # 한 건마다 저장해 중단되어도 이어서 진행
+            quote_store.set(key, quotes, ttl=args.ttl)
+    return 'done'
+
+
+def run(tasks, args):
+    limiter = RateLimiter(args.rpm)
+    counts = {'done': 0, 'skip': 0, 'failed': 0}
+
+    with ThreadPoolExecutor(max_workers=args.workers) as executor:
+        futures = {executor.submit(func, item, limiter, args): (label, item) for label, func, item in tasks}
+        for future in as_completed(futures):
+            label, item = futures[future]
+            try:
+                status = future.result()
+            except Exception as e:
+                status = 'failed'
+                print(f"❌ {label} '{item or '*'}': {e}")
+            else:
+                print(f"{'✅' if status == 'done' else '⏭️ '} {label} '{item or '*'}'")
+            counts[status] += 1
+
+    return counts
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='인기 레시피/명언을 미리 생성해 로컬 저장소에 저장합니다.')
+    parser.add_argument('--recipes', help='요리 이름 목록 파일 (한 줄에 하나)')
+    parser.add_argument('--quotes', help="명언 주제 목록 파일 (한 줄에 하나, '*' 는 주제 없음)")
+    parser.add_argument('--workers', type=int, default=int(os.getenv('PREGEN_WORKERS', 4)), help='동시 작업 수')
+    parser.add_argument('--rpm', type=int, default=int(os.getenv('PREGEN_RPM', 60)), help='분당 최대 OpenAI 요청 수')
+    parser.add_argument('--quotes-per-topic', type=int, default=5, help='주제별로 만들어 둘 명언 수')
+    parser.add_argument('--ttl', type=int, default=int(os.getenv('PREGEN_TTL', 30 * 24 * 3600)), help='저장 유지 시간(초)')
+    parser.add_argument('--refresh-within', type=int, default=0, help='남은 유지 시간이 이보다 짧은 항목은 다시 생성(초)')
+    parser.add_argument('--force', action='store_true', help='저장된 항목도 모두 다시 생성')
+    args = parser.parse_args(argv)
+
+    if not args.recipes and not args.quotes:
+        args.recipes = os.path.join(DATA_DIR, 'popular_dishes.txt')
+        args.quotes = os.path.join(DATA_DIR, 'popular_quote_topics.txt')
+
+    if not recipe_service.openai_api_key:
+        print('⚠️ OPENAI_API_KEY 가 설정되지 않았습니다.')
+        return 1
+
+    tasks = []
+    if args.recipes:
+        tasks += [('레시피', generate_recipe, item) for item in read_items(args.recipes)]
+    if args.quotes:
+        tasks += [('명언', generate_quotes, None if item == '*' else item) for item in read_items(args.quotes)]
+
+    started = time.time()
+    counts = run(tasks, args)
+    print(f"\n완료 {counts['done']} · 건너뜀 {counts['skip']} · 실패 {counts['failed']} ({time.time() - started:.1f}초)")
+    return 1 if counts['failed'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,289 @@
+import asyncio
+import contextvars
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+import requests
+
+from cache import CACHE_DB_PATH
+from metrics import log_event
+
+# 업스트림별 하루 사용 한도 (0이면 제한 없음)
+# - kma/kakao/stock: 호출 수, openai: 토큰 수
+QUOTA_DEFAULTS = {
+    'kma': ('KMA_API_KEY', 1000),
+    'kakao': ('KAKAO_API_KEY', 100000),
+    'stock': ('STOCK_API_KEY', 10000),
+    'openai': ('OPENAI_API_KEY', 0),
+}
+QUOTA_BURST = float(os.getenv('QUOTA_BURST', 0.1))                 # 순간 사용 가능량 (하루 한도 대비 비율)
+QUOTA_BACKGROUND_SHARE = float(os.getenv('QUOTA_BACKGROUND_SHARE', 0.5))  # 백그라운드 작업이 쓸 수 있는 하루 한도 비율
+QUOTA_LOW_WATER = float(os.getenv('QUOTA_LOW_WATER', 0.1))         # 남은 한도가 이 비율보다 적으면 캐시 결과 우선
+
+# 현재 작업의 우선순위 ('user' 또는 'background')
+_priority = contextvars.ContextVar('quota_priority', default='user')
+
+
+class QuotaExceededError(requests.exceptions.ConnectionError):
+    """사용 한도가 부족해 요청을 보내지 않음 (기존 요청 오류 처리 경로를 그대로 탐)"""
+
+
+@contextmanager
+def background():
+    """이 블록 안의 업스트림 호출은 백그라운드 우선순위 (미리 받기, 명언 풀 보충 등)"""
+    token = _priority.set('background')
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+def current_priority():
+    return _priority.get()
+
+
+def load_budget(upstream):
+    """하루 한도 (환경변수 QUOTA_<UPSTREAM>_DAILY 로 덮어쓰기 가능)"""
+    default = QUOTA_DEFAULTS.get(upstream, (None, 0))[1]
+    return int(os.getenv(f"QUOTA_{upstream.upper()}_DAILY", default))
+
+
+def key_id(upstream):
+    """API 키 구분용 짧은 식별자 (키 자체는 노출하지 않음)"""
+    env = QUOTA_DEFAULTS.get(upstream, (None, 0))[0]
+    api_key = os.getenv(env) if env else None
+    return hashlib.sha1(api_key.encode('utf-8')).hexdigest()[:8] if api_key else None
+
+
+class UsageStore:
+    """업스트림별 하루 사용량 (SQLite 파일, serve.py 워커 프로세스들이 함께 씀)
+
+    사용량은 조건부 UPDATE 한 번으로 늘리므로 여러 프로세스가 동시에 써도 한도를 넘지 않습니다.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or CACHE_DB_PATH
+        self._conn = None
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=5, check_same_thread=False)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS quota_usage ('
+                'quota_key TEXT NOT NULL, day TEXT NOT NULL, used INTEGER NOT NULL DEFAULT 0, '
+                'PRIMARY KEY (quota_key, day))'
+            )
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def add(self, quota_key, day, cost, below=None, max_after=None):
+        """사용량에 cost를 더하고 바뀐 사용량 반환 (used < below, used + cost <= max_after 조건을 어기면 None)"""
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                conn.execute('INSERT OR IGNORE INTO quota_usage (quota_key, day, used) VALUES (?, ?, 0)',
+                             (quota_key, day))
+                row = conn.execute(
+                    'UPDATE quota_usage SET used = MAX(0, used + ?) '
+                    'WHERE quota_key = ? AND day = ? AND used < ? AND used + ? <= ? RETURNING used',
+                    (cost, quota_key, day, 1e18 if below is None else below,
+                     cost, 1e18 if max_after is None else max_after)
+                ).fetchone()
+            return None if row is None else row[0]
+
+    def get(self, quota_key, day):
+        with self._lock:
+            row = self._connect().execute(
+                'SELECT used FROM quota_usage WHERE quota_key = ? AND day = ?', (quota_key, day)
+            ).fetchone()
+        return row[0] if row else 0
+
+    def purge_before(self, day):
+        """지난 날짜 기록 정리"""
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                conn.execute('DELETE FROM quota_usage WHERE day < ?', (day,))
+
+
+class QuotaBucket:
+    """업스트림 하나의 토큰 버킷 + 하루 사용량
+
+    하루 한도를 초당 budget/86400 속도로 채우므로 순간 사용량이 몰려도 한도를 오전에 다 쓰지 않습니다.
+    백그라운드 작업은 버킷이 절반 넘게 차 있고 하루 사용량이 QUOTA_BACKGROUND_SHARE 미만일 때만 사용합니다.
+    하루 사용량은 usage(UsageStore)에 기록해 재시작이나 여러 워커 프로세스에서도 한도를 함께 쓰고,
+    토큰 버킷(순간 사용량 조절)은 프로세스별입니다.
+    """
+
+    def __init__(self, upstream, budget, usage=None):
+        self.upstream = upstream
+        self.budget = budget
+        self.key_id = key_id(upstream)
+        self.usage = usage
+        self.quota_key = f"{upstream}:{self.key_id or '-'}"
+        self.rate = budget / 86400.0
+        self.capacity = max(1.0, budget * QUOTA_BURST)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.day = datetime.now().date()
+        self.used = 0    # 마지막으로 확인한 하루 사용량 (공유 저장소를 못 쓰면 프로세스 안에서만 집계)
+        self.denied = {'user': 0, 'background': 0}
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        today = datetime.now().date()
+        if today != self.day:
+            self.day = today
+            self.used = 0
+            if self.usage is not None:
+                self._try_store(self.usage.purge_before, today.isoformat())
+
+    def _try_store(self, func, *args):
+        """공유 저장소 호출 (오류면 (False, None))"""
+        try:
+            return True, func(*args)
+        except sqlite3.Error as e:
+            log_event('quota_store_error', level='error', upstream=self.upstream, error=str(e))
+            return False, None
+
+    def _add_used(self, cost, below=None, max_after=None):
+        """하루 사용량에 cost를 더함 (조건을 어기면 False)"""
+        if self.usage is not None:
+            ok, used = self._try_store(self.usage.add, self.quota_key, self.day.isoformat(), cost, below, max_after)
+            if ok:
+                if used is None:
+                    return False
+                self.used = used
+                return True
+        if (below is not None and self.used >= below) or (max_after is not None and self.used + cost > max_after):
+            return False
+        self.used = max(0, self.used + cost)
+        return True
+
+    def _used_today(self):
+        if self.usage is not None:
+            ok, used = self._try_store(self.usage.get, self.quota_key, self.day.isoformat())
+            if ok:
+                self.used = used
+        return self.used
+
+    def acquire(self, cost=1, priority='user'):
+        """cost만큼 사용할 수 있으면 차감하고 True"""
+        with self._lock:
+            self._refill()
+            if priority == 'background':
+                allowed = (self.tokens - cost >= self.capacity * 0.5
+                           and self._add_used(cost, max_after=self.budget * QUOTA_BACKGROUND_SHARE))
+            else:
+                allowed = self.tokens >= min(cost, self.capacity) and self._add_used(cost, below=self.budget)
+            if not allowed:
+                self.denied[priority] += 1
+                return False
+            self.tokens -= cost
+            return True
+
+    def settle(self, reserved, actual):
+        """미리 잡아 둔 사용량(reserved)을 실제 사용량으로 맞춤 (OpenAI 토큰)"""
+        with self._lock:
+            self._refill()
+            self.tokens -= actual - reserved
+            self._add_used(actual - reserved)
+
+    def _is_low(self, used):
+        return self.tokens < 1 or self.budget - used < self.budget * QUOTA_LOW_WATER
+
+    def is_low(self):
+        with self._lock:
+            self._refill()
+            return self._is_low(self._used_today())
+
+    def stats(self):
+        with self._lock:
+            self._refill()
+            used = self._used_today()
+            return {
+                'key': self.key_id,
+                'budget': self.budget,
+                'used_today': used,
+                'remaining_today': max(0, self.budget - used),
+                'tokens': round(self.tokens, 1),
+                'capacity': round(self.capacity, 1),
+                'low': self._is_low(used),
+                'denied': dict(self.denied),
+            }
+
+
+class QuotaGovernor:
+    """업스트림(API 키)별 사용 한도 관리"""
+
+    def __init__(self, usage=None):
+        self.usage = usage
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def bucket(self, upstream):
+        """한도가 없는 업스트림은 None"""
+        if upstream not in self._buckets:
+            with self._lock:
+                if upstream not in self._buckets:
+                    budget = load_budget(upstream)
+                    self._buckets[upstream] = QuotaBucket(upstream, budget, self.usage) if budget > 0 else None
+        return self._buckets[upstream]
+
+    def acquire(self, upstream, cost=1):
+        """사용량 차감 (한도가 부족하면 QuotaExceededError)"""
+        bucket = self.bucket(upstream)
+        if bucket is None:
+            return
+        priority = current_priority()
+        if not bucket.acquire(cost, priority):
+            raise QuotaExceededError(
+                f"{upstream} API 사용 한도가 부족합니다 ({'백그라운드 작업 보류' if priority == 'background' else '잠시 후 다시 시도'})"
+            )
+
+    def settle(self, upstream, reserved, actual):
+        bucket = self.bucket(upstream)
+        if bucket is not None:
+            bucket.settle(reserved, actual)
+
+    def is_low(self, upstream):
+        """남은 한도가 적어 캐시된 결과를 우선 사용해야 하는지"""
+        bucket = self.bucket(upstream)
+        return bucket is not None and bucket.is_low()
+
+    # 이벤트 루프용: 공유 저장소(SQLite) 읽기/쓰기는 루프를 막지 않도록 스레드에서 실행
+    # (asyncio.to_thread가 context를 복사하므로 background() 우선순위도 그대로 전달됨)
+    async def acquire_async(self, upstream, cost=1):
+        if self.bucket(upstream) is not None:
+            await asyncio.to_thread(self.acquire, upstream, cost)
+
+    async def settle_async(self, upstream, reserved, actual):
+        if self.bucket(upstream) is not None:
+            await asyncio.to_thread(self.settle, upstream, reserved, actual)
+
+    async def is_low_async(self, upstream):
+        if self.bucket(upstream) is None:
+            return False
+        return await asyncio.to_thread(self.is_low, upstream)
+
+    def stats(self):
+        with self._lock:
+            buckets = dict(self._buckets)
+        return {upstream: bucket.stats() for upstream, bucket in buckets.items() if bucket is not None}
+
+
+# 공용 사용 한도 관리자 (하루 사용량은 디스크 캐시와 같은 SQLite 파일에 기록)
+quota_governor = QuotaGovernor(UsageStore())
@@ -0,0 +1,376 @@
+from html import escape
+
+
+class Result:
+    """카테고리별 결과 (텍스트/HTML은 처음 필요할 때 한 번만 만들어 보관)"""
+
+    __slots__ = ('_text', '_html')
+    kind = 'text'
+
+    def __init__(self):
+        self._text = None
+        self._html = None
+
+    @property
+    def text(self):
+        if self._text is None:
+            self._text = self.render_text()
+        return self._text
+
+    @property
+    def html(self):
+        if self._html is None:
+            self._html = self.render_html()
+        return self._html
+
+    def render_text(self):
+        """기본 텍스트 (fields()의 항목을 한 줄씩, 결과 종류마다 다시 정의)"""
+        return '\n'.join(f"{key}: {value}" for key, value in self.fields().items())
+
+    def render_html(self):
+        return escape(self.text).replace('\n', '<br>')
+
+    def fields(self):
+        """JSON 응답에 담을 구조화된 값"""
+        return {}
+
+    def state(self):
+        """다시 만들 때 생성자에 넘길 값 (디스크 저장용, load_result 참고)"""
+        return self.fields()
+
+    def to_dict(self):
+        return dict(self.fields(), type=self.kind, text=self.text)
+
+    def __str__(self):
+        return self.text
+
+
+class TextResult(Result):
+    """안내/오류 메시지나 명언처럼 텍스트만 있는 결과"""
+
+    __slots__ = ()
+
+    def __init__(self, text):
+        super().__init__()
+        self._text = text
+
+
+class WeatherResult(Result):
+    """기상청 초단기예보 결과"""
+
+    __slots__ = ('location', 'observed_at', 'current', 'forecast', 'tips', 'base_date', 'base_time')
+    kind = 'weather'
+
+    def __init__(self, location, observed_at, current, forecast, tips, base_date, base_time):
+        """current: {'emoji', 'desc', 'temp', 'humidity', 'wind', 'rain'} 또는 None
+        forecast: [{'time_emoji', 'time_label', 'weather_emoji', 'weather_desc', 'temp'}]
+        """
+        super().__init__()
+        self.location = location
+        self.observed_at = observed_at
+        self.current = current
+        self.forecast = forecast
+        self.tips = tips
+        self.base_date = base_date
+        self.base_time = base_time
+
+    @property
+    def updated(self):
+        return f"{self.base_date[4:6]}.{self.base_date[6:8]} {self.base_time[:2]}:{self.base_time[2:4]}"
+
+    def current_lines(self):
+        """현재 날씨 카드의 항목별 줄 [(CSS 클래스, 내용)]"""
+        current = self.current
+        lines = []
+        if current['temp'] != 'N/A':
+            lines.append(('weather-temp', f"🌡️  온도: {current['temp']:>8}°C"))
+        if current['humidity'] != 'N/A':
+            lines.append(('weather-humidity', f"💧  습도: {current['humidity']:>8}%"))
+        if current['wind'] != 'N/A':
+            lines.append(('weather-wind', f"💨  바람: {current['wind']:>7}m/s"))
+        if current['rain'] != '0' and current['rain'] != 'N/A':
+            lines.append(('weather-rain', f"🌧️  강수: {current['rain']:>8}mm"))
+        return lines
+
+    def render_text(self):
+        result = f"🌤️ 날씨 정보\n"
+        result += f"📍 {self.location}\n\n"
+
+        if self.current:
+            result += f"🕐 현재 날씨 ({self.observed_at})\n"
+            result += f"┌─────────────────────┐\n"
+            result += f"│ {self.current['emoji']} {self.current['desc']:^15} │\n"
+            for _, line in self.current_lines():
+                result += f"│ {line} │\n"
+            result += f"└─────────────────────┘\n\n"
+
+        if self.forecast:
+            result += f"📅 오늘의 예보\n"
+            for forecast in self.forecast:
+                result += f"{forecast['time_emoji']} {forecast['time_label']:^4} │ "
+                result += f"{forecast['weather_emoji']} {forecast['weather_desc']:^6} │ "
+                if forecast['temp'] != 'N/A':
+                    result += f"🌡️ {forecast['temp']:>3}°C"
+                result += "\n"
+            result += f"\n"
+
+        if self.tips:
+            result += f"💡 날씨 팁\n"
+            for tip in self.tips:
+                result += f"   {tip}\n"
+            result += "\n"
+
+        result += f"📊 한국기상청 │ 업데이트: {self.updated}"
+        return result
+
+    def render_html(self):
+        parts = ['<div class="weather-container">',
+                 '<div class="weather-header"><h3>🌤️ 날씨 정보</h3></div>',
+                 f'<div class="weather-location">📍 {escape(self.location)}</div>']
+
+        if self.current:
+            parts.append('<div class="weather-current">')
+            parts.append(f'<div class="weather-section-title">🕐 현재 날씨 ({escape(self.observed_at)})</div>')
+            parts.append('<div class="weather-card">')
+            parts.append(f'<div class="weather-status">{self.current["emoji"]} {escape(self.current["desc"])}</div>')
+            for css_class, line in self.current_lines():
+                parts.append(f'<div class="{css_class}">{escape(line.strip())}</div>')
+            parts.append('</div></div>')
+
+        if self.forecast:
+            parts.append('<div class="weather-forecast">')
+            parts.append('<div class="weather-section-title">📅 오늘의 예보</div>')
+            parts.append('<div class="forecast-grid">')
+            for forecast in self.forecast:
+                parts.append('<div class="forecast-item">')
+                parts.append(f'<div class="forecast-time">{forecast["time_emoji"]} {forecast["time_label"]}</div>')
+                parts.append(f'<div class="forecast-weather">{forecast["weather_emoji"]} {escape(forecast["weather_desc"])}</div>')
+                if forecast['temp'] != 'N/A':
+                    parts.append(f'<div class="forecast-temp">🌡️ {escape(str(forecast["temp"]))}°C</div>')
+                parts.append('</div>')
+            parts.append('</div></div>')
+
+        if self.tips:
+            parts.append('<div class="weather-tips">')
+            parts.append('<div class="weather-section-title">💡 날씨 팁</div>')
+            for tip in self.tips:
+                parts.append(f'<div class="tip-item">{escape(tip)}</div>')
+            parts.append('</div>')
+
+        parts.append(f'<div class="weather-footer">📊 한국기상청 │ 업데이트: {self.updated}</div>')
+        parts.append('</div>')
+        return ''.join(parts)
+
+    def fields(self):
+        return {
+            'location': self.location,
+            'observed_at': self.observed_at,
+            'current': self.current,
+            'forecast': self.forecast,
+            'tips': self.tips,
+            'base_date': self.base_date,
+            'base_time': self.base_time,
+        }
+
+
+class DirectionsResult(Result):
+    """출발지 → 도착지 거리와 예상 소요시간"""
+
+    __slots__ = ('departure', 'destination', 'distance_km', 'minutes', 'transit')
+    kind = 'directions'
+
+    def __init__(self, departure, destination, distance_km, minutes, transit=None):
+        """transit: 지하철 이용 계획 (subway_network.plan() 결과, 노선도 밖이면 None)"""
+        super().__init__()
+        self.departure = departure
+        self.destination = destination
+        self.distance_km = distance_km
+        self.minutes = minutes
+        self.transit = transit
+
+    def recommendations(self):
+        if self.distance_km < 2:
+            return ["🚶‍♂️ 도보 이용 권장 (15-20분)"]
+        if self.transit:
+            transit = self.transit
+            lines = [f"🚇 {station_label(transit['from_station'])} → {station_label(transit['to_station'])}"]
+            for leg in transit['legs']:
+                lines.append(f"   {leg['line']} {leg['from']} → {leg['to']} ({leg['stops']}개 역)")
+            lines.append(f"🔁 환승 {transit['transfers']}회" if transit['transfers'] else "🔁 환승 없음")
+            if transit['walk_minutes']:
+                lines.append(f"🚶 역까지 도보 {transit['walk_minutes']}분 포함")
+            return lines
+        elif self.distance_km < 10:
+            return ["🚌 [버스] 또는 [지하철] 이용"]
+        return ["🚇 [지하철] 또는 [버스] 이용 권장"]
+
+    def render_text(self):
+        result = f"🚇 {self.departure} → {self.destination}\n\n"
+        result += f"📍 직선거리: {self.distance_km:.1f}km\n"
+        result += f"⏱️ 예상 소요시간: {self.minutes}분{' (지하철 기준)' if self.transit else ''}\n\n"
+        result += "🛤️ 추천 교통수단:\n"
+        for line in self.recommendations():
+            result += f"{line}\n"
+        result += f"\n📱 실시간 정보는 지하철앱을 확인하세요"
+        return result
+
+    def fields(self):
+        return {
+            'departure': self.departure,
+            'destination': self.destination,
+            'distance_km': round(self.distance_km, 3),
+            'minutes': self.minutes,
+            'recommendations': self.recommendations(),
+            'transit': self.transit,
+        }
+
+    def state(self):
+        return {
+            'departure': self.departure,
+            'destination': self.destination,
+            'distance_km': self.distance_km,
+            'minutes': self.minutes,
+            'transit': self.transit,
+        }
+
+
+def station_label(name):
+    """역 이름 표시 ('강남' → '강남역', '서울역'은 그대로)"""
+    return name if name.endswith('역') else f"{name}역"
+
+
+class StockResult(Result):
+    """종목 일별 종가"""
+
+    __slots__ = ('name', 'code', 'price', 'change', 'rate', 'base_date', 'market')
+    kind = 'stock'
+
+    def __init__(self, name, code, price, change, rate, base_date, market):
+        super().__init__()
+        self.name = name
+        self.code = code
+        self.price = price
+        self.change = change
+        self.rate = rate
+        self.base_date = base_date   # YYYY-MM-DD
+        self.market = market
+
+    def render_text(self):
+        # 등락 방향 결정
+        if self.rate > 0:
+            emoji, sign, color = "📈", "+", "🔴"
+        elif self.rate < 0:
+            emoji, sign, color = "📉", "", "🔵"
+        else:
+            emoji, sign, color = "📊", "", "⚪"
+
+        result = f"{emoji} {self.name} ({self.code})\n\n"
+        result += f"💰 종가: {self.price:,}원\n"
+        result += f"{color} 전일대비: {sign}{self.change:,}원\n"
+        result += f"📊 등락률: {sign}{self.rate:.2f}%\n"
+        result += f"📅 기준일: {self.base_date} (일별 종가)\n"
+        result += f"📈 거래소: {self.market}"
+        return result
+
+    def fields(self):
+        return {
+            'name': self.name,
+            'code': self.code,
+            'price': self.price,
+            'change': self.change,
+            'rate': self.rate,
+            'base_date': self.base_date,
+            'market': self.market,
+        }
+
+
+class RecipeResult(Result):
+    """생성된 레시피 (재료/조리법은 저장할 때 한 번만 분리)"""
+
+    __slots__ = ('food_name', 'ingredients', 'steps')
+    kind = 'recipe'
+
+    def __init__(self, food_name, text, parsed):
+        super().__init__()
+        self._text = text
+        self.food_name = food_name
+        self.ingredients = parsed['ingredients']
+        self.steps = parsed['steps']
+
+    def render_html(self):
+        parts = ['<div style="text-align:left;">',
+                 f'<div>{escape(self.ingredients).replace(chr(10), "<br>")}</div>']
+        if self.steps:
+            parts.append('<div style="margin-top:10px;"><b>조리법</b></div>')
+            parts.append('<ul style="margin:0 0 0 18px; padding:0;">')
+            parts.extend(f'<li>{escape(step)}</li>' for step in self.steps)
+            parts.append('</ul>')
+        parts.append('</div>')
+        return ''.join(parts)
+
+    def fields(self):
+        return {'food_name': self.food_name, 'ingredients': self.ingredients, 'steps': self.steps}
+
+    def state(self):
+        return {'food_name': self.food_name, 'text': self.text,
+                'parsed': {'ingredients': self.ingredients, 'steps': self.steps}}
+
+
+def format_age(seconds):
+    """경과 시간 → '3분', '2시간 5분'"""
+    minutes = int(seconds // 60)
+    if minutes < 1:
+        return f"{int(seconds)}초"
+    if minutes < 60:
+        return f"{minutes}분"
+    return f"{minutes // 60}시간 {minutes % 60}분" if minutes % 60 else f"{minutes // 60}시간"
+
+
+class StaleResult(Result):
+    """이전에 받아 둔 결과 (얼마나 지난 정보인지 함께 표시)"""
+
+    __slots__ = ('result', 'age', 'error')
+
+    def __init__(self, result, age, error=None):
+        """error: 새로 가져오지 못한 이유 (없으면 백그라운드에서 새로 가져오는 중)"""
+        super().__init__()
+        self.result = result
+        self.age = age
+        self.error = error
+
+    @property
+    def kind(self):
+        return self.result.kind
+
+    def notice(self):
+        if self.error:
+            return f"⚠️ 최신 정보를 가져오지 못해 {format_age(self.age)} 전 정보를 표시합니다."
+        return f"⏱️ {format_age(self.age)} 전 정보입니다 (새 정보를 가져오는 중)"
+
+    def render_text(self):
+        return f"{self.result.text}\n\n{self.notice()}"
+
+    def render_html(self):
+        return f'{self.result.html}<div class="stale-notice">{escape(self.notice())}</div>'
+
+    def fields(self):
+        return self.result.fields()
+
+
+def as_result(value):
+    """서비스 반환값을 Result로 (안내/오류 문자열은 TextResult)"""
+    return value if isinstance(value, Result) else TextResult(value)
+
+
+# 디스크에 저장했다가 다시 만들 수 있는 결과 종류
+RESULT_TYPES = {cls.kind: cls for cls in (WeatherResult, DirectionsResult, StockResult, RecipeResult)}
+
+
+def dump_result(result):
+    """결과 객체 → JSON으로 저장할 수 있는 dict"""
+    return {'kind': result.kind, 'state': result.state()}
+
+
+def load_result(data):
+    """dump_result 결과 → 결과 객체"""
+    return RESULT_TYPES[data['kind']](**data['state'])
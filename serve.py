@@ -0,0 +1,247 @@
+"""운영용 다중 프로세스 서버
+
+부모 프로세스가 포트를 한 번 열고 워커 프로세스 여러 개를 띄워 같은 소켓에서 요청을 받습니다.
+예보/좌표/레시피/시세 캐시는 SQLite(WAL) 파일을 함께 쓰므로 한 워커가 받아 온 결과는
+다른 워커에서도 캐시 적중이 됩니다. 종료된 워커는 다시 띄웁니다. (fork를 쓰므로 Linux/macOS 전용)
+
+워커는 uvicorn이 설치되어 있으면 uvicorn으로 asgi.py 를 실행합니다. /api/<카테고리> 와 대시보드는
+이벤트 루프에서 처리하므로 업스트림을 기다리는 동안 스레드를 점유하지 않습니다.
+uvicorn이 없으면 werkzeug 개발 서버(요청마다 스레드)로 대신 실행합니다. 이 경우 동시 요청 수만큼
+스레드가 상한 없이 늘어나고, 느린 클라이언트에 대한 시간 제한이나 연결 관리가 없으므로
+시험/소규모 용도로만 쓰세요.
+
+사용 예:
+    python serve.py --workers 4 --port 5000
+    python serve.py --server werkzeug       # uvicorn 없이 실행
+"""
+import argparse
+import importlib.util
+import logging
+import os
+import signal
+import socket
+import sys
+import threading
+import time
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+WORKER_STATS_INTERVAL = float(os.getenv('WORKER_STATS_INTERVAL', 5))  # 워커 통계를 공유 저장소에 기록하는 주기(초)
+
+
+class RequestCounter:
+    """워커가 처리한 요청 수와 처리 중인 요청 수를 세는 WSGI 미들웨어"""
+
+    def __init__(self, app):
+        self.app = app
+        self.requests = 0
+        self.in_flight = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, environ, start_response):
+        with self._lock:
+            self.requests += 1
+            self.in_flight += 1
+        try:
+            body = self.app(environ, start_response)
+        except BaseException:
+            self._finished()
+            raise
+        return CountedBody(body, self._finished)
+
+    def _finished(self):
+        with self._lock:
+            self.in_flight -= 1
+
+
+class ASGIRequestCounter(RequestCounter):
+    """RequestCounter의 ASGI 버전 (응답을 끝까지 보낸 뒤 처리 완료로 셈)"""
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+        with self._lock:
+            self.requests += 1
+            self.in_flight += 1
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self._finished()
+
+
+class CountedBody:
+    """응답 본문을 그대로 전달하고, 서버가 close()를 부르면 원래 본문을 닫은 뒤 처리 완료로 셈
+
+    (스트리밍 응답도 끝까지 보낸 뒤에 완료로 세고, call_on_close 등 원래 close() 동작은 유지)
+    """
+
+    def __init__(self, body, finished):
+        self.body = body
+        self._finished = finished
+        self._closed = False
+
+    def __iter__(self):
+        return iter(self.body)
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        try:
+            close = getattr(self.body, 'close', None)
+            if close is not None:
+                close()
+        finally:
+            self._finished()
+
+
+def report_stats(worker_id, counter, started_at, stop):
+    """현재 워커 통계/지표를 공유 저장소에 주기적으로 기록 (/stats/workers, /metrics 에서 조회)"""
+    from app import collect_stats, render_metrics, worker_stats_store, worker_metrics_store
+
+    while not stop.is_set():
+        snapshot = collect_stats()
+        snapshot['worker'].update(started_at=started_at, requests=counter.requests, in_flight=counter.in_flight)
+        # 기록이 끊긴 워커는 몇 주기 뒤 목록에서 빠짐
+        expires_at = time.time() + WORKER_STATS_INTERVAL * 3
+        worker_stats_store.set(str(worker_id), snapshot, expires_at)
+        worker_metrics_store.set(str(worker_id), render_metrics(), expires_at)
+        stop.wait(WORKER_STATS_INTERVAL)
+
+
+def run_worker(worker_id, sock, args):
+    """워커 프로세스 본체 (fork 이후 app을 불러와 커넥션/스레드를 워커마다 새로 만듦)"""
+    os.environ['ONEWORD_WORKER_ID'] = str(worker_id)
+    signal.signal(signal.SIGINT, signal.SIG_IGN)   # Ctrl+C는 부모가 받아 SIGTERM으로 전달
+
+    from app import start_background_jobs
+
+    if args.server == 'uvicorn':
+        counter, serve = make_uvicorn_server(sock, args)
+    else:
+        counter, serve = make_werkzeug_server(sock, args)
+
+    # 미리 받기와 명언 생성은 워커 0에서만 (예보 캐시와 명언 풀은 SQLite에 있어 모든 워커가 꺼내 씀)
+    start_background_jobs(primary=worker_id == 0)
+
+    stop = threading.Event()
+    threading.Thread(target=report_stats, args=(worker_id, counter, time.time(), stop),
+                     name='worker-stats', daemon=True).start()
+    serve()
+    stop.set()
+
+
+def make_uvicorn_server(sock, args):
+    """asgi.py 를 uvicorn으로 실행 → (요청 카운터, 실행 함수)"""
+    import uvicorn
+    from asgi import app
+
+    counter = ASGIRequestCounter(app)
+    # 백그라운드 작업은 run_worker가 워커 번호에 맞춰 시작하므로 lifespan은 끔
+    config = uvicorn.Config(counter, lifespan='off', access_log=args.access_log,
+                            log_level='info' if args.access_log else 'warning')
+    server = uvicorn.Server(config)
+    # uvicorn은 SIGTERM을 받아 정상 종료한 뒤 원래 핸들러로 신호를 다시 보낼 수 있으므로 무시하는 핸들러를 둠
+    signal.signal(signal.SIGTERM, lambda signum, frame: None)
+    return counter, lambda: server.run(sockets=[sock])
+
+
+def make_werkzeug_server(sock, args):
+    """app.py 를 werkzeug 개발 서버로 실행 (uvicorn이 없을 때만) → (요청 카운터, 실행 함수)"""
+    from werkzeug.serving import make_server
+    from app import app
+
+    if not args.access_log:
+        logging.getLogger('werkzeug').setLevel(logging.WARNING)
+
+    counter = RequestCounter(app)
+    server = make_server(args.host, args.port, counter, threaded=True, fd=sock.fileno())
+    signal.signal(signal.SIGTERM, lambda signum, frame: threading.Thread(target=server.shutdown).start())
+    return counter, server.serve_forever
+
+
+def choose_server(name):
+    """'auto'면 uvicorn이 설치되어 있을 때 uvicorn, 아니면 werkzeug"""
+    if name != 'auto':
+        return name
+    return 'uvicorn' if importlib.util.find_spec('uvicorn') else 'werkzeug'
+
+
+def spawn(worker_id, sock, args):
+    pid = os.fork()
+    if pid == 0:
+        code = 0
+        try:
+            run_worker(worker_id, sock, args)
+        except Exception:
+            logging.exception('worker %s crashed', worker_id)
+            code = 1
+        finally:
+            os._exit(code)
+    return pid
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='oneWord 운영 서버 (다중 프로세스)')
+    parser.add_argument('--host', default='0.0.0.0')
+    parser.add_argument('--port', type=int, default=int(os.getenv('PORT', 5000)))
+    parser.add_argument('--workers', type=int, default=int(os.getenv('WEB_WORKERS', os.cpu_count() or 2)),
+                        help='워커 프로세스 수')
+    parser.add_argument('--server', choices=['auto', 'uvicorn', 'werkzeug'], default=os.getenv('WEB_SERVER', 'auto'),
+                        help='워커에서 실행할 서버 (auto: uvicorn이 있으면 uvicorn)')
+    parser.add_argument('--access-log', action='store_true', help='요청마다 접근 로그 출력')
+    args = parser.parse_args(argv)
+    args.server = choose_server(args.server)
+    if args.server == 'uvicorn' and not importlib.util.find_spec('uvicorn'):
+        parser.error('uvicorn이 설치되어 있지 않습니다. (pip install uvicorn)')
+
+    # 모든 워커가 같은 소켓에서 accept
+    sock = socket.create_server((args.host, args.port), reuse_port=False, backlog=1024)
+    sock.set_inheritable(True)
+
+    workers = {}
+    for worker_id in range(args.workers):
+        workers[spawn(worker_id, sock, args)] = (worker_id, time.monotonic())
+    print(f"oneWord: http://{args.host}:{args.port} (워커 {args.workers}개, {args.server}, pid {os.getpid()})")
+    if args.server == 'werkzeug':
+        print("werkzeug 개발 서버로 실행합니다. 운영 환경에서는 uvicorn을 설치해 쓰세요. (pip install uvicorn)")
+    sys.stdout.flush()
+
+    stopping = []
+
+    def shutdown(signum, frame):
+        stopping.append(signum)
+        for pid in list(workers):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGTERM, shutdown)
+    signal.signal(signal.SIGINT, shutdown)
+
+    while workers:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        except InterruptedError:
+            continue
+        worker_id, started = workers.pop(pid, (None, None))
+        if worker_id is None or stopping:
+            continue
+        print(f"워커 {worker_id} (pid {pid}) 종료됨 (status {status}), 다시 시작합니다.")
+        sys.stdout.flush()
+        if time.monotonic() - started < 1:
+            time.sleep(1)   # 시작하자마자 죽는 경우 너무 빠르게 반복하지 않음
+        workers[spawn(worker_id, sock, args)] = (worker_id, time.monotonic())
+
+    sock.close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
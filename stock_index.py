@@ -0,0 +1,231 @@
+import csv
+import os
+import threading
+import time
+from bisect import bisect_left
+
+from metrics import log_event
+
+# 상장 종목 스냅샷 파일 (code,name,english_name,market,aliases)
+LISTINGS_PATH = os.getenv(
+    'STOCK_LISTINGS_PATH',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'krx_listings.csv')
+)
+RELOAD_CHECK_INTERVAL = int(os.getenv('STOCK_LISTINGS_CHECK_INTERVAL', 30))  # 파일 변경 확인 주기(초)
+
+
+def normalize_name(text):
+    """종목명 비교용 키 (공백 제거, 소문자 변환)"""
+    return ''.join(str(text).split()).casefold()
+
+
+def edit_distance(a, b, limit):
+    """편집 거리 (limit를 넘으면 limit + 1 반환)"""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        row_min = i
+        for j, cb in enumerate(b, 1):
+            cost = 0 if ca == cb else 1
+            value = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            current.append(value)
+            row_min = min(row_min, value)
+        if row_min > limit:
+            return limit + 1
+        previous = current
+    return previous[-1]
+
+
+def _bigrams(key):
+    return {key[i:i + 2] for i in range(len(key) - 1)}
+
+
+class StockListing:
+    """상장 종목 정보"""
+
+    __slots__ = ('code', 'name', 'english_name', 'market')
+
+    def __init__(self, code, name, english_name='', market=''):
+        self.code = code
+        self.name = name
+        self.english_name = english_name
+        self.market = market
+
+    def to_dict(self):
+        return {'code': self.code, 'name': self.name, 'english_name': self.english_name, 'market': self.market}
+
+    def __repr__(self):
+        return f"StockListing({self.code}, {self.name})"
+
+
+class _IndexSnapshot:
+    """한 번 로드한 종목 목록의 검색 구조 (로드 후 변경하지 않음)"""
+
+    def __init__(self, entries):
+        self.listings = [listing for listing, _ in entries]
+        self.by_key = {}       # 정규화된 이름/영문명/별칭/코드 → StockListing
+        self.bigrams = {}      # 2글자 조각 → 키 목록 (오타 검색 후보)
+
+        for listing, aliases in entries:
+            self.by_key.setdefault(listing.code, listing)
+            for name in (listing.name, listing.english_name) + tuple(aliases):
+                key = normalize_name(name)
+                if key:
+                    self.by_key.setdefault(key, listing)
+
+        for key in self.by_key:
+            for gram in _bigrams(key):
+                self.bigrams.setdefault(gram, []).append(key)
+
+        self.sorted_keys = sorted(self.by_key)
+
+
+class StockIndex:
+    """전체 상장 종목 인메모리 색인 (정확/접두어/오타 허용 검색, 무중단 재로드)"""
+
+    def __init__(self, path=LISTINGS_PATH, check_interval=RELOAD_CHECK_INTERVAL):
+        self.path = path
+        self.check_interval = check_interval
+        self._snapshot = _IndexSnapshot([])
+        self._mtime = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+        self.reload()
+
+    def reload(self):
+        """스냅샷 파일을 다시 읽어 색인 교체 (성공 여부 반환)"""
+        with self._lock:
+            try:
+                mtime = os.path.getmtime(self.path)
+                entries = []  # (StockListing, 별칭 목록)
+                with open(self.path, encoding='utf-8-sig', newline='') as f:
+                    for row in csv.DictReader(f):
+                        code = (row.get('code') or '').strip().zfill(6)
+                        name = (row.get('name') or '').strip()
+                        if not name:
+                            continue
+                        listing = StockListing(code, name,
+                                               (row.get('english_name') or '').strip(),
+                                               (row.get('market') or '').strip())
+                        aliases = [a.strip() for a in (row.get('aliases') or '').split('|') if a.strip()]
+                        entries.append((listing, aliases))
+            except (OSError, csv.Error) as e:
+                log_event('stock_index_load_error', level='error', path=self.path, error=str(e))
+                return False
+
+            # 새 색인을 다 만든 뒤 한 번에 교체 (검색 중인 요청은 이전 색인 사용)
+            self._snapshot = _IndexSnapshot(entries)
+            self._mtime = mtime
+            self._checked_at = time.time()
+            return True
+
+    def maybe_reload(self):
+        """파일이 바뀌었으면 재로드 (check_interval 마다 한 번만 확인)"""
+        now = time.time()
+        if now - self._checked_at < self.check_interval:
+            return False
+        self._checked_at = now
+        try:
+            changed = os.path.getmtime(self.path) != self._mtime
+        except OSError:
+            return False
+        return self.reload() if changed else False
+
+    def __len__(self):
+        return len(self._snapshot.listings)
+
+    def exact(self, query):
+        """종목명/영문명/별칭/종목코드 정확히 일치"""
+        key = normalize_name(query)
+        if key.startswith('a') and key[1:].isdigit():
+            key = key[1:]  # 'A005930' 형식 코드
+        return self._snapshot.by_key.get(key)
+
+    def prefix(self, query, limit=10):
+        """접두어 일치 종목 (짧은 이름 우선)"""
+        key = normalize_name(query)
+        if not key:
+            return []
+        snapshot = self._snapshot
+        keys = snapshot.sorted_keys
+        matches = []
+        i = bisect_left(keys, key)
+        while i < len(keys) and keys[i].startswith(key):
+            matches.append(keys[i])
+            i += 1
+        return _unique_listings(snapshot, sorted(matches, key=len), limit)
+
+    def fuzzy(self, query, limit=5, max_distance=None):
+        """오타 허용 검색 (편집 거리가 가까운 순)"""
+        scored = self._fuzzy_scored(normalize_name(query), max_distance)
+        return _unique_listings(self._snapshot, [candidate for _, _, candidate in scored], limit)
+
+    def _fuzzy_scored(self, key, max_distance=None):
+        """공통 2글자 조각이 있는 후보만 편집 거리 계산 → [(거리, 길이, 키)] 가까운 순"""
+        if len(key) < 2:
+            return []
+        if max_distance is None:
+            max_distance = 1 if len(key) <= 4 else 2
+
+        # 편집 1번에 2글자 조각은 최대 2개까지 달라지므로, 공유 조각이 적은 후보는 미리 제외
+        snapshot = self._snapshot
+        grams = _bigrams(key)
+        shared = {}
+        for gram in grams:
+            for candidate in snapshot.bigrams.get(gram, ()):
+                shared[candidate] = shared.get(candidate, 0) + 1
+        min_shared = max(1, len(grams) - 2 * max_distance)
+
+        scored = []
+        for candidate, count in shared.items():
+            if count < min_shared or abs(len(candidate) - len(key)) > max_distance:
+                continue
+            distance = edit_distance(key, candidate, max_distance)
+            if distance <= max_distance:
+                scored.append((distance, len(candidate), candidate))
+        scored.sort()
+        return scored
+
+    def resolve(self, query, limit=5):
+        """정확 → 접두어 → 오타 허용 순으로 검색 → (종목, 후보 목록)
+
+        한 종목으로 정해지면 (종목, []), 여러 종목이 똑같이 맞으면 (None, 후보 목록), 없으면 (None, [])
+        """
+        self.maybe_reload()
+        listing = self.exact(query)
+        if listing:
+            return listing, []
+
+        matches = self.prefix(query, limit=limit)
+        if not matches:
+            # 오타 검색은 가장 가까운 거리의 후보만 비교
+            scored = self._fuzzy_scored(normalize_name(query))
+            best = [candidate for distance, _, candidate in scored if distance == scored[0][0]]
+            matches = _unique_listings(self._snapshot, best, limit)
+        if len(matches) == 1:
+            return matches[0], []
+        return None, matches
+
+    def lookup(self, query):
+        """한 종목으로 정해질 때만 그 종목 (여러 후보와 맞거나 없으면 None)"""
+        return self.resolve(query)[0]
+
+
+def _unique_listings(snapshot, keys, limit):
+    result = []
+    seen = set()
+    for key in keys:
+        listing = snapshot.by_key[key]
+        if listing.code in seen:
+            continue
+        seen.add(listing.code)
+        result.append(listing)
+        if len(result) >= limit:
+            break
+    return result
+
+
+# 종목 색인 인스턴스
+stock_index = StockIndex()
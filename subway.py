@@ -0,0 +1,260 @@
+"""서울 지하철 노선도 기반 역 간 소요시간/환승 횟수
+
+data/seoul_subway.json 의 역 좌표와 노선 순서로 (역, 노선) 그래프를 만들고,
+모든 역 쌍의 최단 소요시간과 환승 횟수를 처음 사용할 때 한 번 계산해 표로 보관합니다.
+이후 조회는 표에서 바로 읽으므로 업스트림 호출 없이 마이크로초 단위로 끝납니다.
+"""
+import heapq
+import json
+import math
+import os
+import threading
+import time
+
+from geo import distance_matrix, haversine_km
+from metrics import log_event
+
+# 노선 데이터 파일 (version 필드로 구분)
+SUBWAY_DATA_PATH = os.getenv(
+    'SUBWAY_DATA_PATH',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'seoul_subway.json')
+)
+SUBWAY_MAX_WALK_KM = float(os.getenv('SUBWAY_MAX_WALK_KM', 1.2))  # 출발지/도착지에서 역까지 걸어갈 최대 직선거리(km)
+WALK_SPEED_KMH = 4.5    # 걷는 속도
+WALK_DETOUR = 1.3       # 직선거리 대비 실제 걷는 거리
+
+
+def station_key(name):
+    """역 이름 비교용 키 (공백 제거, 소문자 변환, 끝의 '역' 제거)"""
+    key = ''.join(str(name).split()).casefold()
+    return key[:-1] if len(key) > 2 and key.endswith('역') else key
+
+
+def walk_minutes(km):
+    return km * WALK_DETOUR / WALK_SPEED_KMH * 60
+
+
+class _NetworkSnapshot:
+    """노선 데이터 한 버전의 그래프와 역 간 최단 소요시간/환승 표 (만든 뒤 변경하지 않음)"""
+
+    def __init__(self, data):
+        self.version = data.get('version')
+        self.names = list(data['stations'])
+        self.index = {name: i for i, name in enumerate(self.names)}
+        self.coords = [tuple(data['stations'][name]) for name in self.names]
+        self.lines = [line['name'] for line in data['lines']]
+
+        self.by_key = {station_key(name): i for i, name in enumerate(self.names)}
+        for alias, name in data.get('aliases', {}).items():
+            self.by_key.setdefault(station_key(alias), self.index[name])
+
+        # 노드: (역, 노선), 간선: 같은 노선 이웃 역(주행) 또는 같은 역 다른 노선(환승)
+        self.node_station = []
+        self.node_line = []
+        self.station_nodes = [[] for _ in self.names]
+        self.adjacent = []
+        node_of = {}
+
+        def node(station, line):
+            key = (station, line)
+            if key not in node_of:
+                node_of[key] = len(self.node_station)
+                self.node_station.append(station)
+                self.node_line.append(line)
+                self.station_nodes[station].append(node_of[key])
+                self.adjacent.append([])
+            return node_of[key]
+
+        for line_index, line in enumerate(data['lines']):
+            stops = [self.index[name] for name in line['stations']]
+            pairs = list(zip(stops, stops[1:]))
+            if line.get('loop'):
+                pairs.append((stops[-1], stops[0]))
+            for a, b in pairs:
+                minutes = self._segment_minutes(data, a, b)
+                na, nb = node(a, line_index), node(b, line_index)
+                self.adjacent[na].append((nb, minutes, 0))
+                self.adjacent[nb].append((na, minutes, 0))
+
+        overrides = data.get('transfer_overrides', {})
+        for station, nodes in enumerate(self.station_nodes):
+            cost = overrides.get(self.names[station], data['transfer_minutes'])
+            for a in nodes:
+                for b in nodes:
+                    if a != b:
+                        self.adjacent[a].append((b, cost, 1))
+
+        self._build_tables()
+
+    def _segment_minutes(self, data, a, b):
+        """이웃 역 사이 주행 시간 (역 간 거리 / 표정 속도 + 정차 시간)"""
+        km = haversine_km(self.coords[a], self.coords[b])
+        return max(data['min_segment_minutes'], km / data['speed_kmh'] * 60 + data['dwell_minutes'])
+
+    def _build_tables(self):
+        """역마다 다익스트라 한 번 → 모든 역 쌍의 (소요시간, 환승 횟수)와 경로 복원용 부모 노드"""
+        count = len(self.names)
+        self.minutes = []
+        self.transfers = []
+        self._parents = []
+        self._ends = []
+
+        for source in range(count):
+            # 출발역의 모든 노선에서 시작 (출발역에서 갈아타는 시간은 없음)
+            best = [None] * len(self.node_station)
+            parent = [-1] * len(self.node_station)
+            heap = []
+            for n in self.station_nodes[source]:
+                best[n] = (0.0, 0)
+                heap.append((0.0, 0, n))
+            heapq.heapify(heap)
+            while heap:
+                minutes, transfers, n = heapq.heappop(heap)
+                if (minutes, transfers) != best[n]:
+                    continue
+                for m, cost, transfer in self.adjacent[n]:
+                    candidate = (minutes + cost, transfers + transfer)
+                    if best[m] is None or candidate < best[m]:
+                        best[m] = candidate
+                        parent[m] = n
+                        heapq.heappush(heap, (candidate[0], candidate[1], m))
+
+            minutes_row = [math.inf] * count
+            transfers_row = [-1] * count
+            ends = [-1] * count
+            for station, nodes in enumerate(self.station_nodes):
+                reached = [(best[n], n) for n in nodes if best[n] is not None]
+                if reached:
+                    (minutes, transfers), n = min(reached)
+                    minutes_row[station] = round(minutes, 1)
+                    transfers_row[station] = transfers
+                    ends[station] = n
+            self.minutes.append(minutes_row)
+            self.transfers.append(transfers_row)
+            self._parents.append(parent)
+            self._ends.append(ends)
+
+    def find(self, name):
+        """역 이름/별칭 → 역 번호 ('강남역', '강남' 모두 가능)"""
+        return self.by_key.get(station_key(name))
+
+    def nearest(self, coords):
+        """좌표 (경도, 위도)에서 가장 가까운 역 → (역 번호, 거리 km)"""
+        distances = distance_matrix([coords], self.coords)[0]
+        station = min(range(len(distances)), key=distances.__getitem__)
+        return station, distances[station]
+
+    def route(self, source, target):
+        """경로를 노선별 구간으로 → [{'line', 'from', 'to', 'stops'}]"""
+        parent = self._parents[source]
+        path = []
+        n = self._ends[source][target]
+        while n != -1:
+            path.append(n)
+            n = parent[n]
+        path.reverse()
+
+        legs = []
+        for a, b in zip(path, path[1:]):
+            if self.node_station[a] == self.node_station[b]:
+                continue  # 환승 (다음 주행부터 새 구간)
+            line = self.lines[self.node_line[a]]
+            if legs and legs[-1]['line'] == line and legs[-1]['to'] == self.names[self.node_station[a]]:
+                legs[-1]['to'] = self.names[self.node_station[b]]
+                legs[-1]['stops'] += 1
+            else:
+                legs.append({'line': line, 'from': self.names[self.node_station[a]],
+                             'to': self.names[self.node_station[b]], 'stops': 1})
+        return legs
+
+
+class SubwayNetwork:
+    """서울 지하철 노선도 (처음 사용할 때 데이터 파일을 읽어 표를 만듦)"""
+
+    def __init__(self, path=SUBWAY_DATA_PATH, max_walk_km=SUBWAY_MAX_WALK_KM):
+        self.path = path
+        self.max_walk_km = max_walk_km
+        self._snapshot = None
+        self._failed = False
+        self.build_ms = None
+        self._lock = threading.Lock()
+
+    def snapshot(self):
+        """노선도 표 (데이터 파일을 읽지 못하면 None)"""
+        if self._snapshot is None and not self._failed:
+            with self._lock:
+                if self._snapshot is None and not self._failed:
+                    started = time.monotonic()
+                    try:
+                        with open(self.path, encoding='utf-8') as f:
+                            self._snapshot = _NetworkSnapshot(json.load(f))
+                    except (OSError, ValueError, KeyError) as e:
+                        log_event('subway_load_error', level='error', path=self.path, error=repr(e))
+                        self._failed = True
+                        return None
+                    self.build_ms = round((time.monotonic() - started) * 1000, 1)
+                    log_event('subway_loaded', version=self._snapshot.version,
+                              stations=len(self._snapshot.names), build_ms=self.build_ms)
+        return self._snapshot
+
+    def travel(self, departure, destination):
+        """역 이름 → 역 간 (소요시간(분), 환승 횟수), 모르는 역이면 None"""
+        snapshot = self.snapshot()
+        if snapshot is None:
+            return None
+        source, target = snapshot.find(departure), snapshot.find(destination)
+        if source is None or target is None:
+            return None
+        return snapshot.minutes[source][target], snapshot.transfers[source][target]
+
+    def _resolve(self, snapshot, name, coords):
+        """검색어가 역 이름이면 그 역(걷는 거리 0), 아니면 좌표에서 가장 가까운 역 → (역 번호, 걷는 거리 km)"""
+        station = snapshot.find(name)
+        if station is not None:
+            return station, 0.0
+        if not coords:
+            return None
+        station, km = snapshot.nearest(coords)
+        return (station, km) if km <= self.max_walk_km else None
+
+    def plan(self, departure, destination, dep_coords=None, dest_coords=None):
+        """출발지 → 도착지 지하철 이용 계획 (노선도 밖이거나 같은 역이면 None)"""
+        snapshot = self.snapshot()
+        if snapshot is None:
+            return None
+        start = self._resolve(snapshot, departure, dep_coords)
+        end = self._resolve(snapshot, destination, dest_coords)
+        if start is None or end is None or start[0] == end[0]:
+            return None
+
+        (source, walk_to), (target, walk_from) = start, end
+        ride = snapshot.minutes[source][target]
+        if ride == math.inf:
+            return None
+        walk = walk_minutes(walk_to) + walk_minutes(walk_from)
+        return {
+            'from_station': snapshot.names[source],
+            'to_station': snapshot.names[target],
+            'minutes': math.ceil(ride + walk),
+            'ride_minutes': math.ceil(ride),
+            'walk_minutes': math.ceil(walk),
+            'transfers': snapshot.transfers[source][target],
+            'legs': snapshot.route(source, target),
+            'version': snapshot.version,
+        }
+
+    def status(self):
+        snapshot = self._snapshot
+        if snapshot is None:
+            return {'loaded': False, 'failed': self._failed}
+        return {
+            'loaded': True,
+            'version': snapshot.version,
+            'stations': len(snapshot.names),
+            'lines': len(snapshot.lines),
+            'build_ms': self.build_ms,
+        }
+
+
+# 공용 노선도 인스턴스
+subway_network = SubwayNetwork()
@@ -0,0 +1,31 @@
+import cache
+from cache import SQLiteStore
+
+
+def count(store):
+    return store._connect().execute('SELECT COUNT(*) FROM cache WHERE namespace = ?', (store.namespace,)).fetchone()[0]
+
+
+def test_prunes_soonest_expiring_beyond_max_entries(tmp_path, monkeypatch):
+    monkeypatch.setattr(cache, 'DISK_CACHE_PRUNE_EVERY', 5)
+    store = SQLiteStore('test', path=str(tmp_path / 'cache.sqlite3'), max_entries=3)
+    for i in range(5):
+        store.set(f'k{i}', i, 1000 + i)
+    # 확인 사이에는 최대 항목 수를 잠시 넘을 수 있음
+    assert count(store) == 5
+
+    store.set('k5', 5, 1005)
+    assert count(store) == 3
+    assert [key for key, _ in store.items(now=0)] == ['k3', 'k4', 'k5']
+
+
+def test_prune_is_per_namespace(tmp_path, monkeypatch):
+    monkeypatch.setattr(cache, 'DISK_CACHE_PRUNE_EVERY', 1)
+    path = str(tmp_path / 'cache.sqlite3')
+    small = SQLiteStore('small', path=path, max_entries=1)
+    other = SQLiteStore('other', path=path)
+    for i in range(3):
+        other.set(f'k{i}', i, 1000 + i)
+        small.set(f'k{i}', i, 1000 + i)
+    assert count(small) == 1
+    assert count(other) == 3
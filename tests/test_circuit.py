@@ -0,0 +1,121 @@
+import pytest
+
+import circuit
+from circuit import CircuitBreaker, CircuitOpenError, is_upstream_failure
+
+
+class Clock:
+    """time.monotonic 대신 쓰는 시계 (테스트에서 직접 앞으로 돌림)"""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(circuit, 'time', clock)
+    return clock
+
+
+@pytest.fixture
+def breaker(clock):
+    return CircuitBreaker('kma', failures=3, reset_timeout=30)
+
+
+def fail(breaker, times):
+    for _ in range(times):
+        breaker.before()
+        breaker.record(True)
+
+
+def test_opens_after_consecutive_failures(breaker):
+    fail(breaker, 2)
+    assert breaker.state == 'closed'
+    fail(breaker, 1)
+    assert breaker.state == 'open'
+    assert breaker.stats()['opened'] == 1
+
+
+def test_success_resets_failure_count(breaker):
+    fail(breaker, 2)
+    breaker.before()
+    breaker.record(False)
+    fail(breaker, 2)
+    assert breaker.state == 'closed'
+    assert breaker.failures == 2
+
+
+def test_rejects_while_open(breaker, clock):
+    fail(breaker, 3)
+    clock.now += 29
+    with pytest.raises(CircuitOpenError):
+        breaker.before()
+    assert breaker.stats()['rejected'] == 1
+
+
+def test_half_open_allows_single_trial(breaker, clock):
+    fail(breaker, 3)
+    clock.now += 30
+    breaker.before()
+    assert breaker.state == 'half_open'
+    with pytest.raises(CircuitOpenError):
+        breaker.before()
+
+
+def test_trial_success_closes(breaker, clock):
+    fail(breaker, 3)
+    clock.now += 30
+    breaker.before()
+    breaker.record(False)
+    assert breaker.state == 'closed'
+    breaker.before()
+
+
+def test_trial_failure_reopens(breaker, clock):
+    fail(breaker, 3)
+    clock.now += 30
+    breaker.before()
+    breaker.record(True)
+    assert breaker.state == 'open'
+    assert breaker.stats()['opened'] == 2
+    # 다시 연 시점부터 reset_timeout 동안 거절
+    clock.now += 29
+    with pytest.raises(CircuitOpenError):
+        breaker.before()
+
+
+def test_release_returns_trial_slot(breaker, clock):
+    fail(breaker, 3)
+    clock.now += 30
+    breaker.before()
+    breaker.release()
+    breaker.before()
+    assert breaker.state == 'half_open'
+
+
+def test_abandoned_trial_is_retried_after_timeout(breaker, clock):
+    fail(breaker, 3)
+    clock.now += 30
+    breaker.before()
+    clock.now += 29
+    with pytest.raises(CircuitOpenError):
+        breaker.before()
+    clock.now += 1
+    breaker.before()
+
+
+@pytest.mark.parametrize('status, failed', [(200, False), (404, False), (429, True), (500, True), (503, True)])
+def test_upstream_failure_by_status(status, failed):
+    assert is_upstream_failure(status=status) is failed
+
+
+def test_upstream_failure_by_error():
+    class HTTPError(Exception):
+        status_code = 400
+
+    assert is_upstream_failure(ConnectionError())
+    assert not is_upstream_failure(HTTPError())
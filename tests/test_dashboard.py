@@ -0,0 +1,56 @@
+import json
+
+import pytest
+import requests
+
+import app as app_module
+from results import TextResult
+
+
+@pytest.fixture
+def client(monkeypatch):
+    async def fake_get_result_async(category, keyword=None, departure=None, destination=None):
+        if keyword == '실패':
+            raise requests.exceptions.ConnectionError('upstream down')
+        if keyword == '깨짐':
+            raise ValueError('bad payload')
+        return TextResult(f'{category} {keyword}')
+
+    monkeypatch.setattr(app_module, 'get_result_async', fake_get_result_async)
+    return app_module.app.test_client()
+
+
+def test_failing_item_does_not_abort_stream(client):
+    response = client.post('/api/dashboard', json={'items': [
+        {'category': '날씨', 'q': '서울'},
+        {'category': '주가', 'q': '실패'},
+        {'category': '레시피', 'q': '깨짐'},
+        {'category': '명언', 'q': '용기'},
+    ]})
+    assert response.status_code == 200
+    lines = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    by_index = {line['index']: line for line in lines}
+    assert sorted(by_index) == [0, 1, 2, 3]
+    assert by_index[0]['ok'] and by_index[0]['result'] == '날씨 서울'
+    assert by_index[3]['ok'] and by_index[3]['result'] == '명언 용기'
+    assert not by_index[1]['ok'] and 'upstream down' in by_index[1]['error']
+    assert not by_index[2]['ok'] and 'bad payload' in by_index[2]['error']
+
+
+def test_api_maps_upstream_error_to_message(client):
+    response = client.get('/api/주가?q=실패')
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body['type'] == 'text'
+    assert body['result'] == '주가 정보 조회 중 오류가 발생했습니다: upstream down'
+
+
+def test_get_result_maps_timeout_to_message(monkeypatch):
+    def run(coro, timeout=None):
+        coro.close()
+        raise TimeoutError()
+
+    monkeypatch.setattr(app_module.async_runtime, 'run', run)
+    result = app_module.get_result('날씨', keyword='서울')
+    assert isinstance(result, TextResult)
+    assert '잠시 후 다시 시도' in result.text
@@ -0,0 +1,52 @@
+import asyncio
+
+import pytest
+
+import app as app_module
+from circuit import CircuitOpenError
+
+
+def fake_search(results, cancelled=None):
+    """검색 종류별 결과(좌표, 예외, 또는 대기 시간)를 돌려주는 kakao_local_search_async 대역"""
+    async def search(search_type, query, api_key):
+        result = results[search_type]
+        if isinstance(result, float):
+            try:
+                await asyncio.sleep(result)
+            except asyncio.CancelledError:
+                if cancelled is not None:
+                    cancelled.append(search_type)
+                raise
+            return (127.0, 37.5)
+        if isinstance(result, Exception):
+            raise result
+        return result
+    return search
+
+
+def test_address_hit_cancels_keyword_search(monkeypatch):
+    cancelled = []
+    monkeypatch.setattr(app_module, 'kakao_local_search_async',
+                        fake_search({'address': (127.1, 37.6), 'keyword': 5.0}, cancelled))
+
+    async def main():
+        coords = await app_module.search_coordinates_async('서울시청', 'key')
+        await asyncio.sleep(0)
+        return coords
+
+    assert asyncio.run(main()) == (127.1, 37.6)
+    assert cancelled == ['keyword']
+
+
+def test_non_requests_address_error_falls_back_to_keyword(monkeypatch):
+    monkeypatch.setattr(app_module, 'kakao_local_search_async',
+                        fake_search({'address': ValueError('bad json'), 'keyword': (127.2, 37.4)}))
+    assert asyncio.run(app_module.search_coordinates_async('강남역', 'key')) == (127.2, 37.4)
+
+
+def test_both_failing_raises_address_error(monkeypatch):
+    error = CircuitOpenError('kakao')
+    monkeypatch.setattr(app_module, 'kakao_local_search_async',
+                        fake_search({'address': error, 'keyword': ValueError('bad json')}))
+    with pytest.raises(CircuitOpenError):
+        asyncio.run(app_module.search_coordinates_async('강남역', 'key'))
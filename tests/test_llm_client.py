@@ -0,0 +1,155 @@
+import asyncio
+import threading
+import types
+
+import pytest
+
+import llm_client
+from llm_client import LLMClient, LLMBusyError, LLMTimeoutError
+
+
+class FakeGovernor:
+    def __init__(self):
+        self.used = 0
+
+    def acquire(self, upstream, cost=1):
+        self.used += cost
+
+    def settle(self, upstream, reserved, actual):
+        self.used += actual - reserved
+
+    async def settle_async(self, upstream, reserved, actual):
+        self.settle(upstream, reserved, actual)
+
+
+class FakeBreaker:
+    def __init__(self):
+        self.calls = []
+
+    def before(self):
+        self.calls.append('before')
+
+    def release(self):
+        self.calls.append('release')
+
+    def record(self, failed):
+        self.calls.append('record')
+
+
+class StatusError(Exception):
+    status_code = 429
+
+
+@pytest.fixture
+def governor(monkeypatch):
+    governor = FakeGovernor()
+    monkeypatch.setattr(llm_client, 'quota_governor', governor)
+    return governor
+
+
+@pytest.fixture
+def breaker(monkeypatch):
+    breaker = FakeBreaker()
+    monkeypatch.setattr(llm_client, 'circuit', lambda name: breaker)
+    return breaker
+
+
+def fake_client(create):
+    completions = types.SimpleNamespace(create=create)
+    return types.SimpleNamespace(chat=types.SimpleNamespace(completions=completions))
+
+
+def reply(text, prompt_tokens=10, completion_tokens=5):
+    usage = types.SimpleNamespace(prompt_tokens=prompt_tokens, completion_tokens=completion_tokens)
+    message = types.SimpleNamespace(content=text)
+    return types.SimpleNamespace(usage=usage, choices=[types.SimpleNamespace(message=message)])
+
+
+def test_complete_settles_actual_usage(governor):
+    client = LLMClient(max_concurrency=1)
+    client.client = lambda: fake_client(lambda **kwargs: reply('ok'))
+    assert client.complete({'max_tokens': 100}) == 'ok'
+    assert governor.used == 15
+
+
+def test_dispatched_failure_keeps_reservation(governor):
+    def create(**kwargs):
+        raise TimeoutError('read timeout')
+
+    client = LLMClient(max_concurrency=1)
+    client.client = lambda: fake_client(create)
+    with pytest.raises(TimeoutError):
+        client.complete({'max_tokens': 100})
+    assert governor.used == 100
+
+
+def test_error_response_is_refunded(governor):
+    def create(**kwargs):
+        raise StatusError('rate limited')
+
+    client = LLMClient(max_concurrency=1)
+    client.client = lambda: fake_client(create)
+    with pytest.raises(StatusError):
+        client.complete({'max_tokens': 100})
+    assert governor.used == 0
+
+
+def test_acomplete_timeout_keeps_reservation(governor):
+    async def create(**kwargs):
+        await asyncio.sleep(1)
+
+    client = LLMClient(max_concurrency=1, timeout=0.05)
+    client.async_client = lambda: fake_client(create)
+
+    async def main():
+        with pytest.raises(LLMTimeoutError):
+            await client.acomplete({'max_tokens': 100})
+        await asyncio.sleep(0.1)   # 정산은 스레드에서
+
+    asyncio.run(main())
+    assert governor.used == 100
+
+
+def async_reply(text):
+    async def create(**kwargs):
+        return reply(text)
+    return create
+
+
+def test_acomplete_busy_refunds_and_releases_circuit(governor, breaker):
+    client = LLMClient(max_concurrency=1, queue_timeout=0.05)
+    client.async_client = lambda: fake_client(async_reply('ok'))
+    client._slots.acquire()
+    with pytest.raises(LLMBusyError):
+        asyncio.run(client.acomplete({'max_tokens': 100}))
+    assert governor.used == 0
+    assert breaker.calls == ['before', 'release']
+
+
+def test_acomplete_waits_for_slot_freed_by_another_thread(governor, breaker):
+    client = LLMClient(max_concurrency=1, queue_timeout=2)
+    client.async_client = lambda: fake_client(async_reply('ok'))
+    client._slots.acquire()
+    threading.Timer(0.05, client._slots.release).start()
+    assert asyncio.run(client.acomplete({'max_tokens': 100})) == 'ok'
+    assert governor.used == 15
+
+
+def test_cancelled_wait_returns_slot_and_reservation(governor, breaker):
+    client = LLMClient(max_concurrency=1, queue_timeout=2)
+    client.async_client = lambda: fake_client(async_reply('ok'))
+    client._slots.acquire()
+
+    async def main():
+        task = asyncio.ensure_future(client.acomplete({'max_tokens': 100}))
+        await asyncio.sleep(0.05)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        client._slots.release()     # 기다리던 스레드가 이 자리를 얻은 뒤 돌려줘야 함
+        await asyncio.sleep(0.1)
+
+    asyncio.run(main())
+    assert client._slots.acquire(blocking=False)
+    assert governor.used == 0
+    assert breaker.calls == ['before', 'release']
@@ -0,0 +1,147 @@
+import asyncio
+import threading
+from datetime import datetime, timedelta
+
+import pytest
+
+import quota
+from quota import QuotaBucket, QuotaGovernor, QuotaExceededError, UsageStore, background
+
+
+@pytest.fixture
+def store(tmp_path):
+    return UsageStore(str(tmp_path / 'quota.sqlite3'))
+
+
+@pytest.fixture(autouse=True)
+def full_burst(monkeypatch):
+    # 버킷 용량을 하루 한도 전체로 (하루 사용량 조건만 따로 확인)
+    monkeypatch.setattr(quota, 'QUOTA_BURST', 1.0)
+
+
+def test_user_acquire_stops_at_daily_budget(store):
+    bucket = QuotaBucket('kma', 5, store)
+    assert all(bucket.acquire() for _ in range(5))
+    assert not bucket.acquire()
+    stats = bucket.stats()
+    assert stats['used_today'] == 5
+    assert stats['remaining_today'] == 0
+    assert stats['denied'] == {'user': 1, 'background': 0}
+
+
+def test_background_limited_to_share_and_half_bucket(store):
+    bucket = QuotaBucket('kma', 10, store)
+    # 백그라운드는 하루 한도의 절반(QUOTA_BACKGROUND_SHARE), 버킷이 절반 넘게 남아 있을 때만
+    granted = sum(bucket.acquire(priority='background') for _ in range(10))
+    assert granted == 5
+    assert bucket.denied['background'] == 5
+    # 사용자 요청은 계속 가능
+    assert bucket.acquire(priority='user')
+
+
+def test_background_waits_for_bucket_to_refill(store, monkeypatch):
+    monkeypatch.setattr(quota, 'QUOTA_BACKGROUND_SHARE', 1.0)
+    bucket = QuotaBucket('kma', 10, store)
+    for _ in range(5):
+        assert bucket.acquire(priority='user')
+    assert not bucket.acquire(priority='background')
+
+
+def test_settle_adjusts_reserved_usage(store):
+    bucket = QuotaBucket('openai', 10000, store)
+    assert bucket.acquire(1000)
+    bucket.settle(1000, 120)
+    assert bucket.stats()['used_today'] == 120
+    # 실패로 전부 돌려줘도 음수가 되지 않음
+    bucket.settle(500, 0)
+    assert bucket.stats()['used_today'] == 0
+
+
+def test_daily_usage_shared_between_processes(store, tmp_path):
+    # 워커 두 개 (같은 SQLite 파일을 쓰는 별도 저장소/버킷)
+    first = QuotaBucket('kma', 10, store)
+    second = QuotaBucket('kma', 10, UsageStore(str(tmp_path / 'quota.sqlite3')))
+    assert sum(first.acquire() for _ in range(6)) == 6
+    assert sum(second.acquire() for _ in range(10)) == 4
+    assert first.stats()['used_today'] == 10
+
+
+def test_usage_survives_restart(store, tmp_path):
+    bucket = QuotaBucket('kma', 10, store)
+    for _ in range(3):
+        bucket.acquire()
+    restarted = QuotaBucket('kma', 10, UsageStore(str(tmp_path / 'quota.sqlite3')))
+    assert restarted.stats()['used_today'] == 3
+
+
+def test_new_day_resets_usage(store, monkeypatch):
+    today = datetime(2026, 10, 17, 23, 59)
+
+    class Clock:
+        @staticmethod
+        def now():
+            return today
+
+    monkeypatch.setattr(quota, 'datetime', Clock)
+    bucket = QuotaBucket('kma', 2, store)
+    assert bucket.acquire() and bucket.acquire()
+    assert not bucket.acquire()
+
+    today += timedelta(minutes=2)
+    bucket.tokens = bucket.capacity
+    assert bucket.acquire()
+    assert bucket.stats()['used_today'] == 1
+
+
+def test_is_low_near_budget(store):
+    bucket = QuotaBucket('kma', 10, store)
+    assert not bucket.is_low()
+    for _ in range(10):
+        bucket.acquire()
+    assert bucket.is_low()
+
+
+def test_governor_uses_context_priority(store, monkeypatch):
+    monkeypatch.setenv('QUOTA_KMA_DAILY', '4')
+    governor = QuotaGovernor(store)
+    with background():
+        governor.acquire('kma')
+        governor.acquire('kma')
+        with pytest.raises(QuotaExceededError):
+            governor.acquire('kma')
+    governor.acquire('kma')
+    assert governor.stats()['kma']['denied'] == {'user': 0, 'background': 1}
+
+
+def test_governor_without_budget_is_unlimited(store, monkeypatch):
+    monkeypatch.setenv('QUOTA_OPENAI_DAILY', '0')
+    governor = QuotaGovernor(store)
+    for _ in range(100):
+        governor.acquire('openai', 1000)
+    assert governor.is_low('openai') is False
+    assert 'openai' not in governor.stats()
+
+
+def test_acquire_async_runs_off_loop_with_priority(store, monkeypatch):
+    monkeypatch.setenv('QUOTA_KMA_DAILY', '4')
+    governor = QuotaGovernor(store)
+    threads = []
+    original = store.add
+
+    def add(*args, **kwargs):
+        threads.append(threading.get_ident())
+        return original(*args, **kwargs)
+
+    monkeypatch.setattr(store, 'add', add)
+
+    async def main():
+        with background():
+            await governor.acquire_async('kma')
+            await governor.acquire_async('kma')
+            with pytest.raises(QuotaExceededError):
+                await governor.acquire_async('kma')
+        return threading.get_ident()
+
+    loop_thread = asyncio.run(main())
+    assert threads and loop_thread not in threads
+    assert governor.stats()['kma']['denied'] == {'user': 0, 'background': 1}
@@ -0,0 +1,43 @@
+import pytest
+
+from stock_index import StockIndex
+
+LISTINGS = """code,name,english_name,market,aliases
+005930,삼성전자,Samsung Electronics,KOSPI,
+005935,삼성전자우,Samsung Electronics Pref,KOSPI,
+009150,삼성전기,Samsung Electro-Mechanics,KOSPI,
+000660,SK하이닉스,SK hynix,KOSPI,하이닉스
+035720,카카오,Kakao,KOSPI,
+"""
+
+
+@pytest.fixture
+def index(tmp_path):
+    path = tmp_path / 'listings.csv'
+    path.write_text(LISTINGS, encoding='utf-8')
+    return StockIndex(path=str(path), check_interval=0)
+
+
+def test_exact_name_alias_and_code(index):
+    assert index.lookup('삼성전자').code == '005930'
+    assert index.lookup('하이닉스').code == '000660'
+    assert index.lookup('A005930').code == '005930'
+
+
+def test_unique_prefix_resolves(index):
+    assert index.resolve('카카') == (index.exact('카카오'), [])
+
+
+def test_ambiguous_prefix_returns_candidates(index):
+    listing, candidates = index.resolve('삼성')
+    assert listing is None
+    assert {candidate.code for candidate in candidates} == {'005930', '005935', '009150'}
+    assert index.lookup('삼성') is None
+
+
+def test_typo_picks_closest_match(index):
+    assert index.resolve('삼성젼자') == (index.exact('삼성전자'), [])
+
+
+def test_not_found(index):
+    assert index.resolve('없는종목') == (None, [])
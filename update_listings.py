@@ -0,0 +1,81 @@
+"""상장 종목 스냅샷(data/krx_listings.csv) 갱신
+
+공공데이터포털 주가 API(STOCK_API_KEY)로 최근 기준일의 전체 시세를 받아 모든 상장 종목(코스피/코스닥/코넥스)을
+스냅샷 파일에 저장합니다. 기존 파일의 영문명과 별칭은 종목코드 기준으로 유지합니다.
+실행 중인 서버는 파일이 바뀐 것을 확인해 다시 시작하지 않고 새 목록으로 검색합니다.
+
+사용 예:
+    python update_listings.py
+    python update_listings.py --base-date 20250102 --output data/krx_listings.csv
+"""
+import argparse
+import csv
+import os
+import sys
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from api_services import krx_service
+from stock_index import LISTINGS_PATH
+
+FIELDS = ['code', 'name', 'english_name', 'market', 'aliases']
+
+
+def read_existing(path):
+    """기존 스냅샷 → {종목코드: 행} (파일이 없으면 빈 dict)"""
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding='utf-8-sig', newline='') as f:
+        return {(row.get('code') or '').strip().zfill(6): row for row in csv.DictReader(f) if row.get('code')}
+
+
+def write_listings(path, rows):
+    """임시 파일에 쓴 뒤 교체 (서버가 쓰다 만 파일을 읽지 않도록)"""
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=FIELDS, lineterminator='\n')
+        writer.writeheader()
+        writer.writerows(rows)
+    os.replace(tmp_path, path)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='공공데이터포털 주가 API로 상장 종목 스냅샷을 갱신합니다.')
+    parser.add_argument('--output', default=LISTINGS_PATH, help='스냅샷 파일 경로')
+    parser.add_argument('--base-date', help='기준일 (YYYYMMDD, 생략하면 최근 거래일)')
+    parser.add_argument('--min-ratio', type=float, default=0.5,
+                        help='받은 종목 수가 기존의 이 비율보다 적으면 응답이 잘린 것으로 보고 저장하지 않음')
+    args = parser.parse_args(argv)
+
+    if not krx_service.api_key:
+        print('⚠️ STOCK_API_KEY 가 설정되지 않았습니다.')
+        return 1
+
+    try:
+        listings = krx_service.fetch_listings(args.base_date)
+    except Exception as e:
+        print(f"종목 목록을 가져오지 못했습니다: {e}")
+        return 1
+
+    existing = read_existing(args.output)
+    if len(listings) < len(existing) * args.min_ratio:
+        print(f"받은 종목 수({len(listings)})가 기존({len(existing)})보다 너무 적어 저장하지 않습니다.")
+        return 1
+
+    rows = []
+    for listing in listings:
+        previous = existing.get(listing['code'], {})
+        rows.append(dict(listing,
+                         english_name=(previous.get('english_name') or '').strip(),
+                         aliases=(previous.get('aliases') or '').strip()))
+    write_listings(args.output, rows)
+
+    codes = {row['code'] for row in rows}
+    print(f"{args.output}: {len(rows)}개 종목 (추가 {len(codes - existing.keys())}, 제외 {len(existing.keys() - codes)})")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())